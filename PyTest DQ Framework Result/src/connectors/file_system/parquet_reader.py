@@ -1,6 +1,10 @@
+import json
 import os
 import pandas as pd
-from typing import List, Optional
+from typing import Dict, List, Optional
+
+# Written by the data_dev Parquet export next to the data (see data_dev/src/data/parquet_manifest.py)
+MANIFEST_FILE_NAME = "_manifest.json"
 
 # TODO: not best approach, better to read directly using Pandas, where partation = column
 class ParquetReader:
@@ -40,6 +44,63 @@ class ParquetReader:
             if file.endswith(self.file_extension)
         ]
 
+    def read_manifest(self, folder_path: Optional[str] = None) -> Optional[dict]:
+        """
+        Read the JSON manifest of a dataset: file paths, partition values, row counts and per-column
+        null counts and min/max, taken from the Parquet footers by the writer.
+
+        A manifest listing a file that no longer exists with the recorded size (left behind by an export
+        that failed or ran without writing a manifest) is ignored, so the callers list the folders instead.
+
+        :param folder_path: The dataset root folder (defaults to the current folder path).
+        :return: The manifest, or None if the dataset has no readable, up-to-date manifest.
+        """
+        folder_path = folder_path or self.folder_path
+        try:
+            with open(os.path.join(folder_path, MANIFEST_FILE_NAME)) as manifest_file:
+                manifest = json.load(manifest_file)
+            for entry in manifest["files"]:
+                if os.path.getsize(os.path.join(folder_path, *entry["path"].split("/"))) != entry["size_bytes"]:
+                    return None
+            return manifest
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def get_row_count(self, folder_path: Optional[str] = None) -> int:
+        """
+        Count the rows of a dataset from its manifest, without reading any Parquet file.
+        Falls back to reading the whole dataset if there is no manifest.
+
+        :param folder_path: The dataset root folder (defaults to the current folder path).
+        :return: The number of rows.
+        """
+        folder_path = folder_path or self.folder_path
+        manifest = self.read_manifest(folder_path)
+        if manifest is not None:
+            return manifest["num_rows"]
+        self.set_folder_path(folder_path)
+        return len(self.read_subfolders())
+
+    def list_manifest_files(self, partition_values: Optional[Dict[str, str]] = None,
+                            folder_path: Optional[str] = None) -> Optional[List[str]]:
+        """
+        List the data files of a dataset from its manifest, optionally pruned to some partition values.
+
+        :param partition_values: Partition column -> value (as in the folder names, e.g. {"partition_date": "2025-01"}).
+        :param folder_path: The dataset root folder (defaults to the current folder path).
+        :return: The full paths of the matching files, or None if the dataset has no manifest.
+        """
+        folder_path = folder_path or self.folder_path
+        manifest = self.read_manifest(folder_path)
+        if manifest is None:
+            return None
+        partition_values = partition_values or {}
+        return [
+            os.path.join(folder_path, *entry["path"].split("/"))
+            for entry in manifest["files"]
+            if all(entry["partition"].get(key) == str(value) for key, value in partition_values.items())
+        ]
+
     def read_parquet_file(self, file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Read a single Parquet file into a Pandas DataFrame.
@@ -89,12 +150,18 @@ class ParquetReader:
 
         dataframes = []
 
-        for root, _, files in os.walk(self.folder_path):
-            parquet_files = [os.path.join(root, file) for file in files if file.endswith(self.file_extension)]
-            for file_path in parquet_files:
-                df = self.read_parquet_file(file_path, columns=columns)
-                if not df.empty:
-                    dataframes.append(df)
+        # The manifest lists the data files, so the folder tree does not have to be walked
+        parquet_files = self.list_manifest_files()
+        if parquet_files is None:
+            parquet_files = [
+                os.path.join(root, file)
+                for root, _, files in os.walk(self.folder_path)
+                for file in files if file.endswith(self.file_extension)
+            ]
+        for file_path in parquet_files:
+            df = self.read_parquet_file(file_path, columns=columns)
+            if not df.empty:
+                dataframes.append(df)
 
         if dataframes:
             return pd.concat(dataframes, ignore_index=True)
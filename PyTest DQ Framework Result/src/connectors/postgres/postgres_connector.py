@@ -1,8 +1,13 @@
-from typing import Optional
+import threading
+import uuid
+import weakref
+from typing import Dict, Iterator, Optional, Union
 import psycopg2
-from psycopg2.extensions import connection
+from psycopg2.extensions import connection, TRANSACTION_STATUS_IDLE
+from psycopg2.pool import ThreadedConnectionPool
 
 import pandas as pd
+import pyarrow as pa
 from pandas import DataFrame
 
 
@@ -96,3 +101,240 @@ class PostgresConnectorContextManager:
         except Exception as e:
             print(f'Failed to receive data from DB\nError: {e}\n')
             raise
+
+    def iter_data_sql(self, query: str, chunk_rows: int = 50000, params: Optional[dict] = None,
+                      as_arrow: bool = False) -> Iterator[Union[DataFrame, pa.RecordBatch]]:
+        """
+        Execute a SQL query through a named server-side cursor and yield the results in bounded chunks.
+
+        Unlike get_data_sql, the result set is never fully materialized on the client: PostgreSQL keeps
+        it on the server and at most `chunk_rows` rows are transferred and converted at a time, so result
+        sets larger than the available memory can be processed chunk by chunk.
+
+        Args:
+            query (str): The SQL query to execute.
+            chunk_rows (int): The maximum number of rows per yielded chunk. Defaults to 50000.
+            params (Optional[dict]): Query parameters. Defaults to None.
+            as_arrow (bool): Yield pyarrow RecordBatches instead of pandas DataFrames. Defaults to False.
+
+        Yields:
+            DataFrame or pa.RecordBatch: The next chunk of the query results.
+
+        Raises:
+            Exception: If the query execution fails, an exception is raised with the error message.
+        """
+        cursor = self.connection.cursor(name=f"iter_data_sql_{uuid.uuid4().hex}",
+                                        withhold=self.connection.autocommit)
+        cursor.itersize = chunk_rows
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                chunk = pd.DataFrame.from_records(rows, columns=[column.name for column in cursor.description])
+                yield pa.RecordBatch.from_pandas(chunk, preserve_index=False) if as_arrow else chunk
+        except Exception as e:
+            print(f'Failed to receive data from DB\nError: {e}\n')
+            raise
+        finally:
+            cursor.close()
+
+
+class PostgresConnectionPool:
+    """
+    A thread-safe pool of PostgreSQL connections shared by test fixtures.
+
+    Connections are checked out through PooledPostgresConnectorContextManager, which keeps the interface of
+    PostgresConnectorContextManager, so fixtures and tests can run queries concurrently on separate connections.
+    Every checked out connection is health-checked (broken connections are replaced), and session settings
+    such as work_mem or statement_timeout are applied once per physical connection.
+
+    Attributes:
+        host (str): Hostname of the PostgreSQL server.
+        port (int): Port number of the PostgreSQL server.
+        db (str): Name of the database to connect to.
+        user (str): Username for authentication.
+        password (str): Password for authentication.
+        min_size (int): The number of connections opened upfront.
+        max_size (int): The maximum number of connections.
+        session_settings (Dict[str, str]): Settings applied to every pooled connection.
+        pool (Optional[ThreadedConnectionPool]): The underlying psycopg2 pool, None until opened.
+    """
+
+    def __init__(self, db_host: str, db_name: str, db_user: Optional[str] = None, db_password: Optional[str] = None,
+                 db_port: str = '5432', min_size: int = 1, max_size: int = 4,
+                 session_settings: Optional[Dict[str, str]] = None):
+        """
+        Initialize the connection pool settings.
+
+        Args:
+            min_size (int): The number of connections opened upfront. Defaults to 1.
+            max_size (int): The maximum number of connections. Defaults to 4.
+            session_settings (Optional[Dict[str, str]]): Settings applied to every pooled connection
+                                                         (e.g. {'work_mem': '64MB'}). Defaults to None.
+        """
+        self.host = db_host
+        self.port = db_port
+        self.db = db_name
+        self.user = db_user
+        self.password = db_password
+        self.min_size = min_size
+        self.max_size = max_size
+        self.session_settings = session_settings or {}
+        self.pool: Optional[ThreadedConnectionPool] = None
+        self._configured = weakref.WeakSet()
+        self._lock = threading.Lock()
+        # ThreadedConnectionPool raises PoolError when exhausted; callers wait for a free connection instead
+        self._slots = threading.BoundedSemaphore(self.max_size)
+
+    def open(self) -> 'PostgresConnectionPool':
+        """
+        Open the pool and its initial connections.
+
+        Returns:
+            PostgresConnectionPool: The pool itself.
+        """
+        self.pool = ThreadedConnectionPool(
+            self.min_size,
+            self.max_size,
+            host=self.host,
+            port=self.port,
+            database=self.db,
+            user=self.user,
+            password=self.password
+        )
+        return self
+
+    def close(self):
+        """
+        Close every connection of the pool.
+        """
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+    def _prepare(self, conn: connection):
+        """
+        Health-check a connection and apply the session settings if it is new.
+
+        Args:
+            conn (connection): The connection to prepare.
+
+        Raises:
+            psycopg2.Error: If the connection is not usable.
+        """
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            if conn not in self._configured:
+                for name, value in self.session_settings.items():
+                    cursor.execute("SELECT set_config(%s, %s, false)", (name, str(value)))
+                with self._lock:
+                    self._configured.add(conn)
+        conn.autocommit = False
+
+    def acquire(self) -> connection:
+        """
+        Check out a healthy connection, replacing broken ones.
+
+        Blocks while max_size connections are checked out, until one of them is released.
+        A connection that fails to prepare is closed and returned to the pool; broken connections
+        (OperationalError, InterfaceError) are replaced, any other error (e.g. an invalid session
+        setting) is raised after the connection and its slot were given back.
+
+        Returns:
+            connection: A ready to use database connection.
+        """
+        self._slots.acquire()
+        try:
+            for _ in range(self.max_size + 1):
+                conn = self.pool.getconn()
+                try:
+                    self._prepare(conn)
+                    return conn
+                except BaseException as e:
+                    self.pool.putconn(conn, close=True)
+                    if not isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+                        raise
+            raise psycopg2.OperationalError("No healthy connection could be checked out of the pool")
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: connection):
+        """
+        Return a connection to the pool, rolling back any transaction left open.
+
+        Args:
+            conn (connection): The connection to return.
+        """
+        try:
+            if conn.closed:
+                self.pool.putconn(conn, close=True)
+                return
+            if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    self.pool.putconn(conn, close=True)
+                    return
+            self.pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    def connection(self) -> 'PooledPostgresConnectorContextManager':
+        """
+        Create a context manager that checks a connection out of the pool.
+
+        Returns:
+            PooledPostgresConnectorContextManager: The context manager.
+        """
+        return PooledPostgresConnectorContextManager(self)
+
+
+class PooledPostgresConnectorContextManager(PostgresConnectorContextManager):
+    """
+    PostgreSQL Database Context Manager backed by a connection pool.
+
+    Behaves like PostgresConnectorContextManager, but checks a connection out of a PostgresConnectionPool
+    on enter and returns it on exit instead of opening and closing a new connection.
+
+    Attributes:
+        pool (PostgresConnectionPool): The pool connections are checked out from.
+    """
+
+    def __init__(self, pool: PostgresConnectionPool):
+        """
+        Initialize the pooled database context manager.
+
+        Args:
+            pool (PostgresConnectionPool): The pool connections are checked out from.
+        """
+        super().__init__(db_host=pool.host, db_name=pool.db, db_user=pool.user, db_password=pool.password,
+                         db_port=pool.port)
+        self.pool = pool
+
+    def __enter__(self):
+        """
+        Check a connection out of the pool.
+
+        Returns:
+            PooledPostgresConnectorContextManager: The context manager instance with an active connection.
+        """
+        self.connection = self.pool.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        """
+        Return the connection to the pool.
+        """
+        if self.connection:
+            self.pool.release(self.connection)
+            self.connection = None
@@ -32,15 +32,54 @@ class DataQualityLibrary:
             f"df2 has {len(df2)} rows (difference: {count_diff})."
         )
 
+    @staticmethod
+    def row_hashes(df1, df2):
+        """
+        Hash every row of two DataFrames with the same columns, so that equal rows get equal hashes in both.
+        Each column is factorized jointly over both DataFrames (values compare as in drop_duplicates,
+        e.g. Decimal('1.50') == 1.5 and NaN == NaN), then the integer codes are hashed row-wise in one pass.
+        """
+        codes1, codes2 = {}, {}
+        for column in df1.columns:
+            codes, _ = pd.factorize(pd.concat([df1[column], df2[column]], ignore_index=True))
+            codes1[column], codes2[column] = codes[:len(df1)], codes[len(df1):]
+        hash1 = pd.util.hash_pandas_object(pd.DataFrame(codes1, index=range(len(df1))), index=False)
+        hash2 = pd.util.hash_pandas_object(pd.DataFrame(codes2, index=range(len(df2))), index=False)
+        return hash1, hash2
+
+    @staticmethod
+    def data_completeness_diff(df1, df2):
+        """
+        Compare two DataFrames as multisets of rows (ignoring row order, counting duplicates) in linear time.
+        Returns (rows of df1 missing in df2, rows of df2 missing in df1); every row is listed once with a
+        'missing_count' column telling how many of its copies are missing.
+        """
+        hash1, hash2 = DataQualityLibrary.row_hashes(df1, df2[df1.columns])
+        count_difference = hash1.value_counts().sub(hash2.value_counts(), fill_value=0)
+
+        def missing_rows(df, hashes, differences):
+            mask = (~hashes.duplicated() & hashes.isin(differences.index)).to_numpy()
+            missing_count = hashes[mask].map(differences).abs().astype('int64').to_numpy()
+            return df[mask].assign(missing_count=missing_count)
+
+        return (missing_rows(df1, hash1, count_difference[count_difference > 0]),
+                missing_rows(df2[df1.columns], hash2, count_difference[count_difference < 0]))
+
     @staticmethod
     def check_data_completeness(df1, df2):
         """
-        Verify that two DataFrames contain the same data (ignoring row order).
+        Verify that two DataFrames contain the same data (ignoring row order), including how many times each
+        row occurs. Rows are compared by hash multiplicities, without sorting or concatenating the DataFrames.
         """
-        df1_sorted = df1.sort_values(by=df1.columns.tolist()).reset_index(drop=True)
-        df2_sorted = df2.sort_values(by=df2.columns.tolist()).reset_index(drop=True)
-        df_diff = pd.concat([df1_sorted, df2_sorted]).drop_duplicates(keep=False)
-        assert df_diff.empty, f"Data completeness check failed. Differences:\n{df_diff}"
+        assert set(df1.columns) == set(df2.columns), (
+            f"Data completeness check failed. Columns differ: {sorted(df1.columns)} != {sorted(df2.columns)}"
+        )
+        missing, extra = DataQualityLibrary.data_completeness_diff(df1, df2)
+        assert missing.empty and extra.empty, (
+            f"Data completeness check failed. "
+            f"Rows of df1 missing in df2 ({int(missing['missing_count'].sum())}):\n{missing}\n"
+            f"Rows of df2 missing in df1 ({int(extra['missing_count'].sum())}):\n{extra}"
+        )
 
     @staticmethod
     def check_dataset_is_empty(df):
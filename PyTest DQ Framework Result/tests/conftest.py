@@ -1,5 +1,5 @@
 import pytest
-from src.connectors.postgres.postgres_connector import PostgresConnectorContextManager
+from src.connectors.postgres.postgres_connector import PostgresConnectionPool
 from src.data_quality.data_quality_validation_library import DataQualityLibrary
 from src.connectors.file_system.parquet_reader import ParquetReader
 
@@ -13,6 +13,11 @@ def pytest_addoption(parser):
     parser.addoption("--db_port", action="store", default="5434", help="Database port")
     parser.addoption("--db_user", action="store", default=None, help="Database user")
     parser.addoption("--db_password", action="store", default=None, help="Database password")
+    parser.addoption("--db_pool_min_size", action="store", default="1", help="Minimum number of pooled connections")
+    parser.addoption("--db_pool_max_size", action="store", default="4", help="Maximum number of pooled connections")
+    parser.addoption("--db_work_mem", action="store", default=None, help="work_mem of pooled connections")
+    parser.addoption("--db_statement_timeout", action="store", default=None,
+                     help="statement_timeout of pooled connections")
 
 
 def pytest_configure(config):
@@ -28,25 +33,55 @@ def pytest_configure(config):
 
 
 @pytest.fixture(scope='session')
-def db_connection(request):
+def db_pool(request):
     """
-    Establishes a connection to the database using the provided command-line options.
-    Yields a PostgresConnector instance for use in tests.
+    Opens a pool of database connections using the provided command-line options.
+    Yields a PostgresConnectionPool shared by all database fixtures of the session.
     """
     db_host = request.config.getoption("--db_host")
     db_name = request.config.getoption("--db_name")
     db_port = request.config.getoption("--db_port")
     db_user = request.config.getoption("--db_user")
     db_password = request.config.getoption("--db_password")
+    session_settings = {}
+    if request.config.getoption("--db_work_mem"):
+        session_settings['work_mem'] = request.config.getoption("--db_work_mem")
+    if request.config.getoption("--db_statement_timeout"):
+        session_settings['statement_timeout'] = request.config.getoption("--db_statement_timeout")
 
     try:
-        with PostgresConnectorContextManager(db_user=db_user, db_password=db_password, db_host=db_host,
-                                             db_name=db_name, db_port=db_port) as db_connector:
+        with PostgresConnectionPool(db_user=db_user, db_password=db_password, db_host=db_host, db_name=db_name,
+                                    db_port=db_port,
+                                    min_size=int(request.config.getoption("--db_pool_min_size")),
+                                    max_size=int(request.config.getoption("--db_pool_max_size")),
+                                    session_settings=session_settings) as pool:
+            yield pool
+    except Exception as e:
+        pytest.fail(f"Failed to initialize PostgresConnectionPool: {e}")
+
+
+@pytest.fixture(scope='session')
+def db_connection(db_pool):
+    """
+    Checks a connection out of the session pool.
+    Yields a PostgresConnector instance for use in tests.
+    """
+    try:
+        with db_pool.connection() as db_connector:
             yield db_connector
     except Exception as e:
         pytest.fail(f"Failed to initialize PostgresConnectorContextManager: {e}")
 
 
+@pytest.fixture
+def db_connection_factory(db_pool):
+    """
+    Provides the factory of pooled connections for tests that run queries concurrently.
+    Every call returns a context manager that checks its own connection out of the session pool.
+    """
+    return db_pool.connection
+
+
 @pytest.fixture(scope='session')
 def parquet_reader(request):
     """
@@ -1,5 +1,8 @@
 from selenium.webdriver.common.by import By
 import pandas as pd
+from collections import Counter
+import hashlib
+import json
 import os
 
 
@@ -43,6 +46,58 @@ def read_parquet_data(folder_path, filter_date=None):
     return df
 
 
+def read_manifest(folder_path):
+    """
+    Reads the _manifest.json written next to a parquet dataset
+    (file paths, partition values, row counts, per-column min/max).
+    """
+    manifest_path = os.path.join(folder_path, "_manifest.json")
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"Manifest does not exist: {manifest_path}")
+    with open(manifest_path) as manifest_file:
+        return json.load(manifest_file)
+
+
+def manifest_is_current(folder_path, manifest):
+    """
+    Checks that every file listed by the manifest still exists with the recorded size.
+    """
+    for entry in manifest["files"]:
+        file_path = os.path.join(folder_path, *entry["path"].split("/"))
+        if not os.path.exists(file_path) or os.path.getsize(file_path) != entry["size_bytes"]:
+            return False
+    return True
+
+
+def manifest_row_count(folder_path, filter_date=None):
+    """
+    Counts rows of a parquet dataset from its manifest.
+    Optionally counts only rows with visit_date >= filter_date: files entirely
+    before or after filter_date are answered from their min/max statistics,
+    only files spanning filter_date are read.
+    Without an up-to-date manifest the dataset itself is read and counted.
+    """
+    manifest_path = os.path.join(folder_path, "_manifest.json")
+    manifest = read_manifest(folder_path) if os.path.exists(manifest_path) else None
+    if manifest is None or not manifest_is_current(folder_path, manifest):
+        return len(read_parquet_data(folder_path, filter_date))
+    if filter_date is None:
+        return manifest["num_rows"]
+
+    filter_date = pd.Timestamp(filter_date)
+    count = 0
+    for entry in manifest["files"]:
+        visit_date = entry["columns"].get("visit_date", {})
+        if visit_date.get("max") is not None and pd.Timestamp(visit_date["max"]) < filter_date:
+            continue
+        if visit_date.get("min") is not None and pd.Timestamp(visit_date["min"]) >= filter_date:
+            count += entry["num_rows"]
+            continue
+        df = pd.read_parquet(os.path.join(folder_path, *entry["path"].split("/")), columns=["visit_date"])
+        count += int((pd.to_datetime(df["visit_date"]) >= filter_date).sum())
+    return count
+
+
 def compare_dataframes(df1, df2):
     """
     Compare DataFrames by values. Returns (match_bool, differences_as_string)
@@ -54,4 +109,74 @@ def compare_dataframes(df1, df2):
         return True, ""
     except AssertionError as e:
         # Differences will be described in the AssertionError message
-        return False, str(e)
\ No newline at end of file
+        return False, str(e)
+
+
+def read_report_sidecar(report_path):
+    """
+    Reads the data sidecar written next to a report (report.html -> report.data.json)
+    and verifies its checksum. Returns the sidecar (table columns/rows, doughnut labels/values).
+    """
+    sidecar_path = os.path.splitext(report_path)[0] + ".data.json"
+    if not os.path.exists(sidecar_path):
+        raise FileNotFoundError(f"Report sidecar does not exist: {sidecar_path}")
+    with open(sidecar_path) as sidecar_file:
+        sidecar = json.load(sidecar_file)
+    data = {"table": sidecar["table"], "doughnut": sidecar["doughnut"]}
+    checksum = hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+    if checksum != sidecar["checksum"]:
+        raise ValueError(f"Report sidecar checksum mismatch: {sidecar_path}")
+    return sidecar
+
+
+def cell_text(value):
+    """
+    Formats a sidecar value the way the plotly table renders it (12.0 -> "12").
+    """
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+def compare_rows(expected_rows, actual_rows, limit=20):
+    """
+    Compare two lists of rows as multisets (order-insensitive, duplicate counts matter).
+    Returns (match_bool, differences_as_string)
+    """
+    expected, actual = Counter(map(tuple, expected_rows)), Counter(map(tuple, actual_rows))
+    missing, extra = list((expected - actual).elements()), list((actual - expected).elements())
+    if not missing and not extra:
+        return True, ""
+    return False, (f"{len(missing)} missing rows: {missing[:limit]}\n"
+                   f"{len(extra)} extra rows: {extra[:limit]}")
+
+
+def compare_sidecar_with_parquet(report_path, folder_path, filter_date=None):
+    """
+    Compare the table rows of the report sidecar with parquet data, without a browser.
+    Returns (match_bool, differences_as_string)
+    """
+    sidecar = read_report_sidecar(report_path)
+    df = read_parquet_data(folder_path, filter_date)
+    parquet_rows = zip(
+        df["facility_type"].astype(str),
+        pd.to_datetime(df["visit_date"]).dt.strftime("%Y-%m-%d"),
+        df["avg_time_spent"].astype(float)
+    )
+    return compare_rows(parquet_rows, sidecar["table"]["rows"])
+
+
+def compare_sidecar_with_html_table(report_path, df_html):
+    """
+    Confirms the report sidecar matches the table read from the rendered page (see table_read_data).
+    A paginated report shows only its first page when opened, so only the sidecar rows of page 1 are compared.
+    Returns (match_bool, differences_as_string)
+    """
+    sidecar = read_report_sidecar(report_path)
+    columns = sidecar["table"]["columns"]
+    if list(df_html.columns) != columns:
+        return False, f"Columns differ: {list(df_html.columns)} != {columns}"
+    page_row_counts = sidecar["table"].get("page_row_counts") or [len(sidecar["table"]["rows"])]
+    first_page = sidecar["table"]["rows"][:page_row_counts[0]]
+    sidecar_rows = [[cell_text(value) for value in row] for row in first_page]
+    return compare_rows(sidecar_rows, df_html.values.tolist())
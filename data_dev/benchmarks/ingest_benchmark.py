@@ -0,0 +1,88 @@
+"""
+Rows/sec comparison of the GeneratedDataLoader ingest modes ('insert' vs 'copy').
+
+Every mode writes the same generated dataset into the src layer tables inside a transaction
+that is rolled back afterwards, so the benchmark leaves the database untouched.
+
+Usage (from the repository root):
+    python -m data_dev.benchmarks.ingest_benchmark
+"""
+import time
+
+from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+from data_dev.src.data.data_generator import DataGenerator
+from data_dev.src.data.inject_generated_data_to_src import (
+    GeneratedDataLoader,
+    FACILITIES_COLUMNS,
+    PATIENTS_COLUMNS,
+    VISITS_COLUMNS
+)
+from data_dev.queries import (
+    CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY,
+    CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY,
+    CREATE_SRC_GENERATED_VISITS_TABLE_QUERY,
+    INSERT_SRC_GENERATED_FACILITIES_QUERY,
+    INSERT_SRC_GENERATED_PATIENTS_QUERY,
+    INSERT_SRC_GENERATED_VISITS_QUERY,
+    COPY_SRC_GENERATED_FACILITIES_QUERY,
+    COPY_SRC_GENERATED_PATIENTS_QUERY,
+    COPY_SRC_GENERATED_VISITS_QUERY
+)
+from data_dev.config import ingest_config
+
+MODES = ['insert', 'copy']
+
+
+def run_mode(conn, dg, mode):
+    """
+    Writes the generated data with the given ingest mode and rolls the transaction back.
+
+    Args:
+        conn: A psycopg2 database connection object.
+        dg (DataGenerator): A data generator with already generated data.
+        mode (str): The ingest mode to benchmark.
+
+    Returns:
+        dict: Row counts and elapsed seconds per table.
+    """
+    loader = GeneratedDataLoader(conn, mode=mode)
+    tables = [
+        ('src_generated_facilities', dg.get_facilities(), INSERT_SRC_GENERATED_FACILITIES_QUERY,
+         COPY_SRC_GENERATED_FACILITIES_QUERY, FACILITIES_COLUMNS),
+        ('src_generated_patients', dg.get_patients(), INSERT_SRC_GENERATED_PATIENTS_QUERY,
+         COPY_SRC_GENERATED_PATIENTS_QUERY, PATIENTS_COLUMNS),
+        ('src_generated_visits', dg.get_visits(), INSERT_SRC_GENERATED_VISITS_QUERY,
+         COPY_SRC_GENERATED_VISITS_QUERY, VISITS_COLUMNS),
+    ]
+    results = {}
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY)
+        cursor.execute(CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY)
+        cursor.execute(CREATE_SRC_GENERATED_VISITS_TABLE_QUERY)
+        for table_name, data, insert_query, copy_query, columns in tables:
+            started = time.perf_counter()
+            row_count = loader.write_rows(cursor=cursor, data=data, insert_query=insert_query,
+                                          copy_query=copy_query, columns=columns)
+            results[table_name] = (row_count, time.perf_counter() - started)
+    finally:
+        conn.rollback()
+        cursor.close()
+    return results
+
+
+def main():
+    dg = DataGenerator()
+    dg.generate_data()
+    with PostgresConnectorContextManager() as connection_object:
+        conn = connection_object.get_connection()
+        print(f"Ingest benchmark (COPY batch size: {ingest_config.batch_size})")
+        print(f"{'mode':<8}{'table':<28}{'rows':>10}{'seconds':>12}{'rows/sec':>14}")
+        for mode in MODES:
+            for table_name, (row_count, elapsed) in run_mode(conn, dg, mode).items():
+                rows_per_sec = row_count / elapsed if elapsed else float('inf')
+                print(f"{mode:<8}{table_name:<28}{row_count:>10}{elapsed:>12.3f}{rows_per_sec:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
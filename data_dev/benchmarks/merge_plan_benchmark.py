@@ -0,0 +1,81 @@
+"""
+EXPLAIN ANALYZE timings of the 3NF visits load strategies (MERGE vs INSERT ... ON CONFLICT DO NOTHING).
+
+For every sample size the latest N rows of src_generated_visits are copied into a temporary table that
+shadows src_generated_visits, and both strategies are executed with EXPLAIN (ANALYZE, FORMAT JSON):
+- 'reload': the sampled visits are already present in the visits table (every row hits the unique key);
+- 'fresh': the sampled visits are deleted from the visits table first (every row is inserted).
+Everything runs inside transactions that are rolled back, so the database is left untouched; the unique keys
+ON CONFLICT needs are created inside the 'on_conflict' transactions when the schema was provisioned for MERGE.
+
+Usage (from the repository root, after the pipeline has loaded the 3NF layer):
+    python -m data_dev.benchmarks.merge_plan_benchmark
+"""
+from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+from data_dev.src.data.schema_provisioner import SchemaProvisioner
+from data_dev.queries import MERGE_VISITS_INCREMENTAL_QUERY, INSERT_VISITS_ON_CONFLICT_QUERY
+
+SAMPLE_SIZES = [1000, 10000, 100000]
+
+STRATEGIES = {
+    'merge': MERGE_VISITS_INCREMENTAL_QUERY,
+    'on_conflict': INSERT_VISITS_ON_CONFLICT_QUERY
+}
+
+CREATE_SAMPLE_QUERY = """
+CREATE TEMPORARY TABLE src_generated_visits ON COMMIT DROP AS
+SELECT * FROM public.src_generated_visits
+ORDER BY visit_timestamp DESC
+LIMIT %(sample_size)s;
+"""
+
+DELETE_SAMPLED_VISITS_QUERY = """
+DELETE FROM visits WHERE visit_timestamp >= (SELECT MIN(visit_timestamp) FROM src_generated_visits);
+"""
+
+
+def explain_analyze(conn, strategy, sample_size, scenario):
+    """
+    Runs a load query with EXPLAIN ANALYZE on a sample of the source visits and rolls it back.
+
+    Args:
+        conn: A psycopg2 database connection object.
+        strategy (str): The visits load strategy ('merge' or 'on_conflict').
+        sample_size (int): The number of latest source visits to load.
+        scenario (str): 'reload' or 'fresh'.
+
+    Returns:
+        Tuple[float, float]: Planning time (ms) and execution time (ms).
+    """
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_SAMPLE_QUERY, {'sample_size': sample_size})
+        cursor.execute("ANALYZE src_generated_visits")
+        if scenario == 'fresh':
+            cursor.execute(DELETE_SAMPLED_VISITS_QUERY)
+        provisioner = SchemaProvisioner(conn, strategy)
+        provisioner.provision_nf3(cursor)
+        provisioner.require_unique_keys(cursor)
+        cursor.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + STRATEGIES[strategy],
+                       {'lower_bound': '-infinity', 'upper_bound': 'infinity'})
+        plan = cursor.fetchone()[0][0]
+        return plan['Planning Time'], plan['Execution Time']
+    finally:
+        conn.rollback()
+        cursor.close()
+
+
+def main():
+    with PostgresConnectorContextManager() as connection_object:
+        conn = connection_object.get_connection()
+        SchemaProvisioner(conn).provision()
+        print(f"{'rows':>8}  {'scenario':<9}{'strategy':<13}{'planning ms':>13}{'execution ms':>14}")
+        for sample_size in SAMPLE_SIZES:
+            for scenario in ('reload', 'fresh'):
+                for strategy in STRATEGIES:
+                    planning, execution = explain_analyze(conn, strategy, sample_size, scenario)
+                    print(f"{sample_size:>8}  {scenario:<9}{strategy:<13}{planning:>13.2f}{execution:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
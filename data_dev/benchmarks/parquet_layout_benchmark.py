@@ -0,0 +1,121 @@
+"""
+File size, write time and filtered-read time of the Parquet datasets for several write profiles.
+
+Every transform result is read once (in 'copy_arrow' mode) and written with each profile into a temporary
+directory, partitioned like the exported dataset. The read benchmark mimics the readers (ReportGenerator,
+DQ tests, Robot helper): one facility - over the last READ_WINDOW_DAYS days for the datasets with a
+visit_date - so well-sorted row groups with statistics can be skipped.
+
+Usage (from the repository root, after the pipeline has loaded the 3NF layer):
+    python -m data_dev.benchmarks.parquet_layout_benchmark
+"""
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from data_dev.config import ParquetWriteProfile, parquet_storage_config
+from data_dev.queries import (
+    TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL,
+    TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
+    TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL
+)
+from data_dev.src.connectors.postgre_connector import PostgresConnectorContextManager
+from data_dev.src.data.parquet_loader import (
+    LoadParquet,
+    FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA,
+    PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA,
+    FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA
+)
+
+READ_WINDOW_DAYS = 30
+
+READ_REPEATS = 5
+
+# (dataset name, transform query, result schema, partition column preparation, partition column,
+#  facility column, sort columns)
+DATASETS = [
+    ('facility_type_avg_time_spent_per_visit_date', TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL,
+     FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA, LoadParquet.add_partition_date_table, 'partition_date',
+     'facility_type', ['visit_date', 'facility_type']),
+    ('patient_sum_treatment_cost_per_facility_type', TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
+     PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA, LoadParquet.add_facility_type_partition_table,
+     'facility_type_partition', 'facility_type', ['full_name']),
+    ('facility_name_min_time_spent_per_visit_date', TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
+     FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA, LoadParquet.add_partition_date_table, 'partition_date',
+     'facility_name', ['visit_date', 'facility_name'])
+]
+
+
+def profiles(dataset_name, facility_column, sort_columns):
+    """
+    Returns the write profiles to compare for a dataset.
+
+    Args:
+        dataset_name (str): The dataset name.
+        facility_column (str): The low-cardinality facility column of the dataset.
+        sort_columns (List[str]): The columns the readers filter on, in sort order.
+
+    Returns:
+        Dict[str, ParquetWriteProfile]: The profiles by name.
+    """
+    return {
+        'pyarrow defaults': ParquetWriteProfile(),
+        'zstd': ParquetWriteProfile(compression='zstd'),
+        'zstd sorted': ParquetWriteProfile(compression='zstd', sort_by=sort_columns),
+        'zstd sorted 4k groups': ParquetWriteProfile(compression='zstd', use_dictionary=[facility_column],
+                                                     sort_by=sort_columns, row_group_size=4096),
+        'no statistics': ParquetWriteProfile(write_statistics=False),
+        'configured': parquet_storage_config.write_profiles.get(dataset_name, ParquetWriteProfile())
+    }
+
+
+def dataset_size(path):
+    """
+    Returns the total size in bytes of the files under a directory.
+    """
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def filtered_read_time(path, filters):
+    """
+    Returns the mean time in seconds of reading the rows matching the filters.
+    """
+    started = time.perf_counter()
+    for _ in range(READ_REPEATS):
+        pq.read_table(path, filters=filters)
+    return (time.perf_counter() - started) / READ_REPEATS
+
+
+def main():
+    work_dir = tempfile.mkdtemp(prefix='parquet_layout_benchmark_')
+    try:
+        with PostgresConnectorContextManager() as connection_object:
+            print(f"{'dataset':<46}{'profile':<24}{'size KiB':>10}{'write s':>9}{'read ms':>9}")
+            for (dataset_name, query, schema, prepare_table, partition_column, facility_column,
+                 sort_columns) in DATASETS:
+                table = prepare_table(connection_object.copy_data_arrow(query, schema))
+                if table.num_rows == 0:
+                    continue
+                filters = [(facility_column, '==', table[facility_column][0].as_py())]
+                if 'visit_date' in table.column_names:
+                    since = pc.max(table['visit_date']).as_py() - timedelta(days=READ_WINDOW_DAYS)
+                    filters.append(('visit_date', '>=', since))
+                for profile_name, write_profile in profiles(dataset_name, facility_column, sort_columns).items():
+                    path = os.path.join(work_dir, dataset_name, profile_name.replace(' ', '_'))
+                    started = time.perf_counter()
+                    LoadParquet.table_to_parquet(table, path, [partition_column], write_profile)
+                    write_time = time.perf_counter() - started
+                    read_time = filtered_read_time(path, filters)
+                    print(f"{dataset_name:<46}{profile_name:<24}{dataset_size(path) / 1024:>10.1f}"
+                          f"{write_time:>9.2f}{read_time * 1000:>9.1f}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 
 
@@ -22,6 +22,22 @@ class PostgresConfig:
     host: str
 
 
+@dataclass
+class ConnectionPoolConfig:
+    """
+    A dataclass to store PostgreSQL connection pool settings.
+
+    Attributes:
+        min_size (int): The number of connections opened when the pool is created.
+        max_size (int): The maximum number of connections the pool may open.
+        session_settings (Dict[str, str]): Settings applied once to every pooled connection
+                                           (e.g. {'work_mem': '64MB', 'statement_timeout': '0'}).
+    """
+    min_size: int
+    max_size: int
+    session_settings: Dict[str, str]
+
+
 @dataclass
 class DataGeneratorConfig:
     """
@@ -34,6 +50,14 @@ class DataGeneratorConfig:
         date_format (str): The format of the date strings (e.g., '%Y-%m-%d').
         facility_types (List[str]): A list of facility types (e.g., "Hospital", "Clinic").
         visits_per_day (Tuple[int, int]): A tuple specifying the range (min, max) of visits per day.
+        generation_mode (str): 'rows' generates visits as a list of dicts, 'columnar' builds whole columns
+                               at once with NumPy and returns them as a pyarrow Table.
+        seed (Optional[int]): The base seed. When set, a given (seed, shards) pair always produces identical data.
+        shards (int): The number of shards (processes) the patient id range and the visit date range are split into.
+        faker_pool_sizes (Optional[Dict[str, int]]): Number of pre-sampled values per Faker provider
+                                                     ('first_name', 'last_name', 'address', 'company'),
+                                                     i.e. the cardinality of each field. None calls Faker per entity.
+        faker_pool_cache_path (Optional[str]): JSON file the Faker value pools are cached in between runs.
     """
     num_patients: int
     start_date: str
@@ -41,6 +65,58 @@ class DataGeneratorConfig:
     date_format: str
     facility_types: List[str]
     visits_per_day: Tuple[int, int]
+    generation_mode: str = 'rows'
+    seed: Optional[int] = None
+    shards: int = 1
+    faker_pool_sizes: Optional[Dict[str, int]] = None
+    faker_pool_cache_path: Optional[str] = None
+
+
+@dataclass
+class IngestConfig:
+    """
+    IngestConfig is a configuration class used to define how generated data is written into the src layer.
+
+    Attributes:
+        mode (str): The ingest mode: 'copy' streams rows through PostgreSQL COPY FROM STDIN,
+                    'insert' executes one INSERT statement per row (legacy fallback).
+        batch_size (int): The number of rows sent to PostgreSQL by a single COPY statement.
+        streaming (bool): Generate visits in date-range batches on a producer thread while the
+                          previous batch is being written, instead of generating everything upfront.
+        stream_batch_days (int): The number of days of visits generated per streamed batch.
+        stream_queue_size (int): The maximum number of generated batches waiting to be written.
+    """
+    mode: str
+    batch_size: int
+    streaming: bool = False
+    stream_batch_days: int = 365
+    stream_queue_size: int = 2
+
+
+@dataclass
+class ParquetWriteProfile:
+    """
+    A dataclass to store the physical layout of the Parquet files of a dataset.
+
+    Attributes:
+        row_group_size (Optional[int]): The maximum number of rows per row group (pyarrow default if None).
+        compression (str): The compression codec ('snappy', 'zstd', 'gzip', 'brotli', 'lz4' or 'none').
+        compression_level (Optional[int]): The codec-specific compression level (codec default if None).
+        use_dictionary (Union[bool, List[str]]): Dictionary-encode all columns (True), none (False)
+                                                 or only the listed (low-cardinality) columns.
+        sort_by (Optional[List[str]]): The columns rows are sorted by within every partition, so that row group
+                                       statistics let readers filtering on them skip most of the data.
+        write_statistics (Union[bool, List[str]]): Write min/max/null count statistics for all columns (True),
+                                                   none (False) or only the listed columns.
+        data_page_size (Optional[int]): The target size of data pages in bytes (pyarrow default if None).
+    """
+    row_group_size: Optional[int] = None
+    compression: str = 'snappy'
+    compression_level: Optional[int] = None
+    use_dictionary: Union[bool, List[str]] = True
+    sort_by: Optional[List[str]] = None
+    write_statistics: Union[bool, List[str]] = True
+    data_page_size: Optional[int] = None
 
 
 @dataclass
@@ -55,10 +131,32 @@ class ParquetStorageConfig:
         The file system path where Parquet files for patient_sum_treatment_cost_per_facility_type will be stored.
         storage_path_facility_name_min_time_spent_per_visit_date (str):
         The file system path where Parquet files for facility_name_min_time_spent_per_visit_date will be stored.
+        read_mode (str): How transform results are read from PostgreSQL: 'read_sql' loads the whole result
+        with pandas, 'server_cursor' streams it in chunks of chunk_rows rows through a server-side cursor,
+        'copy_arrow' runs COPY (query) TO STDOUT and parses the CSV stream straight into a typed pyarrow Table.
+        chunk_rows (int): The number of rows per chunk in 'server_cursor' read mode.
+        concurrent (bool): Run the Parquet stages of the pipeline (main.py) in parallel, each one on its own pooled
+                           connection (up to pipeline_config.max_workers stages at a time); otherwise they run
+                           one after another.
+        incremental (bool): Re-aggregate and rewrite only the partitions whose source rows changed since
+        the previous export, detected by per-partition row count/checksum queries.
+        write_profiles (Dict[str, ParquetWriteProfile]): The physical layout of every dataset, by dataset name
+        (the last component of its storage path). Datasets without a profile use ParquetWriteProfile().
+        use_summary_tables (bool): Read the transforms from the summary tables maintained by NF3Loader
+        (load_config.summary_tables) instead of aggregating the visits fact table.
+        write_manifest (bool): Write _metadata, _common_metadata and _manifest.json (file paths, partition values,
+        row counts, null counts and min/max per column) into every dataset after it is exported.
     """
     storage_path_facility_type_avg_time_spent_per_visit_date: str
     storage_path_patient_sum_treatment_cost_per_facility_type: str
     storage_path_facility_name_min_time_spent_per_visit_date: str
+    read_mode: str = 'read_sql'
+    chunk_rows: int = 100000
+    concurrent: bool = False
+    incremental: bool = False
+    write_profiles: Dict[str, ParquetWriteProfile] = field(default_factory=dict)
+    use_summary_tables: bool = False
+    write_manifest: bool = True
 
 
 @dataclass
@@ -70,8 +168,70 @@ class LoadConfig:
         last_date (str): The last date for which data should be successfully loaded.
                          This is typically used to track the progress of incremental data loads.
                          The date should be in the format 'YYYY-MM-DD'.
+        incremental (bool): Merge only source rows past the high-water mark recorded in the load_state table
+                            (bounded by date_scope) instead of the whole src_generated_* tables.
+        strategy (str): The 3NF load statement: 'merge' (MERGE INTO; duplicate source visits are all loaded)
+                        or 'on_conflict' (INSERT ... ON CONFLICT DO NOTHING on unique natural keys, which
+                        keeps one row per key; the load fails if the keys cannot be created).
+        partitioned_visits (bool): Create visits and src_generated_visits as tables range-partitioned by month
+                                   and load visits partition by partition. Only applies to newly created tables.
+        retention_months (Optional[int]): When set (with partitioned_visits), visits partitions older than this
+                                          number of months before date_scope are detached after each load.
+        summary_tables (bool): Maintain the daily_facility_visit_summary and patient_facility_cost_summary
+                               aggregate tables incrementally over the window of every load.
     """
     date_scope: str
+    incremental: bool = False
+    strategy: str = 'merge'
+    partitioned_visits: bool = False
+    retention_months: Optional[int] = None
+    summary_tables: bool = False
+
+
+@dataclass
+class PipelineConfig:
+    """
+    A dataclass to store the settings of the pipeline stage scheduler.
+
+    Attributes:
+        max_workers (int): The number of independent stages running at the same time.
+        checkpoint_path (str): The JSON file recording which stages completed against which input fingerprint.
+    """
+    max_workers: int
+    checkpoint_path: str
+
+
+@dataclass
+class MetricsConfig:
+    """
+    A dataclass to store the settings of the pipeline instrumentation.
+
+    Attributes:
+        enabled (bool): Record stage and SQL spans and write a run record at the end of every run.
+        run_record_path (str): The directory the JSON run records are written to (next to the report).
+        max_sql_text_length (int): The number of characters of a SQL statement kept in its span.
+        max_sql_spans (int): The maximum number of distinct SQL statements recorded per run; executions of
+                             further statements are counted in one '(other statements)' span per stage.
+    """
+    enabled: bool
+    run_record_path: str
+    max_sql_text_length: int = 200
+    max_sql_spans: int = 1000
+
+
+@dataclass
+class ReportView:
+    """
+    A dataclass to store one report of the batched rendering (ReportGenerator.generate_view_reports).
+
+    Attributes:
+        name (str): The name of the view; the report is written as report_<name>.html.
+        window_days (int): The number of days before the last loaded date the view shows (6 = one week).
+        facility_types (Optional[List[str]]): The facility types shown, or None for all of them.
+    """
+    name: str
+    window_days: int = 6
+    facility_types: Optional[List[str]] = None
 
 
 @dataclass
@@ -83,14 +243,35 @@ class ReportGeneratorConfig:
         storage_path (str): The file system path where the generated reports will be stored.
                             This path is typically a directory.
         parquet_files_path (str): Location of source files.
+        cache_enabled (bool): Whether report.html is reused when its input files and rendered figure are unchanged,
+                              and the transformed last-week data is cached for layout-only changes.
+        views (List[ReportView]): The additional reports rendered in batch next to report.html. They reference
+                                  one shared plotly.min.js in storage_path instead of embedding it.
+        render_workers (int): The number of processes rendering the view reports.
+        table_mode (str): How the report table bounds its size: 'full' (every row), 'truncate' (the first
+                          table_max_rows rows), 'aggregate' (rows pre-aggregated by week, month or year until
+                          at most table_max_rows remain) or 'paginate' (pages of table_max_rows rows).
+        table_max_rows (int): The row cap of the table ('truncate', 'aggregate') or the page size ('paginate').
+        table_max_pages (int): The maximum number of pages in 'paginate' mode; further rows are truncated.
     """
     storage_path: str
     parquet_files_path: str
+    cache_enabled: bool = True
+    views: List[ReportView] = field(default_factory=list)
+    render_workers: int = 4
+    table_mode: str = 'full'
+    table_max_rows: int = 1000
+    table_max_pages: int = 10
 
 
 # Instance of LoadConfig
 load_config = LoadConfig(
-    date_scope=datetime.now().date().strftime('%Y-%m-%d')  # Example: '2025-01-01'
+    date_scope=datetime.now().date().strftime('%Y-%m-%d'),  # Example: '2025-01-01'
+    incremental=False,  # opt in to merging only the source rows past the load_state high-water mark
+    strategy='merge',  # 'merge' or 'on_conflict'
+    partitioned_visits=False,
+    retention_months=None,
+    summary_tables=False  # opt in to the daily/patient aggregate layer read by the Parquet export
 )
 
 # Instance of PostgresConfig
@@ -102,6 +283,13 @@ postgres_config = PostgresConfig(
     host='localhost'  # localhost:localhost, podman_network:postgres
 )
 
+# Instance of ConnectionPoolConfig
+connection_pool_config = ConnectionPoolConfig(
+    min_size=1,
+    max_size=4,
+    session_settings={}  # Example: {'work_mem': '64MB', 'statement_timeout': '600000'} (milliseconds)
+)
+
 # Instance of GeneratorConfig
 data_generator_config = DataGeneratorConfig(
     num_patients=30,
@@ -109,7 +297,21 @@ data_generator_config = DataGeneratorConfig(
     end_date='2030-01-01',
     date_format='%Y-%m-%d',
     facility_types=['Hospital', 'Clinic', 'Urgent Care', 'Specialty Center'],
-    visits_per_day=(7, 10)
+    visits_per_day=(7, 10),
+    generation_mode='rows',  # 'rows' or 'columnar'
+    seed=None,  # Example: 42 for a reproducible dataset
+    shards=1,
+    faker_pool_sizes=None,  # Example: {'first_name': 5000, 'last_name': 10000, 'address': 100000, 'company': 1000}
+    faker_pool_cache_path=None  # Example: '/generator_cache/faker_pools.json'
+)
+
+# Instance of IngestConfig
+ingest_config = IngestConfig(
+    mode='copy',  # 'copy' or 'insert'
+    batch_size=50000,
+    streaming=False,
+    stream_batch_days=365,
+    stream_queue_size=2
 )
 
 # Instance of ParquetStorageConfig
@@ -119,11 +321,42 @@ parquet_storage_config = ParquetStorageConfig(
     storage_path_patient_sum_treatment_cost_per_facility_type='/parquet_data/'
                                                               'patient_sum_treatment_cost_per_facility_type',
     storage_path_facility_name_min_time_spent_per_visit_date='/parquet_data/'
-                                                             'facility_name_min_time_spent_per_visit_date'
+                                                             'facility_name_min_time_spent_per_visit_date',
+    read_mode='read_sql',  # 'read_sql', 'server_cursor' or 'copy_arrow'
+    chunk_rows=100000,
+    concurrent=False,  # opt in to running the Parquet stages in parallel, each one on its own connection
+    incremental=False,  # opt in to rewriting only the changed partitions
+    # Example: {'facility_type_avg_time_spent_per_visit_date': ParquetWriteProfile(
+    #     row_group_size=65536, compression='zstd', compression_level=3, use_dictionary=['facility_type'],
+    #     sort_by=['visit_date', 'facility_type'])}
+    write_profiles={},
+    use_summary_tables=False,  # opt in (needs load_config.summary_tables); the DQ source queries aggregate visits
+    write_manifest=True
 )
 
 # Instance of ReportGeneratorConfig
 report_generator_config = ReportGeneratorConfig(
     storage_path='/generated_report',
-    parquet_files_path='/parquet_data/facility_type_avg_time_spent_per_visit_date'
+    parquet_files_path='/parquet_data/facility_type_avg_time_spent_per_visit_date',
+    cache_enabled=True,  # Reuse report.html and the last-week data while the input partitions are unchanged
+    views=[],  # Example: [ReportView(name='last_30_days', window_days=29),
+    #                      ReportView(name='last_week_clinic', facility_types=['Clinic'])]
+    render_workers=4,
+    table_mode='full',  # 'full', 'truncate', 'aggregate' or 'paginate'
+    table_max_rows=1000,
+    table_max_pages=10
+)
+
+# Instance of MetricsConfig
+metrics_config = MetricsConfig(
+    enabled=True,
+    run_record_path='/generated_report',  # next to report.html
+    max_sql_text_length=200,
+    max_sql_spans=1000
+)
+
+# Instance of PipelineConfig
+pipeline_config = PipelineConfig(
+    max_workers=3,  # independent stages run in parallel (see parquet_storage_config.concurrent)
+    checkpoint_path='/generated_report/_pipeline_checkpoint.json'
 )
@@ -1,50 +1,141 @@
-from src.connectors.postgre_connector import PostgresConnectorContextManager
+from src.connectors.postgre_connector import PostgresConnectionPool
 from src.data.inject_generated_data_to_src import GeneratedDataLoader
 from src.data.nf3_loader import NF3Loader
 from src.data.parquet_loader import LoadParquet
 from src.reporting.report_generator import ReportGenerator
+from data_dev.src.metrics.run_metrics import run_metrics
+from data_dev.src.pipeline.stage_scheduler import (Stage, StageScheduler, fingerprint, path_fingerprint,
+                                                   table_fingerprint)
+from data_dev.config import (data_generator_config, ingest_config, load_config, parquet_storage_config,
+                             report_generator_config)
 
+import argparse
 import logging
+import os
 import warnings
 
+import psycopg2
+
 warnings.filterwarnings("ignore")
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Parquet transform stages: (stage name, LoadParquet method, dataset path)
+PARQUET_STAGES = [
+    ('parquet_facility_type_avg_time_spent_per_visit_date',
+     'transform_facility_type_avg_time_spent_per_visit_date',
+     parquet_storage_config.storage_path_facility_type_avg_time_spent_per_visit_date),
+    ('parquet_patient_sum_treatment_cost_per_facility_type',
+     'transform_patient_sum_treatment_cost_per_facility_type',
+     parquet_storage_config.storage_path_patient_sum_treatment_cost_per_facility_type),
+    ('parquet_facility_name_min_time_spent_per_visit_date',
+     'transform_facility_name_min_time_spent_per_visit_date',
+     parquet_storage_config.storage_path_facility_name_min_time_spent_per_visit_date)
+]
+
+# Tables written by the database stages, probed so that a database reset is never mistaken for an up-to-date stage
+SRC_TABLES = ['src_generated_facilities', 'src_generated_patients', 'src_generated_visits']
+NF3_TABLES = ['facilities', 'patients', 'visits', 'load_state',
+              'daily_facility_visit_summary', 'patient_facility_cost_summary']
+
+
+def build_stages(pool):
+    """
+    Declares the pipeline stages: generate -> 3NF -> each Parquet transform -> report (and the view reports).
+
+    Every stage checks its own connection out of the pool, so independent stages run in parallel.
+    The Parquet stages run through LoadParquet.run_transform (metrics span and duration log per transform);
+    they run in parallel when parquet_storage_config.concurrent is set, otherwise one after another.
+    The database stages fingerprint their config together with the tables they write (see table_fingerprint).
+    The report depends on the Parquet dataset it reads (report_generator_config.parquet_files_path); the view
+    reports run after it, since both write the report cache under report_generator_config.storage_path.
+    """
+    def database_inputs(table_names, *configs):
+        def inputs():
+            try:
+                with pool.connection() as connection_object:
+                    tables = table_fingerprint(connection_object.get_connection(), table_names)
+            except psycopg2.Error as e:
+                logging.warning(f"Database state could not be probed, the stage will run: {e}")
+                return None
+            return fingerprint(*configs, tables)
+        return inputs
+
+    def generate_and_inject():
+        with pool.connection() as connection_object:
+            if not GeneratedDataLoader(connection_object.get_connection()).inject_data():
+                raise RuntimeError("Data generation and injection into Postgres failed")
+
+    def load_3nf():
+        with pool.connection() as connection_object:
+            if not NF3Loader(connection_object.get_connection()).load_data():
+                raise RuntimeError("Transformation of injected data failed")
+
+    def parquet_transform(transform_name):
+        def run():
+            with pool.connection() as connection_object:
+                loader = LoadParquet(connection_object)
+                loader.run_transform(getattr(loader, transform_name), connection_object)
+        return run
+
+    def generate_report():
+        ReportGenerator().generate_report()
+
+    def generate_view_reports():
+        ReportGenerator().generate_view_reports()
+
+    report_path = os.path.join(report_generator_config.storage_path, 'report.html')
+    stages = [
+        Stage('generate_and_inject', generate_and_inject,
+              inputs=database_inputs(SRC_TABLES, data_generator_config, ingest_config,
+                                     load_config.partitioned_visits)),
+        Stage('load_3nf', load_3nf, depends_on=['generate_and_inject'],
+              inputs=database_inputs(NF3_TABLES, load_config))
+    ]
+    report_dependencies = []
+    previous_stage = None
+    for stage_name, transform_name, storage_path in PARQUET_STAGES:
+        depends_on = ['load_3nf']
+        if previous_stage and not parquet_storage_config.concurrent:
+            depends_on.append(previous_stage)
+        previous_stage = stage_name
+        stages.append(Stage(
+            stage_name, parquet_transform(transform_name), depends_on=depends_on, output_path=storage_path,
+            inputs=lambda storage_path=storage_path: fingerprint(parquet_storage_config,
+                                                                 path_fingerprint(storage_path))
+        ))
+        if os.path.normpath(storage_path) == os.path.normpath(report_generator_config.parquet_files_path):
+            report_dependencies.append(stage_name)
+    stages.append(Stage(
+        'generate_report', generate_report, depends_on=report_dependencies or ['load_3nf'], output_path=report_path,
+        inputs=lambda: fingerprint(report_generator_config,
+                                   path_fingerprint(report_generator_config.parquet_files_path),
+                                   path_fingerprint(report_path))
+    ))
+    if report_generator_config.views:
+        stages.append(Stage(
+            'generate_view_reports', generate_view_reports, depends_on=['generate_report'],
+            inputs=lambda: fingerprint(report_generator_config,
+                                       path_fingerprint(report_generator_config.parquet_files_path),
+                                       [path_fingerprint(os.path.join(report_generator_config.storage_path,
+                                                                      f'report_{view.name}.html'))
+                                        for view in report_generator_config.views])
+        ))
+    return stages
+
 
-def main():
-    with PostgresConnectorContextManager() as connection_object:
-        # generate and load generated data into src layer
-        try:
-            logging.info(f"Starting data generation and injection into Postgres...")
-            gdi = GeneratedDataLoader(connection_object.get_connection())
-            gdi.inject_data()
-            logging.info(f"Data generation and injection into Postgres Completed!")
-        except Exception as e:
-            logging.exception(f"Data generation and injection into Postgres FAILED: {e}")
-        # load to nf3 layer
-        try:
-            logging.info(f"Starting transformation of injected data...")
-            l3nf = NF3Loader(connection_object.get_connection())
-            l3nf.load_data()
-            logging.info(f"Transformation of injected data completed!")
-        except Exception as e:
-            logging.exception(f"Transformation of injected data FAILED: {e}")
-        # load parquet files
-        try:
-            logging.info(f"Starting transformation of parquet files...")
-            ld = LoadParquet(connection_object)
-            ld.load_parquet()
-            logging.info(f"Transformation of parquet files completed!")
-        except Exception as e:
-            logging.exception(f"Transformation of parquet files FAILED: {e}")
-        try:
-            logging.info(f"Starting report generation...")
-            rp = ReportGenerator()
-            rp.generate_report()
-            logging.info(f"Report generation completed!")
-        except Exception as e:
-            logging.exception(f"Report generation FAILED: {e}")
+def main(force=False):
+    with PostgresConnectionPool() as pool:
+        with run_metrics.span('pipeline'):
+            statuses = StageScheduler(build_stages(pool)).run(force=force)
+    for stage_name, status in statuses.items():
+        logging.info(f"Stage {stage_name}: {status}")
+    run_record_path = run_metrics.write()
+    if run_record_path:
+        logging.info(f"Run record written to {run_record_path}")
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Run the data_dev pipeline.")
+    parser.add_argument('--force', action='store_true',
+                        help="Ignore the checkpoint and run every stage, even the up-to-date ones.")
+    main(force=parser.parse_args().force)
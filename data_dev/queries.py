@@ -32,6 +32,16 @@ CREATE TABLE IF NOT EXISTS src_generated_visits (
 );
 """
 
+CREATE_SRC_GENERATED_VISITS_PARTITIONED_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS src_generated_visits (
+    patient_id INT NOT NULL, 
+    facility_id INT NOT NULL, 
+    visit_timestamp TIMESTAMP NOT NULL, 
+    treatment_cost NUMERIC(10, 2) NOT NULL, 
+    duration_minutes INT NOT NULL
+) PARTITION BY RANGE (visit_timestamp);
+"""
+
 INSERT_SRC_GENERATED_FACILITIES_QUERY = """
 INSERT INTO src_generated_facilities (facility_id, facility_name, facility_type, address, city, state)
 VALUES (%(facility_id)s, %(facility_name)s, %(facility_type)s, %(address)s, %(city)s, %(state)s)
@@ -47,6 +57,21 @@ INSERT INTO src_generated_visits (patient_id, facility_id, visit_timestamp, trea
 VALUES (%(patient_id)s, %(facility_id)s, %(visit_timestamp)s, %(treatment_cost)s, %(duration_minutes)s)
 """
 
+COPY_SRC_GENERATED_FACILITIES_QUERY = """
+COPY src_generated_facilities (facility_id, facility_name, facility_type, address, city, state)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+COPY_SRC_GENERATED_PATIENTS_QUERY = """
+COPY src_generated_patients (patient_id, first_name, last_name, date_of_birth, address)
+FROM STDIN WITH (FORMAT csv)
+"""
+
+COPY_SRC_GENERATED_VISITS_QUERY = """
+COPY src_generated_visits (patient_id, facility_id, visit_timestamp, treatment_cost, duration_minutes)
+FROM STDIN WITH (FORMAT csv)
+"""
+
 # 3NF LAYER
 
 
@@ -86,6 +111,20 @@ CREATE TABLE IF NOT EXISTS visits (
 );
 """
 
+CREATE_VISITS_PARTITIONED_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS visits (
+    id SERIAL, -- Auto-incrementing id
+    patient_id INT NOT NULL, -- Foreign key referencing the patients table
+    facility_id INT NOT NULL, -- Foreign key referencing the facilities table
+    visit_timestamp TIMESTAMP NOT NULL, -- Timestamp of the visit (monthly range partition key)
+    treatment_cost NUMERIC(10, 2) NOT NULL, -- Cost of the treatment
+    duration_minutes INT NOT NULL, -- Duration of the visit in minutes
+    PRIMARY KEY (id, visit_timestamp), -- The primary key of a partitioned table must include the partition key
+    FOREIGN KEY (patient_id) REFERENCES patients(id) ON DELETE CASCADE,
+    FOREIGN KEY (facility_id) REFERENCES facilities(id) ON DELETE CASCADE
+) PARTITION BY RANGE (visit_timestamp);
+"""
+
 MERGE_FACILITIES_QUERY = """
 MERGE INTO facilities AS target
 USING public.src_generated_facilities AS source
@@ -135,6 +174,295 @@ WHEN NOT MATCHED THEN
     VALUES (source.facility_id, source.patient_id, source.visit_timestamp, source.treatment_cost, source.duration_minutes);
 """
 
+MERGE_VISITS_INCREMENTAL_QUERY = """
+WITH src_visits AS (
+    SELECT 
+        f.id AS facility_id,
+        p.id AS patient_id,
+        sgv.visit_timestamp,
+        sgv.treatment_cost,
+        sgv.duration_minutes 
+    FROM src_generated_visits sgv 
+    JOIN facilities f 
+        ON sgv.facility_id = f.external_id 
+    JOIN patients p
+        ON sgv.patient_id = p.external_id 
+    WHERE sgv.visit_timestamp >= %(lower_bound)s
+        AND sgv.visit_timestamp < %(upper_bound)s
+)
+MERGE INTO visits AS target
+USING src_visits AS source
+ON target.facility_id = source.facility_id
+   AND target.patient_id = source.patient_id
+   AND target.visit_timestamp = source.visit_timestamp
+   AND target.visit_timestamp >= %(lower_bound)s
+   AND target.visit_timestamp < %(upper_bound)s
+WHEN MATCHED THEN
+    DO NOTHING
+WHEN NOT MATCHED THEN
+    INSERT (facility_id, patient_id, visit_timestamp, treatment_cost, duration_minutes)
+    VALUES (source.facility_id, source.patient_id, source.visit_timestamp, source.treatment_cost, source.duration_minutes);
+"""
+
+INSERT_FACILITIES_ON_CONFLICT_QUERY = """
+INSERT INTO facilities (external_id, facility_name, facility_type, address, city, state)
+SELECT facility_id, facility_name, facility_type, address, city, state
+FROM public.src_generated_facilities
+ON CONFLICT (external_id) DO NOTHING;
+"""
+
+INSERT_PATIENTS_ON_CONFLICT_QUERY = """
+INSERT INTO patients (external_id, first_name, last_name, date_of_birth, address)
+SELECT patient_id, first_name, last_name, date_of_birth, address
+FROM public.src_generated_patients
+ON CONFLICT (external_id) DO NOTHING;
+"""
+
+INSERT_VISITS_ON_CONFLICT_QUERY = """
+INSERT INTO visits (facility_id, patient_id, visit_timestamp, treatment_cost, duration_minutes)
+SELECT 
+    f.id AS facility_id,
+    p.id AS patient_id,
+    sgv.visit_timestamp,
+    sgv.treatment_cost,
+    sgv.duration_minutes 
+FROM src_generated_visits sgv 
+JOIN facilities f 
+    ON sgv.facility_id = f.external_id 
+JOIN patients p
+    ON sgv.patient_id = p.external_id 
+WHERE sgv.visit_timestamp >= %(lower_bound)s
+    AND sgv.visit_timestamp < %(upper_bound)s
+ON CONFLICT (facility_id, patient_id, visit_timestamp) DO NOTHING;
+"""
+
+# SCHEMA PROVISIONING
+
+
+CREATE_SRC_GENERATED_FACILITIES_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS src_generated_facilities_facility_id_idx ON src_generated_facilities (facility_id);
+"""
+
+CREATE_SRC_GENERATED_PATIENTS_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS src_generated_patients_patient_id_idx ON src_generated_patients (patient_id);
+"""
+
+CREATE_SRC_GENERATED_VISITS_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS src_generated_visits_visit_timestamp_idx ON src_generated_visits (visit_timestamp);
+"""
+
+# Lookup indexes of the MERGE strategy; they are not unique, so duplicate source rows are still loaded
+CREATE_FACILITIES_EXTERNAL_ID_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS facilities_external_id_idx ON facilities (external_id);
+"""
+
+CREATE_PATIENTS_EXTERNAL_ID_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS patients_external_id_idx ON patients (external_id);
+"""
+
+CREATE_VISITS_NATURAL_KEY_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS visits_facility_id_patient_id_visit_timestamp_idx
+ON visits (facility_id, patient_id, visit_timestamp);
+"""
+
+# Unique keys the ON CONFLICT strategy needs as conflict targets
+CREATE_FACILITIES_EXTERNAL_ID_UNIQUE_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS facilities_external_id_uidx ON facilities (external_id);
+"""
+
+CREATE_PATIENTS_EXTERNAL_ID_UNIQUE_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS patients_external_id_uidx ON patients (external_id);
+"""
+
+CREATE_VISITS_NATURAL_KEY_UNIQUE_INDEX_QUERY = """
+CREATE UNIQUE INDEX IF NOT EXISTS visits_facility_id_patient_id_visit_timestamp_uidx
+ON visits (facility_id, patient_id, visit_timestamp);
+"""
+
+CREATE_VISITS_VISIT_TIMESTAMP_INDEX_QUERY = """
+CREATE INDEX IF NOT EXISTS visits_visit_timestamp_idx ON visits (visit_timestamp);
+"""
+
+LIST_INDEXES_QUERY = """
+SELECT indexname
+FROM pg_indexes
+WHERE schemaname = current_schema()
+    AND indexname = ANY(%(index_names)s);
+"""
+
+# LOAD STATE
+
+
+CREATE_LOAD_STATE_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS load_state (
+    entity_name VARCHAR(50) PRIMARY KEY, -- Name of the loaded 3NF entity
+    last_visit_timestamp TIMESTAMP, -- High-water mark: max source visit_timestamp loaded so far
+    source_row_count BIGINT NOT NULL, -- Number of source rows loaded so far
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW() -- Time of the last load
+);
+"""
+
+GET_LOAD_STATE_QUERY = """
+SELECT last_visit_timestamp, source_row_count
+FROM load_state
+WHERE entity_name = %(entity_name)s;
+"""
+
+UPSERT_LOAD_STATE_QUERY = """
+INSERT INTO load_state (entity_name, last_visit_timestamp, source_row_count, updated_at)
+VALUES (%(entity_name)s, %(last_visit_timestamp)s, %(source_row_count)s, NOW())
+ON CONFLICT (entity_name) DO UPDATE
+SET last_visit_timestamp = EXCLUDED.last_visit_timestamp,
+    source_row_count = EXCLUDED.source_row_count,
+    updated_at = EXCLUDED.updated_at;
+"""
+
+# Identity of the given tables (NULL when a table does not exist); the relfilenode changes on TRUNCATE
+TABLE_STATE_QUERY = """
+SELECT table_name, c.oid, c.relfilenode
+FROM unnest(%(table_names)s::text[]) AS table_name
+LEFT JOIN pg_class c ON c.oid = to_regclass(table_name)
+ORDER BY table_name;
+"""
+
+TABLE_ROW_COUNT_QUERY = """
+SELECT COUNT(*) FROM {table_name};
+"""
+
+SRC_VISITS_DELTA_QUERY = """
+SELECT
+    MIN(visit_timestamp) AS first_visit_timestamp,
+    MAX(visit_timestamp) AS last_visit_timestamp,
+    COUNT(*) FILTER (WHERE visit_timestamp > %(lower_bound)s) AS new_row_count
+FROM src_generated_visits
+WHERE visit_timestamp >= %(lower_bound)s
+    AND visit_timestamp < %(upper_bound)s;
+"""
+
+# PARTITIONING
+
+
+IS_TABLE_PARTITIONED_QUERY = """
+SELECT EXISTS (
+    SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%(table_name)s)
+);
+"""
+
+LIST_PARTITIONS_QUERY = """
+SELECT c.relname
+FROM pg_inherits i
+JOIN pg_class c
+    ON c.oid = i.inhrelid
+WHERE i.inhparent = to_regclass(%(table_name)s)
+ORDER BY c.relname;
+"""
+
+RELATION_EXISTS_QUERY = """
+SELECT to_regclass(%(relation_name)s) IS NOT NULL;
+"""
+
+CREATE_MONTHLY_PARTITION_QUERY = """
+CREATE TABLE {partition_name} PARTITION OF {table_name}
+FOR VALUES FROM (%(lower_bound)s) TO (%(upper_bound)s);
+"""
+
+ATTACH_MONTHLY_PARTITION_QUERY = """
+ALTER TABLE {table_name} ATTACH PARTITION {partition_name}
+FOR VALUES FROM (%(lower_bound)s) TO (%(upper_bound)s);
+"""
+
+DETACH_PARTITION_QUERY = """
+ALTER TABLE {table_name} DETACH PARTITION {partition_name};
+"""
+
+RENAME_TABLE_QUERY = """
+ALTER TABLE {table_name} RENAME TO {new_table_name};
+"""
+
+# SUMMARY LAYER
+CREATE_DAILY_FACILITY_VISIT_SUMMARY_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS daily_facility_visit_summary (
+    visit_date DATE NOT NULL,
+    facility_id INT NOT NULL REFERENCES facilities(id),
+    visit_count BIGINT NOT NULL,
+    duration_sum BIGINT NOT NULL,
+    duration_min INT NOT NULL,
+    duration_max INT NOT NULL,
+    cost_sum NUMERIC NOT NULL,
+    cost_min NUMERIC(10, 2) NOT NULL,
+    cost_max NUMERIC(10, 2) NOT NULL,
+    PRIMARY KEY (visit_date, facility_id)
+);
+"""
+
+CREATE_PATIENT_FACILITY_COST_SUMMARY_TABLE_QUERY = """
+CREATE TABLE IF NOT EXISTS patient_facility_cost_summary (
+    facility_id INT NOT NULL REFERENCES facilities(id),
+    patient_id INT NOT NULL REFERENCES patients(id),
+    visit_count BIGINT NOT NULL,
+    cost_sum NUMERIC NOT NULL,
+    PRIMARY KEY (facility_id, patient_id)
+);
+"""
+
+# Days touched by the load window are recomputed from visits as a whole, so a window starting
+# in the middle of a day (at the watermark) still yields exact daily aggregates.
+REFRESH_DAILY_FACILITY_VISIT_SUMMARY_QUERY = """
+INSERT INTO daily_facility_visit_summary (visit_date, facility_id, visit_count, duration_sum, duration_min,
+                                          duration_max, cost_sum, cost_min, cost_max)
+SELECT
+    v.visit_timestamp::date AS visit_date,
+    v.facility_id,
+    COUNT(*),
+    SUM(v.duration_minutes),
+    MIN(v.duration_minutes),
+    MAX(v.duration_minutes),
+    SUM(v.treatment_cost),
+    MIN(v.treatment_cost),
+    MAX(v.treatment_cost)
+FROM visits v
+WHERE v.visit_timestamp >= date_trunc('day', %(lower_bound)s::timestamp)
+    AND v.visit_timestamp < %(upper_bound)s
+GROUP BY
+    visit_date,
+    v.facility_id
+ON CONFLICT (visit_date, facility_id) DO UPDATE
+SET visit_count = EXCLUDED.visit_count,
+    duration_sum = EXCLUDED.duration_sum,
+    duration_min = EXCLUDED.duration_min,
+    duration_max = EXCLUDED.duration_max,
+    cost_sum = EXCLUDED.cost_sum,
+    cost_min = EXCLUDED.cost_min,
+    cost_max = EXCLUDED.cost_max;
+"""
+
+# Only the (facility, patient) pairs with visits in the load window are recomputed.
+REFRESH_PATIENT_FACILITY_COST_SUMMARY_QUERY = """
+INSERT INTO patient_facility_cost_summary (facility_id, patient_id, visit_count, cost_sum)
+SELECT
+    v.facility_id,
+    v.patient_id,
+    COUNT(*),
+    SUM(v.treatment_cost)
+FROM visits v
+WHERE (v.facility_id, v.patient_id) IN (
+    SELECT DISTINCT facility_id, patient_id
+    FROM visits
+    WHERE visit_timestamp >= %(lower_bound)s
+        AND visit_timestamp < %(upper_bound)s
+)
+GROUP BY
+    v.facility_id,
+    v.patient_id
+ON CONFLICT (facility_id, patient_id) DO UPDATE
+SET visit_count = EXCLUDED.visit_count,
+    cost_sum = EXCLUDED.cost_sum;
+"""
+
+TRUNCATE_SUMMARY_TABLES_QUERY = """
+TRUNCATE daily_facility_visit_summary, patient_facility_cost_summary;
+"""
+
 # PARQUET PREPARATION
 
 TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL = """
@@ -208,3 +536,188 @@ GROUP BY
     f.facility_name,
     visit_date;
 """
+
+# The *_FROM_SUMMARY variants produce the same results as the transforms above (including their mistakes)
+# from the summary layer instead of the visits fact table.
+TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_SUMMARY_SQL = """
+SELECT
+    f.facility_type,
+    s.visit_date,
+    ROUND(SUM(s.duration_sum)::numeric / SUM(s.visit_count), 2) AS avg_time_spent
+FROM
+    daily_facility_visit_summary s
+JOIN
+    facilities f 
+    ON f.id = s.facility_id
+WHERE
+    s.visit_date >= '2000-11-01' -- misstake (visits at exactly 2000-11-01 00:00:00 are not excluded here)
+    AND f.facility_type IN ('Hospital', 'Clinic', 'Specialty Center') -- misstake
+GROUP BY
+    f.facility_type,
+    s.visit_date;
+"""
+
+TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_FROM_SUMMARY_SQL = """
+SELECT
+    f.facility_type,
+    CASE
+        WHEN p.id <= 15 THEN 
+            NULL  -- misstake
+        ELSE
+            CONCAT(p.first_name, ' ', p.last_name)
+    END AS full_name,
+    CASE 
+        WHEN f.facility_type = 'Clinic' THEN 
+            -SUM(s.cost_sum) -- misstake
+        ELSE 
+            SUM(s.cost_sum)
+    END AS sum_treatment_cost
+FROM
+    patient_facility_cost_summary s
+JOIN facilities f 
+    ON f.id = s.facility_id
+JOIN patients p
+    ON p.id = s.patient_id
+GROUP BY
+    f.facility_type,
+    full_name;
+"""
+
+TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_FROM_SUMMARY_SQL = """
+SELECT
+    f.facility_name,
+    s.visit_date,
+    MIN(s.duration_min) AS min_time_spent
+FROM
+    daily_facility_visit_summary s
+JOIN facilities f 
+    ON f.id = s.facility_id
+GROUP BY
+    f.facility_name,
+    s.visit_date
+UNION ALL  -- misstake
+SELECT
+    f.facility_name,
+    s.visit_date,
+    MIN(s.duration_min) AS min_time_spent
+FROM
+    daily_facility_visit_summary s
+JOIN facilities f 
+    ON f.id = s.facility_id
+WHERE
+    f.facility_type = 'Clinic' 
+GROUP BY
+    f.facility_name,
+    s.visit_date;
+"""
+
+# PARQUET EXPORT STATE
+
+# The load state of visits and its first month identify what the 3NF load changed since a previous export:
+# incremental loads only add visits at or past the watermark, while a detach (retention) or a reload
+# of another history moves the first month. MIN(visit_timestamp) is read from visits_visit_timestamp_idx.
+VISITS_LOAD_MARKER_QUERY = """
+SELECT
+    (SELECT last_visit_timestamp FROM load_state WHERE entity_name = 'visits') AS last_visit_timestamp,
+    (SELECT source_row_count FROM load_state WHERE entity_name = 'visits') AS source_row_count,
+    (SELECT to_char(MIN(visit_timestamp), 'YYYY-MM') FROM visits) AS first_visit_month;
+"""
+
+# The checksum queries cover the rows at or past %(lower_bound)s ('-infinity' for all of them), so an
+# incremental export only scans the months the 3NF load touched.
+MONTHLY_PARTITION_CHECKSUM_QUERY = """
+SELECT
+    to_char(v.visit_timestamp, 'YYYY-MM') AS partition_key,
+    COUNT(*) AS row_count,
+    SUM(hashtextextended(concat_ws('|', v.id, v.facility_id, v.visit_timestamp, v.duration_minutes,
+                                   f.facility_type, f.facility_name), 0)::numeric) AS checksum
+FROM
+    visits v
+JOIN
+    facilities f
+    ON f.id = v.facility_id
+WHERE
+    v.visit_timestamp >= %(lower_bound)s
+GROUP BY
+    partition_key;
+"""
+
+FACILITY_TYPE_PARTITION_CHECKSUM_QUERY = """
+SELECT
+    replace(f.facility_type, ' ', '_') AS partition_key,
+    COUNT(*) AS row_count,
+    SUM(hashtextextended(concat_ws('|', v.id, v.patient_id, v.treatment_cost,
+                                   p.first_name, p.last_name), 0)::numeric) AS checksum
+FROM
+    visits v
+JOIN
+    facilities f
+    ON f.id = v.facility_id
+JOIN
+    patients p
+    ON p.id = v.patient_id
+WHERE
+    v.visit_timestamp >= %(lower_bound)s
+GROUP BY
+    partition_key;
+"""
+
+MONTHLY_PARTITION_CHECKSUM_FROM_SUMMARY_QUERY = """
+SELECT
+    to_char(s.visit_date, 'YYYY-MM') AS partition_key,
+    SUM(s.visit_count) AS row_count,
+    SUM(hashtextextended(concat_ws('|', s.visit_date, s.facility_id, s.visit_count, s.duration_sum,
+                                   s.duration_min, f.facility_type, f.facility_name), 0)::numeric) AS checksum
+FROM
+    daily_facility_visit_summary s
+JOIN
+    facilities f
+    ON f.id = s.facility_id
+WHERE
+    s.visit_date >= %(lower_bound)s::date
+GROUP BY
+    partition_key;
+"""
+
+# patient_facility_cost_summary has no date, so the facility types are checksummed by their daily summaries
+# (which are refreshed over the same load window).
+FACILITY_TYPE_PARTITION_CHECKSUM_FROM_SUMMARY_QUERY = """
+SELECT
+    replace(f.facility_type, ' ', '_') AS partition_key,
+    SUM(s.visit_count) AS row_count,
+    SUM(hashtextextended(concat_ws('|', s.visit_date, s.facility_id, s.visit_count,
+                                   s.cost_sum), 0)::numeric) AS checksum
+FROM
+    daily_facility_visit_summary s
+JOIN
+    facilities f
+    ON f.id = s.facility_id
+WHERE
+    s.visit_date >= %(lower_bound)s::date
+GROUP BY
+    partition_key;
+"""
+
+# Monthly partitions are re-aggregated from a CTE that shadows the source table of the transform and keeps
+# only the changed months, as [month start, next month start) ranges on the raw column. The ranges are
+# resolved by index range scans (or partition pruning) below the aggregation.
+MONTHS_FILTERED_TRANSFORM_QUERY = """
+WITH {source_table} AS NOT MATERIALIZED (
+    SELECT * FROM public.{source_table}
+    WHERE {month_ranges}
+)
+{transform_query}
+"""
+
+MONTH_RANGE_FILTER = "({column} >= %(month_lower_{index})s AND {column} < %(month_upper_{index})s)"
+
+# The transform query is wrapped as a subquery; the filter references only grouping columns of the
+# transform, so PostgreSQL pushes it down below the aggregation.
+FILTERED_TRANSFORM_QUERY = """
+SELECT * FROM (
+{transform_query}
+) t
+WHERE {partition_filter};
+"""
+
+FACILITY_TYPE_PARTITION_FILTER = "replace(t.facility_type, ' ', '_') = ANY(%(partition_keys)s)"
@@ -1,11 +1,19 @@
-from typing import Optional
+import io
+import threading
+import uuid
+import weakref
+from typing import Dict, Iterator, Optional, Union
 import psycopg2
-from psycopg2.extensions import connection
+from psycopg2.extensions import connection, TRANSACTION_STATUS_IDLE
+from psycopg2.pool import ThreadedConnectionPool
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from pandas import DataFrame
 
-from data_dev.config import postgres_config
+from data_dev.config import postgres_config, connection_pool_config
+from data_dev.src.metrics.run_metrics import InstrumentedCursor
 
 
 class PostgresConnectorContextManager:
@@ -54,7 +62,8 @@ class PostgresConnectorContextManager:
             port=self.port,
             database=self.db,
             user=self.user,
-            password=self.password
+            password=self.password,
+            cursor_factory=InstrumentedCursor
         )
         self.connection.autocommit = self.autocommit
         return self
@@ -80,12 +89,13 @@ class PostgresConnectorContextManager:
         """
         return self.connection
 
-    def get_data_sql(self, query: str) -> DataFrame:
+    def get_data_sql(self, query: str, params: Optional[dict] = None) -> DataFrame:
         """
         Execute a SQL query and return the results as a pandas DataFrame.
 
         Args:
             query (str): The SQL query to execute.
+            params (Optional[dict]): Query parameters. Defaults to None.
 
         Returns:
             DataFrame: A pandas DataFrame containing the query results.
@@ -94,8 +104,277 @@ class PostgresConnectorContextManager:
             Exception: If the query execution fails, an exception is raised with the error message.
         """
         try:
-            data_df = pd.read_sql(query, self.connection)
+            data_df = pd.read_sql(query, self.connection, params=params)
             return data_df
         except Exception as e:
             print(f'Failed to receive data from DB\nError: {e}\n')
             raise
+
+    def iter_data_sql(self, query: str, chunk_rows: int = 50000, params: Optional[dict] = None,
+                      as_arrow: bool = False) -> Iterator[Union[DataFrame, pa.RecordBatch]]:
+        """
+        Execute a SQL query through a named server-side cursor and yield the results in bounded chunks.
+
+        Unlike get_data_sql, the result set is never fully materialized on the client: PostgreSQL keeps
+        it on the server and at most `chunk_rows` rows are transferred and converted at a time, so result
+        sets larger than the available memory can be processed chunk by chunk.
+
+        Args:
+            query (str): The SQL query to execute.
+            chunk_rows (int): The maximum number of rows per yielded chunk. Defaults to 50000.
+            params (Optional[dict]): Query parameters. Defaults to None.
+            as_arrow (bool): Yield pyarrow RecordBatches instead of pandas DataFrames. Defaults to False.
+
+        Yields:
+            DataFrame or pa.RecordBatch: The next chunk of the query results.
+
+        Raises:
+            Exception: If the query execution fails, an exception is raised with the error message.
+        """
+        cursor = self.connection.cursor(name=f"iter_data_sql_{uuid.uuid4().hex}",
+                                        withhold=self.connection.autocommit)
+        cursor.itersize = chunk_rows
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                chunk = pd.DataFrame.from_records(rows, columns=[column.name for column in cursor.description])
+                yield pa.RecordBatch.from_pandas(chunk, preserve_index=False) if as_arrow else chunk
+        except Exception as e:
+            print(f'Failed to receive data from DB\nError: {e}\n')
+            raise
+        finally:
+            cursor.close()
+
+    def copy_data_arrow(self, query: str, schema: pa.Schema, params: Optional[dict] = None) -> pa.Table:
+        """
+        Execute a SQL query through COPY (query) TO STDOUT and parse the CSV stream into a typed pyarrow Table.
+
+        Unlike get_data_sql, no Python object is created per value (no Decimal or date objects and no
+        object-dtype pandas columns): the CSV bytes are parsed by pyarrow straight into the column types
+        of the given schema.
+
+        Args:
+            query (str): The SQL query to execute (a trailing ';' is allowed).
+            schema (pa.Schema): The names and types of the query result columns, in order.
+            params (Optional[dict]): Query parameters. Defaults to None.
+
+        Returns:
+            pa.Table: The query results.
+
+        Raises:
+            Exception: If the query execution fails, an exception is raised with the error message.
+        """
+        buffer = io.BytesIO()
+        try:
+            with self.connection.cursor() as cursor:
+                if params:
+                    query = cursor.mogrify(query, params).decode()
+                cursor.copy_expert(f"COPY ({query.strip().rstrip(';')}) TO STDOUT WITH (FORMAT csv)", buffer)
+            buffer.seek(0)
+            return pa_csv.read_csv(
+                buffer,
+                read_options=pa_csv.ReadOptions(column_names=schema.names),
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=schema,
+                    null_values=[''],
+                    strings_can_be_null=True,  # NULL is an unquoted empty field,
+                    quoted_strings_can_be_null=False  # an empty string is ""
+                )
+            ).select(schema.names)
+        except Exception as e:
+            print(f'Failed to receive data from DB\nError: {e}\n')
+            raise
+
+
+class PostgresConnectionPool:
+    """
+    A thread-safe pool of PostgreSQL connections shared by pipeline stages.
+
+    Connections are checked out through PooledPostgresConnectorContextManager, which keeps the interface of
+    PostgresConnectorContextManager, so stages can run queries concurrently on separate connections.
+    Every checked out connection is health-checked (broken connections are replaced), and session settings
+    such as work_mem or statement_timeout are applied once per physical connection.
+
+    Attributes:
+        min_size (int): The number of connections opened upfront.
+        max_size (int): The maximum number of connections.
+        session_settings (Dict[str, str]): Settings applied to every pooled connection.
+        autocommit (bool): The autocommit mode of checked out connections.
+        pool (Optional[ThreadedConnectionPool]): The underlying psycopg2 pool, None until opened.
+    """
+
+    def __init__(self, min_size: Optional[int] = None, max_size: Optional[int] = None,
+                 session_settings: Optional[Dict[str, str]] = None, autocommit: bool = False):
+        """
+        Initialize the connection pool settings.
+
+        Args:
+            min_size (Optional[int]): Overrides connection_pool_config.min_size.
+            max_size (Optional[int]): Overrides connection_pool_config.max_size.
+            session_settings (Optional[Dict[str, str]]): Overrides connection_pool_config.session_settings.
+            autocommit (bool): Enable or disable autocommit mode for checked out connections. Defaults to False.
+        """
+        self.min_size = connection_pool_config.min_size if min_size is None else min_size
+        self.max_size = connection_pool_config.max_size if max_size is None else max_size
+        self.session_settings = connection_pool_config.session_settings if session_settings is None \
+            else session_settings
+        self.autocommit = autocommit
+        self.pool: Optional[ThreadedConnectionPool] = None
+        self._configured = weakref.WeakSet()
+        self._lock = threading.Lock()
+        # ThreadedConnectionPool raises PoolError when exhausted; callers wait for a free connection instead
+        self._slots = threading.BoundedSemaphore(self.max_size)
+
+    def open(self) -> 'PostgresConnectionPool':
+        """
+        Open the pool and its initial connections.
+
+        Returns:
+            PostgresConnectionPool: The pool itself.
+        """
+        self.pool = ThreadedConnectionPool(
+            self.min_size,
+            self.max_size,
+            host=postgres_config.host,
+            port=postgres_config.port,
+            database=postgres_config.db,
+            user=postgres_config.user,
+            password=postgres_config.password,
+            cursor_factory=InstrumentedCursor
+        )
+        return self
+
+    def close(self):
+        """
+        Close every connection of the pool.
+        """
+        if self.pool:
+            self.pool.closeall()
+            self.pool = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        self.close()
+
+    def _prepare(self, conn: connection):
+        """
+        Health-check a connection and apply the session settings if it is new.
+
+        Args:
+            conn (connection): The connection to prepare.
+
+        Raises:
+            psycopg2.Error: If the connection is not usable.
+        """
+        conn.autocommit = True
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            if conn not in self._configured:
+                for name, value in self.session_settings.items():
+                    cursor.execute("SELECT set_config(%s, %s, false)", (name, str(value)))
+                with self._lock:
+                    self._configured.add(conn)
+        conn.autocommit = self.autocommit
+
+    def acquire(self) -> connection:
+        """
+        Check out a healthy connection, replacing broken ones.
+
+        Blocks while max_size connections are checked out, until one of them is released.
+        A connection that fails to prepare is closed and returned to the pool; broken connections
+        (OperationalError, InterfaceError) are replaced, any other error (e.g. an invalid session
+        setting) is raised after the connection and its slot were given back.
+
+        Returns:
+            connection: A ready to use database connection.
+        """
+        self._slots.acquire()
+        try:
+            for _ in range(self.max_size + 1):
+                conn = self.pool.getconn()
+                try:
+                    self._prepare(conn)
+                    return conn
+                except BaseException as e:
+                    self.pool.putconn(conn, close=True)
+                    if not isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+                        raise
+            raise psycopg2.OperationalError("No healthy connection could be checked out of the pool")
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: connection):
+        """
+        Return a connection to the pool, rolling back any transaction left open.
+
+        Args:
+            conn (connection): The connection to return.
+        """
+        try:
+            if conn.closed:
+                self.pool.putconn(conn, close=True)
+                return
+            if conn.info.transaction_status != TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    self.pool.putconn(conn, close=True)
+                    return
+            self.pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    def connection(self) -> 'PooledPostgresConnectorContextManager':
+        """
+        Create a context manager that checks a connection out of the pool.
+
+        Returns:
+            PooledPostgresConnectorContextManager: The context manager.
+        """
+        return PooledPostgresConnectorContextManager(self)
+
+
+class PooledPostgresConnectorContextManager(PostgresConnectorContextManager):
+    """
+    PostgreSQL Database Context Manager backed by a connection pool.
+
+    Behaves like PostgresConnectorContextManager, but checks a connection out of a PostgresConnectionPool
+    on enter and returns it on exit instead of opening and closing a new connection.
+
+    Attributes:
+        pool (PostgresConnectionPool): The pool connections are checked out from.
+    """
+
+    def __init__(self, pool: PostgresConnectionPool):
+        """
+        Initialize the pooled database context manager.
+
+        Args:
+            pool (PostgresConnectionPool): The pool connections are checked out from.
+        """
+        super().__init__(autocommit=pool.autocommit)
+        self.pool = pool
+
+    def __enter__(self):
+        """
+        Check a connection out of the pool.
+
+        Returns:
+            PooledPostgresConnectorContextManager: The context manager instance with an active connection.
+        """
+        self.connection = self.pool.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        """
+        Return the connection to the pool.
+        """
+        if self.connection:
+            self.pool.release(self.connection)
+            self.connection = None
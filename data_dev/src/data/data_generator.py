@@ -1,8 +1,96 @@
 import random
+import numpy as np
+import pyarrow as pa
+from concurrent.futures import ProcessPoolExecutor
 from faker import Faker
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from data_dev.config import data_generator_config
+from data_dev.src.data.faker_pool import FakerValuePool
+
+# Independent seed streams, so patients, facilities and visits never share random state
+PATIENTS_SEED_STREAM = 0
+FACILITIES_SEED_STREAM = 1
+VISITS_SEED_STREAM = 2
+
+
+def derive_seed(seed, stream, shard_index):
+    """
+    Derives a deterministic per-shard seed from the base seed.
+
+    Args:
+        seed (int or None): The base seed. None draws fresh entropy (non-reproducible run).
+        stream (int): The seed stream (patients, facilities or visits).
+        shard_index (int): The index of the shard.
+
+    Returns:
+        int: A 32-bit seed unique to (seed, stream, shard_index).
+    """
+    entropy = None if seed is None else [seed, stream, shard_index]
+    return int(np.random.SeedSequence(entropy).generate_state(1)[0])
+
+
+def split_range(total, parts):
+    """
+    Splits range(total) into `parts` contiguous (offset, count) chunks of near-equal size.
+
+    Args:
+        total (int): The size of the range.
+        parts (int): The number of chunks.
+
+    Returns:
+        List[Tuple[int, int]]: Non-empty (offset, count) pairs in range order.
+    """
+    bounds = [total * i // parts for i in range(parts + 1)]
+    return [(bounds[i], bounds[i + 1] - bounds[i]) for i in range(parts) if bounds[i + 1] > bounds[i]]
+
+
+def generate_patients_shard(seed, first_id, count, value_pool=None, reproducible=True):
+    """
+    Generates one shard of patients in a worker process.
+
+    Args:
+        seed (int): The shard seed.
+        first_id (int): The patient_id of the first patient in the shard.
+        count (int): The number of patients in the shard.
+        value_pool (FakerValuePool, optional): A loaded value pool shared by all shards.
+        reproducible (bool): Whether the run has a base seed (see DataGenerator.reproducible).
+
+    Returns:
+        List[dict] or pa.Table: The patients of the shard.
+    """
+    return DataGenerator(seed=seed, value_pool=value_pool,
+                         reproducible=reproducible).generate_patients(first_id=first_id, count=count)
+
+
+def generate_visits_shard(seed, start_date, end_date):
+    """
+    Generates one shard of visits (a date sub-range) in a worker process.
+
+    Args:
+        seed (int): The shard seed.
+        start_date (str): The first date of the shard.
+        end_date (str): The last date of the shard.
+
+    Returns:
+        List[dict] or pa.Table: The visits of the shard.
+    """
+    return DataGenerator(seed=seed).generate_visits_between(start_date=start_date, end_date=end_date)
+
+
+def concat_shards(shards):
+    """
+    Concatenates shard results in shard order.
+
+    Args:
+        shards (List[List[dict]] or List[pa.Table]): Shard results.
+
+    Returns:
+        List[dict] or pa.Table: The combined result.
+    """
+    if shards and isinstance(shards[0], pa.Table):
+        return pa.concat_tables(shards)
+    return [row for shard in shards for row in shard]
 
 
 class DataGenerator:
@@ -17,31 +105,140 @@ class DataGenerator:
         date_format (str): The format of the date strings, sourced from generator_config.date_format.
         visits_per_day (Tuple[int, int]): The range (min, max) of visits per day, sourced from generator_config.visits_per_day.
         facility_types (List[str]): A list of facility types, sourced from generator_config.facility_types.
+        generation_mode (str): 'rows' or 'columnar', sourced from generator_config.generation_mode.
+        seed (int or None): The base seed, sourced from generator_config.seed (or the constructor argument).
+        reproducible (bool): Whether the run has a base seed. Shards of an unseeded run get derived seeds,
+                             but keep the date-of-birth range relative to today like unseeded runs.
+        shards (int): The number of generation shards, sourced from generator_config.shards.
+        faker_pool_sizes (Dict[str, int] or None): Pool size per Faker provider, sourced from
+                                                   generator_config.faker_pool_sizes. None disables pooling.
+        faker_pool_cache_path (str or None): The pool cache file, sourced from generator_config.faker_pool_cache_path.
+        value_pool (FakerValuePool or None): The pre-sampled Faker values used in pooled mode.
+        random (random.Random): The random generator used by the row mode.
+        rng (numpy.random.Generator): The NumPy random generator used by the columnar mode.
         patients (List[dict] or None): A list of generated patient data, initialized as None.
         facilities (List[dict] or None): A list of generated facility data, initialized as None.
-        visits (List[dict] or None): A list of generated visit data, initialized as None.
+        visits (List[dict], pa.Table or None): Generated visit data (a pyarrow Table in columnar mode),
+                                               initialized as None.
     """
 
-    def __init__(self):
+    def __init__(self, seed=None, value_pool=None, reproducible=None):
         """
         Initializes the DataGenerator class with configuration values and sets up Faker.
+
+        Args:
+            seed (int, optional): Seeds Faker and the random generators. Defaults to generator_config.seed.
+            value_pool (FakerValuePool, optional): An already loaded value pool to sample from in pooled mode.
+            reproducible (bool, optional): Whether the run has a base seed. Defaults to whether seed is set.
         """
+        self.seed = data_generator_config.seed if seed is None else seed
+        self.reproducible = self.seed is not None if reproducible is None else reproducible
+        self.shards = data_generator_config.shards
         self.fake = Faker()
+        if self.seed is not None:
+            self.fake.seed_instance(self.seed)
+        self.random = random.Random(self.seed)
+        self.rng = np.random.default_rng(self.seed)
         self.num_patients = data_generator_config.num_patients
         self.start_date = data_generator_config.start_date
         self.end_date = data_generator_config.end_date
         self.date_format = data_generator_config.date_format
         self.visits_per_day = data_generator_config.visits_per_day
         self.facility_types = data_generator_config.facility_types
+        self.generation_mode = data_generator_config.generation_mode
+        self.faker_pool_sizes = data_generator_config.faker_pool_sizes
+        self.faker_pool_cache_path = data_generator_config.faker_pool_cache_path
+        self.value_pool = value_pool
 
         self.patients = None
         self.facilities = None
         self.visits = None
 
-    def generate_patients(self):
+    def get_value_pool(self):
+        """
+        Returns the Faker value pool, loading it (from cache or Faker) on first use.
+
+        Returns:
+            FakerValuePool: The loaded value pool.
+        """
+        if self.value_pool is None:
+            self.value_pool = FakerValuePool(
+                fake=self.fake,
+                pool_sizes=self.faker_pool_sizes,
+                cache_path=self.faker_pool_cache_path,
+                seed=self.seed
+            ).load()
+        return self.value_pool
+
+    def date_of_birth_bounds(self):
+        """
+        Returns the range of dates of birth of adult (18 to 100 years old) patients.
+
+        The range is relative to today for unseeded runs (like Faker's date_of_birth), including the shards
+        of unseeded sharded runs, and to end_date for seeded runs, so seeded output does not depend on the
+        day of the run.
+
+        Returns:
+            Tuple[date, date]: The earliest and the latest date of birth.
+        """
+        if self.reproducible:
+            anchor = datetime.strptime(self.end_date, self.date_format).date()
+        else:
+            anchor = date.today()
+        return (anchor - timedelta(days=round(101 * 365.25)) + timedelta(days=1),
+                anchor - timedelta(days=round(18 * 365.25)))
+
+    def generate_date_of_birth(self):
+        """
+        Generates the date of birth of an adult (18 to 100 years old) patient.
+
+        Returns:
+            str: The date of birth in the configured date format.
+        """
+        if not self.reproducible:
+            return self.fake.date_of_birth(minimum_age=18, maximum_age=100).strftime(self.date_format)
+        earliest, latest = self.date_of_birth_bounds()
+        return self.fake.date_between_dates(date_start=earliest, date_end=latest).strftime(self.date_format)
+
+    def generate_patients_pooled(self, first_id=1, count=None):
+        """
+        Generates patients by vectorized sampling from the Faker value pool.
+
+        Args:
+            first_id (int): The patient_id of the first generated patient. Defaults to 1.
+            count (int, optional): The number of patients to generate. Defaults to self.num_patients.
+
+        Returns:
+            List[dict] or pa.Table: Patients as dicts ('rows' mode) or as a pyarrow Table ('columnar' mode).
+        """
+        count = self.num_patients if count is None else count
+        pool = self.get_value_pool()
+        earliest, latest = self.date_of_birth_bounds()
+        earliest = np.datetime64(earliest, 'D')
+        columns = {
+            "patient_id": np.arange(first_id, first_id + count, dtype=np.int32),
+            "first_name": pool.sample('first_name', self.rng, count),
+            "last_name": pool.sample('last_name', self.rng, count),
+            "date_of_birth": earliest + self.rng.integers(0, (np.datetime64(latest, 'D') - earliest).astype(int),
+                                                          size=count, endpoint=True),
+            "address": pool.sample('address', self.rng, count)
+        }
+        if self.generation_mode == 'columnar':
+            return pa.table(columns)
+        columns["patient_id"] = columns["patient_id"].tolist()
+        columns["date_of_birth"] = [value.strftime(self.date_format) for value in columns["date_of_birth"].tolist()]
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    def generate_patients(self, first_id=1, count=None):
         """
         Generates a list of synthetic patient data.
 
+        Uses generate_patients_pooled instead when Faker value pools are configured.
+
+        Args:
+            first_id (int): The patient_id of the first generated patient. Defaults to 1.
+            count (int, optional): The number of patients to generate. Defaults to self.num_patients.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a patient with attributes:
                 - first_name (str): The first name of the patient.
@@ -49,13 +246,15 @@ class DataGenerator:
                 - date_of_birth (str): The date of birth of the patient in the configured date format.
                 - address (str): The address of the patient.
         """
+        if self.faker_pool_sizes:
+            return self.generate_patients_pooled(first_id=first_id, count=count)
         patients = []
-        for i in range(0, self.num_patients):
+        for i in range(0, self.num_patients if count is None else count):
             patients.append({
-                "patient_id": i + 1,
+                "patient_id": first_id + i,
                 "first_name": self.fake.first_name(),
                 "last_name": self.fake.last_name(),
-                "date_of_birth": self.fake.date_of_birth(minimum_age=18, maximum_age=100).strftime(self.date_format),
+                "date_of_birth": self.generate_date_of_birth(),
                 "address": self.fake.address()
             })
         return patients
@@ -64,6 +263,8 @@ class DataGenerator:
         """
         Generates a list of synthetic facility data.
 
+        Facility names and addresses are sampled from the Faker value pool when pools are configured.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a facility with attributes:
                 - facility_name (str): The name of the facility.
@@ -74,22 +275,33 @@ class DataGenerator:
         """
         city = self.fake.city()
         state = self.fake.state()
+        if self.faker_pool_sizes:
+            pool = self.get_value_pool()
+            names = pool.sample('company', self.rng, len(self.facility_types)).tolist()
+            addresses = pool.sample('address', self.rng, len(self.facility_types)).tolist()
+        else:
+            names = [self.fake.company() for _ in self.facility_types]
+            addresses = [self.fake.address() for _ in self.facility_types]
         facilities = []
         for i in range(0, len(self.facility_types)):
             facilities.append({
                 "facility_id": i + 1,
-                "facility_name": self.fake.company(),
+                "facility_name": names[i],
                 "facility_type": self.facility_types[i],
-                "address": self.fake.address(),
+                "address": addresses[i],
                 "city": city,
                 "state": state
             })
         return facilities
 
-    def generate_visits(self):
+    def generate_visits(self, start_date=None, end_date=None):
         """
         Generates a list of synthetic visit data.
 
+        Args:
+            start_date (str, optional): The first date to generate visits for. Defaults to self.start_date.
+            end_date (str, optional): The last date to generate visits for. Defaults to self.end_date.
+
         Returns:
             List[dict]: A list of dictionaries, each representing a visit with attributes:
                 - patient_id (int): The ID of the patient (randomly assigned).
@@ -100,46 +312,169 @@ class DataGenerator:
                 - duration_minutes (int): The duration of the visit in minutes (randomly generated).
         """
         visits = []
-        date_list = [(datetime.strptime(self.end_date, self.date_format) - timedelta(days=i)) for i in
-                     range((datetime.strptime(self.end_date, self.date_format)
-                            - datetime.strptime(self.start_date, self.date_format)).days + 1)]
-        for date in date_list:
-            num_visits_per_day = random.randint(self.visits_per_day[0], self.visits_per_day[1])
+        first_day = datetime.strptime(start_date or self.start_date, self.date_format)
+        last_day = datetime.strptime(end_date or self.end_date, self.date_format)
+        date_list = [(last_day - timedelta(days=i)) for i in range((last_day - first_day).days + 1)]
+        for visit_date in date_list:
+            num_visits_per_day = self.random.randint(self.visits_per_day[0], self.visits_per_day[1])
             for _ in range(num_visits_per_day):
-                random_hour = random.randint(0, 23)
-                random_minute = random.randint(0, 59)
-                random_second = random.randint(0, 59)
+                random_hour = self.random.randint(0, 23)
+                random_minute = self.random.randint(0, 59)
+                random_second = self.random.randint(0, 59)
                 visit_timestamp = datetime(
-                    year=date.year,
-                    month=date.month,
-                    day=date.day,
+                    year=visit_date.year,
+                    month=visit_date.month,
+                    day=visit_date.day,
                     hour=random_hour,
                     minute=random_minute,
                     second=random_second
                 )
                 visits.append({
-                    "patient_id": random.randint(1, self.num_patients),
-                    "facility_id": random.randint(1, len(self.facility_types)),
+                    "patient_id": self.random.randint(1, self.num_patients),
+                    "facility_id": self.random.randint(1, len(self.facility_types)),
                     "visit_timestamp": visit_timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                    "treatment_cost": round(random.uniform(50, 5000), 2),
-                    "duration_minutes": random.randint(15, 60)
+                    "treatment_cost": round(self.random.uniform(50, 5000), 2),
+                    "duration_minutes": self.random.randint(15, 60)
                 })
         return visits
 
-    def generate_data(self):
+    def generate_visits_columnar(self, start_date=None, end_date=None):
+        """
+        Generates synthetic visit data column by column with NumPy.
+
+        Produces the same distributions as generate_visits (visits per day, time of day, patient and
+        facility ids, treatment cost and duration), but draws every column in a single vectorized call
+        instead of building one dict per visit.
+
+        Args:
+            start_date (str, optional): The first date to generate visits for. Defaults to self.start_date.
+            end_date (str, optional): The last date to generate visits for. Defaults to self.end_date.
+
+        Returns:
+            pa.Table: A table with the columns patient_id, facility_id, visit_timestamp,
+                      treatment_cost and duration_minutes.
+        """
+        first_day = np.datetime64(datetime.strptime(start_date or self.start_date, self.date_format).date(), 'D')
+        last_day = np.datetime64(datetime.strptime(end_date or self.end_date, self.date_format).date(), 'D')
+        days = last_day - np.arange((last_day - first_day).astype(int) + 1)
+        visits_per_day = self.rng.integers(self.visits_per_day[0], self.visits_per_day[1], size=len(days),
+                                           endpoint=True)
+        num_visits = int(visits_per_day.sum())
+        visit_days = np.repeat(days, visits_per_day).astype('datetime64[s]')
+        offsets = self.rng.integers(0, 24 * 60 * 60, size=num_visits).astype('timedelta64[s]')
+        return pa.table({
+            "patient_id": self.rng.integers(1, self.num_patients, size=num_visits, endpoint=True, dtype=np.int32),
+            "facility_id": self.rng.integers(1, len(self.facility_types), size=num_visits, endpoint=True,
+                                             dtype=np.int32),
+            "visit_timestamp": visit_days + offsets,
+            "treatment_cost": np.round(self.rng.uniform(50, 5000, size=num_visits), 2),
+            "duration_minutes": self.rng.integers(15, 60, size=num_visits, endpoint=True, dtype=np.int32)
+        })
+
+    def generate_visits_between(self, start_date=None, end_date=None):
+        """
+        Generates visits for a date range using the configured generation mode.
+
+        Args:
+            start_date (str, optional): The first date to generate visits for. Defaults to self.start_date.
+            end_date (str, optional): The last date to generate visits for. Defaults to self.end_date.
+
+        Returns:
+            List[dict] or pa.Table: Visits as dicts ('rows' mode) or as a pyarrow Table ('columnar' mode).
+        """
+        if self.generation_mode == 'columnar':
+            return self.generate_visits_columnar(start_date=start_date, end_date=end_date)
+        return self.generate_visits(start_date=start_date, end_date=end_date)
+
+    def iter_visit_batches(self, batch_days):
+        """
+        Lazily generates visits in consecutive date-range batches from start_date to end_date.
+
+        Only the batch being consumed is held in memory, so memory usage does not depend on
+        the length of the start_date/end_date window.
+
+        Args:
+            batch_days (int): The number of days covered by a single batch.
+
+        Yields:
+            List[dict] or pa.Table: The visits of one date-range batch.
+        """
+        last_day = datetime.strptime(self.end_date, self.date_format)
+        batch_start = datetime.strptime(self.start_date, self.date_format)
+        while batch_start <= last_day:
+            batch_end = min(batch_start + timedelta(days=batch_days - 1), last_day)
+            yield self.generate_visits_between(
+                start_date=batch_start.strftime(self.date_format),
+                end_date=batch_end.strftime(self.date_format)
+            )
+            batch_start = batch_end + timedelta(days=1)
+
+    def generate_data_sharded(self, include_visits=True):
+        """
+        Generates synthetic data in shards across a process pool with derived per-shard seeds.
+
+        Patients are split by id range and visits by date range into `shards` contiguous shards.
+        Every shard is generated by its own DataGenerator seeded with derive_seed(seed, stream, shard),
+        and results are concatenated in shard order, so a given (seed, shards) pair always
+        produces identical data. With a single shard the work runs in-process. In pooled mode the
+        Faker value pool is loaded once here and shared with every shard.
+
+        Args:
+            include_visits (bool): Whether to generate visits as well. Defaults to True.
+        """
+        last_day = datetime.strptime(self.end_date, self.date_format)
+        first_day = datetime.strptime(self.start_date, self.date_format)
+        value_pool = self.get_value_pool() if self.faker_pool_sizes else None
+        patient_shards = [
+            (derive_seed(self.seed, PATIENTS_SEED_STREAM, index), offset + 1, count, value_pool, self.reproducible)
+            for index, (offset, count) in enumerate(split_range(self.num_patients, self.shards))
+        ]
+        visit_shards = [
+            (derive_seed(self.seed, VISITS_SEED_STREAM, index),
+             (first_day + timedelta(days=offset)).strftime(self.date_format),
+             (first_day + timedelta(days=offset + count - 1)).strftime(self.date_format))
+            for index, (offset, count) in enumerate(split_range((last_day - first_day).days + 1, self.shards))
+        ]
+
+        self.facilities = DataGenerator(
+            seed=derive_seed(self.seed, FACILITIES_SEED_STREAM, 0),
+            value_pool=value_pool
+        ).generate_facilities()
+        if self.shards == 1:
+            self.patients = concat_shards([generate_patients_shard(*shard) for shard in patient_shards])
+            if include_visits:
+                self.visits = concat_shards([generate_visits_shard(*shard) for shard in visit_shards])
+            return
+        with ProcessPoolExecutor(max_workers=self.shards) as executor:
+            self.patients = concat_shards(list(executor.map(generate_patients_shard, *zip(*patient_shards))))
+            if include_visits:
+                self.visits = concat_shards(list(executor.map(generate_visits_shard, *zip(*visit_shards))))
+
+    def generate_data(self, include_visits=True):
         """
         Generates synthetic data for patients, facilities, and visits, and stores them in the class attributes.
+
+        In 'columnar' generation mode visits are stored as a pyarrow Table. Seeded or multi-shard
+        configurations are delegated to generate_data_sharded.
+
+        Args:
+            include_visits (bool): Whether to generate visits as well. Streaming loaders pass False and
+                                   consume iter_visit_batches instead. Defaults to True.
         """
+        if self.seed is not None or self.shards > 1:
+            self.generate_data_sharded(include_visits=include_visits)
+            return
         self.patients = self.generate_patients()
         self.facilities = self.generate_facilities()
-        self.visits = self.generate_visits()
+        if include_visits:
+            self.visits = self.generate_visits_between()
 
     def get_visits(self):
         """
         Retrieves the generated visit data.
 
         Returns:
-            List[dict]: A list of visit data dictionaries.
+            List[dict] or pa.Table: A list of visit data dictionaries, or a pyarrow Table in columnar mode.
         """
         return self.visits
 
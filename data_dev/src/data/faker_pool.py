@@ -0,0 +1,113 @@
+import json
+import os
+
+import numpy as np
+
+
+class FakerValuePool:
+    """
+    A cache of pre-sampled Faker values used to build entities by vectorized sampling.
+
+    Faker providers are slow, so instead of calling them once per entity the pool draws a fixed
+    number of values per field once (optionally persisting them as JSON between runs). Entities are
+    then built by sampling pool indexes with NumPy. The pool size of a field is the maximum number of
+    distinct values (cardinality) that field can have in the generated data.
+
+    Attributes:
+        fake (Faker): The Faker instance used to fill the pools.
+        pool_sizes (Dict[str, int]): The number of values drawn per Faker provider name
+                                     (e.g. {'first_name': 5000, 'address': 100000}).
+        cache_path (str or None): JSON file the pools are persisted to and reused from.
+        seed (int or None): The seed the pools were drawn with; part of the cache key.
+        pools (Dict[str, np.ndarray] or None): The loaded pools, initialized as None.
+    """
+
+    def __init__(self, fake, pool_sizes, cache_path=None, seed=None):
+        """
+        Initializes the FakerValuePool.
+
+        Args:
+            fake (Faker): The Faker instance used to fill the pools.
+            pool_sizes (Dict[str, int]): The number of values drawn per Faker provider name.
+            cache_path (str, optional): JSON file the pools are persisted to and reused from.
+            seed (int, optional): The seed the pools were drawn with.
+        """
+        self.fake = fake
+        self.pool_sizes = dict(pool_sizes)
+        self.cache_path = cache_path
+        self.seed = seed
+        self.pools = None
+
+    def __getstate__(self):
+        """
+        Drops the Faker instance when the pool is pickled for a worker process; loaded pools are kept.
+
+        Returns:
+            dict: The picklable state of the pool.
+        """
+        state = self.__dict__.copy()
+        state['fake'] = None
+        return state
+
+    def read_cache(self):
+        """
+        Reads the pools from the cache file if it was built with the same pool sizes and seed.
+
+        Returns:
+            Dict[str, list] or None: The cached pools, or None if there is no usable cache.
+        """
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        with open(self.cache_path, 'r', encoding='utf-8') as cache_file:
+            cache = json.load(cache_file)
+        if cache.get('pool_sizes') != self.pool_sizes or cache.get('seed') != self.seed:
+            return None
+        return cache['pools']
+
+    def write_cache(self, pools):
+        """
+        Persists the pools to the cache file.
+
+        Args:
+            pools (Dict[str, list]): The pools to persist.
+        """
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        with open(self.cache_path, 'w', encoding='utf-8') as cache_file:
+            json.dump({'pool_sizes': self.pool_sizes, 'seed': self.seed, 'pools': pools}, cache_file)
+
+    def load(self):
+        """
+        Loads the pools from the cache or draws them from Faker (and caches them).
+
+        Returns:
+            FakerValuePool: The pool itself, for chaining.
+        """
+        pools = self.read_cache()
+        if pools is None:
+            pools = {
+                field: [getattr(self.fake, field)() for _ in range(size)]
+                for field, size in self.pool_sizes.items()
+            }
+            if self.cache_path:
+                self.write_cache(pools)
+        self.pools = {field: np.array(values, dtype=object) for field, values in pools.items()}
+        return self
+
+    def sample(self, field, rng, size):
+        """
+        Draws `size` values of a field uniformly from its pool.
+
+        Args:
+            field (str): The Faker provider name (e.g. 'first_name').
+            rng (numpy.random.Generator): The random generator used for sampling.
+            size (int): The number of values to draw.
+
+        Returns:
+            np.ndarray: An object array of sampled values.
+        """
+        if self.pools is None:
+            self.load()
+        pool = self.pools[field]
+        return pool[rng.integers(0, len(pool), size=size)]
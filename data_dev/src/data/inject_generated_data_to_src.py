@@ -1,12 +1,35 @@
+import csv
+import io
+import queue
+import threading
+from datetime import datetime
+from itertools import islice
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
 from data_dev.src.data.data_generator import DataGenerator
 from data_dev.queries import (
     CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY,
     CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY,
     CREATE_SRC_GENERATED_VISITS_TABLE_QUERY,
+    CREATE_SRC_GENERATED_VISITS_PARTITIONED_TABLE_QUERY,
     INSERT_SRC_GENERATED_FACILITIES_QUERY,
     INSERT_SRC_GENERATED_PATIENTS_QUERY,
-    INSERT_SRC_GENERATED_VISITS_QUERY
+    INSERT_SRC_GENERATED_VISITS_QUERY,
+    COPY_SRC_GENERATED_FACILITIES_QUERY,
+    COPY_SRC_GENERATED_PATIENTS_QUERY,
+    COPY_SRC_GENERATED_VISITS_QUERY
 )
+from data_dev.config import ingest_config, load_config
+from data_dev.src.data.partition_manager import PartitionManager
+
+FACILITIES_COLUMNS = ['facility_id', 'facility_name', 'facility_type', 'address', 'city', 'state']
+PATIENTS_COLUMNS = ['patient_id', 'first_name', 'last_name', 'date_of_birth', 'address']
+VISITS_COLUMNS = ['patient_id', 'facility_id', 'visit_timestamp', 'treatment_cost', 'duration_minutes']
+
+# Marks the end of the streamed visit batches in the producer/consumer queue
+END_OF_STREAM = object()
 
 
 class GeneratedDataLoader:
@@ -16,22 +39,39 @@ class GeneratedDataLoader:
     Attributes:
         conn (object): A database connection object.
         dg (DataGenerator): An instance of the DataGenerator class for generating synthetic data.
+        mode (str): The ingest mode ('copy' or 'insert'), sourced from ingest_config.mode.
+        batch_size (int): The number of rows per COPY statement, sourced from ingest_config.batch_size.
+        streaming (bool): Whether visits are generated and written concurrently in batches,
+                          sourced from ingest_config.streaming.
 
     Methods:
         - is_table_empty(cursor, table_name): Checks if a given table is empty.
+        - iter_records(data): Iterates over a list of dicts or a pyarrow Table as dicts.
         - inject_data_into_table(cursor, data, query): Inserts data into a table using a specified query.
+        - copy_data_into_table(cursor, data, query, columns, batch_size): Streams data into a table using COPY.
+        - stream_visits(cursor): Writes visit batches while a producer thread generates the next ones.
         - inject_data(): Creates tables (if not exist) and injects generated data into the database.
     """
 
-    def __init__(self, conn):
+    def __init__(self, conn, mode=None, batch_size=None, streaming=None):
         """
         Initializes the GeneratedDataLoader with a database connection.
 
         Args:
             conn (object): A database connection object.
+            mode (str, optional): Overrides ingest_config.mode ('copy' or 'insert').
+            batch_size (int, optional): Overrides ingest_config.batch_size.
+            streaming (bool, optional): Overrides ingest_config.streaming.
         """
         self.conn = conn
         self.dg = DataGenerator()
+        self.mode = mode or ingest_config.mode
+        self.batch_size = batch_size or ingest_config.batch_size
+        self.streaming = ingest_config.streaming if streaming is None else streaming
+        self.stream_batch_days = ingest_config.stream_batch_days
+        self.stream_queue_size = ingest_config.stream_queue_size
+        if self.mode not in ('copy', 'insert'):
+            raise ValueError(f"Unsupported ingest mode: {self.mode}")
 
     @staticmethod
     def is_table_empty(cursor, table_name):
@@ -49,6 +89,23 @@ class GeneratedDataLoader:
         cursor.execute(query)
         return cursor.fetchone()[0] == 0
 
+    @staticmethod
+    def iter_records(data):
+        """
+        Iterates over generated data as dicts, whether it is a list of dicts or a pyarrow Table.
+
+        Args:
+            data (iterable or pa.Table): Generated rows.
+
+        Yields:
+            dict: One row keyed by column name.
+        """
+        if isinstance(data, pa.Table):
+            for record_batch in data.to_batches():
+                yield from record_batch.to_pylist()
+        else:
+            yield from data
+
     @staticmethod
     def inject_data_into_table(cursor, data, query):
         """
@@ -56,54 +113,228 @@ class GeneratedDataLoader:
 
         Args:
             cursor (object): A database cursor object.
-            data (list): A list of data to be inserted.
+            data (list or pa.Table): Data to be inserted.
             query (str): The SQL query for inserting data.
+
+        Returns:
+            int: The number of inserted rows.
         """
-        for params in data:
+        row_count = 0
+        for params in GeneratedDataLoader.iter_records(data):
             cursor.execute(query, params)
+            row_count += 1
+        return row_count
+
+    @staticmethod
+    def copy_data_into_table(cursor, data, query, columns, batch_size):
+        """
+        Streams data into a table through PostgreSQL COPY FROM STDIN.
+
+        Rows are serialized to CSV in memory and sent in batches of `batch_size` rows,
+        so only one batch is buffered at a time. A pyarrow Table is encoded by the Arrow CSV writer
+        without materializing Python objects.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (iterable or pa.Table): Rows (dicts) or a pyarrow Table to be copied.
+            query (str): The COPY ... FROM STDIN query for the target table.
+            columns (list): Column names in the order expected by the COPY query.
+            batch_size (int): The number of rows sent by a single COPY statement.
+
+        Returns:
+            int: The number of copied rows.
+        """
+        if isinstance(data, pa.Table):
+            table = data.select(columns)
+            write_options = pa_csv.WriteOptions(include_header=False)
+            for offset in range(0, table.num_rows, batch_size):
+                buffer = io.BytesIO()
+                pa_csv.write_csv(table.slice(offset, batch_size), buffer, write_options=write_options)
+                buffer.seek(0)
+                cursor.copy_expert(query, buffer)
+            return table.num_rows
+
+        row_count = 0
+        rows = iter(data)
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            buffer = io.StringIO()
+            writer = csv.writer(buffer, lineterminator='\n')
+            for params in batch:
+                writer.writerow([params[column] for column in columns])
+            buffer.seek(0)
+            cursor.copy_expert(query, buffer)
+            row_count += len(batch)
+        return row_count
+
+    def write_rows(self, cursor, data, insert_query, copy_query, columns):
+        """
+        Writes rows into a src table using the configured ingest mode.
+
+        Args:
+            cursor (object): A database cursor object.
+            data (iterable or pa.Table): Rows (dicts) or a pyarrow Table to be written.
+            insert_query (str): The per-row INSERT query used in 'insert' mode.
+            copy_query (str): The COPY ... FROM STDIN query used in 'copy' mode.
+            columns (list): Column names in the order expected by the COPY query.
+
+        Returns:
+            int: The number of written rows.
+        """
+        if self.mode == 'copy':
+            return self.copy_data_into_table(cursor=cursor, data=data, query=copy_query,
+                                             columns=columns, batch_size=self.batch_size)
+        return self.inject_data_into_table(cursor=cursor, data=data, query=insert_query)
+
+    @staticmethod
+    def put_batch(batches, item, stop_event):
+        """
+        Puts an item on the batch queue, giving up once the consumer has stopped.
+
+        Args:
+            batches (queue.Queue): The bounded queue shared with the consumer.
+            item (object): A visit batch, an exception or END_OF_STREAM.
+            stop_event (threading.Event): Set by the consumer when it stops reading the queue.
+
+        Returns:
+            bool: True if the item was queued, False if the consumer has stopped.
+        """
+        while not stop_event.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce_visit_batches(self, batches, stop_event):
+        """
+        Generates visit batches and queues them for the consumer (runs on the producer thread).
+
+        Errors are forwarded through the queue so the consumer can re-raise them.
+
+        Args:
+            batches (queue.Queue): The bounded queue shared with the consumer.
+            stop_event (threading.Event): Set by the consumer when it stops reading the queue.
+        """
+        try:
+            for batch in self.dg.iter_visit_batches(self.stream_batch_days):
+                if not self.put_batch(batches, batch, stop_event):
+                    return
+            item = END_OF_STREAM
+        except Exception as e:
+            item = e
+        self.put_batch(batches, item, stop_event)
+
+    def stream_visits(self, cursor):
+        """
+        Writes visits batch by batch while a producer thread generates the next batches.
+
+        The queue between the producer and this (consumer) method is bounded by stream_queue_size,
+        so at most stream_queue_size + 1 batches are held in memory at any time and generation
+        overlaps with database writes.
+
+        Args:
+            cursor (object): A database cursor object.
+
+        Returns:
+            int: The number of written visits.
+        """
+        batches = queue.Queue(maxsize=self.stream_queue_size)
+        stop_event = threading.Event()
+        producer = threading.Thread(target=self.produce_visit_batches, args=(batches, stop_event),
+                                    name='visit-batch-producer', daemon=True)
+        producer.start()
+        row_count = 0
+        try:
+            while True:
+                batch = batches.get()
+                if batch is END_OF_STREAM:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                row_count += self.write_rows(
+                    cursor=cursor,
+                    data=batch,
+                    insert_query=INSERT_SRC_GENERATED_VISITS_QUERY,
+                    copy_query=COPY_SRC_GENERATED_VISITS_QUERY,
+                    columns=VISITS_COLUMNS
+                )
+        finally:
+            stop_event.set()
+            producer.join()
+        return row_count
 
     def inject_data(self):
         """
         Creates tables (if they don't exist) and injects generated data into the database.
 
         This method:
-        1. Creates the `src_generated_facilities`, `src_generated_patients`, and 
-           `src_generated_visits` tables if they do not already exist.
+        1. Creates the `src_generated_facilities`, `src_generated_patients`, and
+           `src_generated_visits` tables if they do not already exist (`src_generated_visits` is
+           range-partitioned by month, with partitions covering the generated period, if
+           load_config.partitioned_visits is set).
         2. Checks if the `src_generated_visits` table is empty.
         3. If the table is empty, generates synthetic data for facilities, patients, and visits.
-        4. Inserts the generated data into the respective tables.
+        4. Inserts the generated data into the respective tables using the configured ingest mode.
+           In streaming mode visits are generated and written concurrently in date-range batches.
         5. Commits the transaction if successful, or rolls back in case of an error.
+
+        Returns:
+            bool: True if the data was injected (or already present), False if the transaction was rolled back.
         """
         cursor = self.conn.cursor()
         try:
             # Create tables if they do not exist
             cursor.execute(CREATE_SRC_GENERATED_FACILITIES_TABLE_QUERY)
             cursor.execute(CREATE_SRC_GENERATED_PATIENTS_TABLE_QUERY)
-            cursor.execute(CREATE_SRC_GENERATED_VISITS_TABLE_QUERY)
+            if load_config.partitioned_visits:
+                cursor.execute(CREATE_SRC_GENERATED_VISITS_PARTITIONED_TABLE_QUERY)
+                if PartitionManager.is_partitioned(cursor, 'src_generated_visits'):
+                    PartitionManager(self.conn).ensure_monthly_partitions(
+                        cursor, 'src_generated_visits',
+                        datetime.strptime(self.dg.start_date, self.dg.date_format),
+                        datetime.strptime(self.dg.end_date, self.dg.date_format)
+                    )
+            else:
+                cursor.execute(CREATE_SRC_GENERATED_VISITS_TABLE_QUERY)
 
             # Generate and insert data if the visits table is empty
             if self.is_table_empty(cursor=cursor, table_name='src_generated_visits'):
-                self.dg.generate_data()
-                self.inject_data_into_table(
+                self.dg.generate_data(include_visits=not self.streaming)
+                self.write_rows(
                     cursor=cursor,
                     data=self.dg.get_facilities(),
-                    query=INSERT_SRC_GENERATED_FACILITIES_QUERY
+                    insert_query=INSERT_SRC_GENERATED_FACILITIES_QUERY,
+                    copy_query=COPY_SRC_GENERATED_FACILITIES_QUERY,
+                    columns=FACILITIES_COLUMNS
                 )
-                self.inject_data_into_table(
+                self.write_rows(
                     cursor=cursor,
                     data=self.dg.get_patients(),
-                    query=INSERT_SRC_GENERATED_PATIENTS_QUERY
-                )
-                self.inject_data_into_table(
-                    cursor=cursor,
-                    data=self.dg.get_visits(),
-                    query=INSERT_SRC_GENERATED_VISITS_QUERY
+                    insert_query=INSERT_SRC_GENERATED_PATIENTS_QUERY,
+                    copy_query=COPY_SRC_GENERATED_PATIENTS_QUERY,
+                    columns=PATIENTS_COLUMNS
                 )
+                if self.streaming:
+                    self.stream_visits(cursor=cursor)
+                else:
+                    self.write_rows(
+                        cursor=cursor,
+                        data=self.dg.get_visits(),
+                        insert_query=INSERT_SRC_GENERATED_VISITS_QUERY,
+                        copy_query=COPY_SRC_GENERATED_VISITS_QUERY,
+                        columns=VISITS_COLUMNS
+                    )
                 self.conn.commit()
+            return True
         except Exception as e:
             # Rollback the transaction in case of an error
             self.conn.rollback()
             print(f"Error occurred: {e}")
+            return False
         finally:
             # Close the cursor
             cursor.close()
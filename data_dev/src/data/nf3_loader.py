@@ -1,10 +1,28 @@
+from datetime import datetime, time, timedelta
+
 from data_dev.queries import (CREATE_FACILITIES_TABLE_QUERY,
                               CREATE_PATIENTS_TABLE_QUERY,
-                              CREATE_VISITS_TABLE_QUERY)
+                              CREATE_VISITS_TABLE_QUERY,
+                              CREATE_VISITS_PARTITIONED_TABLE_QUERY,
+                              CREATE_LOAD_STATE_TABLE_QUERY)
 from data_dev.queries import (MERGE_PATIENTS_QUERY,
                               MERGE_VISITS_QUERY,
+                              MERGE_VISITS_INCREMENTAL_QUERY,
                               MERGE_FACILITIES_QUERY)
+from data_dev.queries import (INSERT_FACILITIES_ON_CONFLICT_QUERY,
+                              INSERT_PATIENTS_ON_CONFLICT_QUERY,
+                              INSERT_VISITS_ON_CONFLICT_QUERY)
+from data_dev.queries import (GET_LOAD_STATE_QUERY,
+                              UPSERT_LOAD_STATE_QUERY,
+                              SRC_VISITS_DELTA_QUERY)
+from data_dev.queries import (CREATE_DAILY_FACILITY_VISIT_SUMMARY_TABLE_QUERY,
+                              CREATE_PATIENT_FACILITY_COST_SUMMARY_TABLE_QUERY,
+                              REFRESH_DAILY_FACILITY_VISIT_SUMMARY_QUERY,
+                              REFRESH_PATIENT_FACILITY_COST_SUMMARY_QUERY,
+                              TRUNCATE_SUMMARY_TABLES_QUERY)
 from data_dev.config import load_config
+from data_dev.src.data.schema_provisioner import SchemaProvisioner
+from data_dev.src.data.partition_manager import PartitionManager
 
 
 class NF3Loader:
@@ -12,11 +30,26 @@ class NF3Loader:
     A class to handle the loading and transformation of data into a 3NF (Third Normal Form) database schema.
 
     This class is responsible for:
-    1. Creating the necessary database tables if they do not already exist.
-    2. Merging data into the 3NF tables using predefined SQL queries.
+    1. Creating the necessary database tables, indexes and unique keys if they do not already exist.
+    2. Merging data into the 3NF tables using predefined SQL queries (MERGE or INSERT ... ON CONFLICT).
+    3. Tracking a high-water mark of visits in the load_state table, so that incremental runs merge only
+       the source visits that arrived since the previous load. The dimensions (facilities, patients) are
+       small and merged completely on every run.
+    4. Optionally keeping visits range-partitioned by month: partitions are created as date_scope advances,
+       visits are merged partition by partition and old partitions can be detached.
+    5. Optionally maintaining the daily_facility_visit_summary and patient_facility_cost_summary aggregate
+       tables over the window of every load, so that readers do not have to scan the visits fact table.
 
     Attributes:
         conn: A psycopg2 database connection object used to interact with the database.
+        date_scope (str): The last date (inclusive) of visits to load, sourced from load_config.date_scope.
+        incremental (bool): Whether to merge only the delta past the watermark, sourced from load_config.incremental.
+        strategy (str): 'merge' or 'on_conflict', sourced from load_config.strategy.
+        partitioned (bool): Whether visits is partitioned by month, sourced from load_config.partitioned_visits.
+        retention_months (int or None): Months of visits partitions to keep attached,
+                                        sourced from load_config.retention_months.
+        partition_manager (PartitionManager): Manages the monthly partitions of visits.
+        summary_tables (bool): Whether the summary tables are maintained, sourced from load_config.summary_tables.
     """
 
     def __init__(self, conn):
@@ -27,16 +60,180 @@ class NF3Loader:
             conn: A psycopg2 database connection object.
         """
         self.conn = conn
+        self.date_scope = load_config.date_scope
+        self.incremental = load_config.incremental
+        self.strategy = load_config.strategy
+        if self.strategy not in ('merge', 'on_conflict'):
+            raise ValueError(f"Unsupported 3NF load strategy: {self.strategy}")
+        self.partitioned = load_config.partitioned_visits
+        self.retention_months = load_config.retention_months
+        self.partition_manager = PartitionManager(conn)
+        self.summary_tables = load_config.summary_tables
+
+    def load_upper_bound(self):
+        """
+        Return the exclusive upper bound of the load: the day after date_scope.
+
+        Returns:
+            str: The upper bound formatted as 'YYYY-MM-DD'.
+        """
+        return (datetime.strptime(self.date_scope, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def get_load_state(cursor, entity_name):
+        """
+        Read the load state of an entity.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            entity_name (str): The name of the 3NF entity (e.g. 'visits').
+
+        Returns:
+            tuple or None: (last_visit_timestamp, source_row_count), or None if the entity was never loaded.
+        """
+        cursor.execute(GET_LOAD_STATE_QUERY, {'entity_name': entity_name})
+        return cursor.fetchone()
+
+    @staticmethod
+    def save_load_state(cursor, entity_name, last_visit_timestamp, source_row_count):
+        """
+        Record the load state of an entity.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            entity_name (str): The name of the 3NF entity (e.g. 'visits').
+            last_visit_timestamp (datetime or None): The high-water mark of loaded source visits.
+            source_row_count (int): The number of source rows loaded so far.
+        """
+        cursor.execute(UPSERT_LOAD_STATE_QUERY, {
+            'entity_name': entity_name,
+            'last_visit_timestamp': last_visit_timestamp,
+            'source_row_count': source_row_count
+        })
+
+    def merge_visits(self, cursor):
+        """
+        Merge visits up to date_scope.
+
+        In incremental mode only source visits at or past the recorded high-water mark are merged
+        (rows at the mark itself are re-checked by the MERGE condition), so the cost of a run depends
+        on the size of the delta rather than on the size of the history.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+        """
+        upper_bound = self.load_upper_bound()
+        state = self.get_load_state(cursor, 'visits')
+        if not self.incremental or state is None or state[0] is None:
+            lower_bound, loaded_row_count = '-infinity', 0
+        else:
+            lower_bound, loaded_row_count = state
+
+        cursor.execute(SRC_VISITS_DELTA_QUERY, {'lower_bound': lower_bound, 'upper_bound': upper_bound})
+        first_visit_timestamp, last_visit_timestamp, new_row_count = cursor.fetchone()
+        if last_visit_timestamp is None:
+            return
+
+        if self.partitioned:
+            self.merge_visits_partition_wise(cursor, lower_bound, upper_bound,
+                                             first_visit_timestamp, last_visit_timestamp)
+        elif self.strategy == 'on_conflict':
+            cursor.execute(INSERT_VISITS_ON_CONFLICT_QUERY, {'lower_bound': lower_bound, 'upper_bound': upper_bound})
+        elif self.incremental:
+            cursor.execute(MERGE_VISITS_INCREMENTAL_QUERY, {'lower_bound': lower_bound, 'upper_bound': upper_bound})
+        else:
+            cursor.execute(MERGE_VISITS_QUERY, {'date_scope': self.date_scope})
+        self.save_load_state(cursor, 'visits', last_visit_timestamp, loaded_row_count + new_row_count)
+
+    def merge_visits_partition_wise(self, cursor, lower_bound, upper_bound, first_visit_timestamp,
+                                    last_visit_timestamp):
+        """
+        Merge visits month by month into a visits table partitioned by month.
+
+        Missing partitions are created first. Every statement is bounded to one month on both the source
+        and the target side, so each one touches a single partition of visits (and of src_generated_visits
+        when it is partitioned too).
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            lower_bound (datetime or str): The watermark ('-infinity' for a full load).
+            upper_bound (str): The exclusive upper bound of the load (the day after date_scope).
+            first_visit_timestamp (datetime): The earliest source visit in the delta.
+            last_visit_timestamp (datetime): The latest source visit in the delta.
+        """
+        query = INSERT_VISITS_ON_CONFLICT_QUERY if self.strategy == 'on_conflict' else MERGE_VISITS_INCREMENTAL_QUERY
+        self.partition_manager.ensure_monthly_partitions(cursor, 'visits', first_visit_timestamp, last_visit_timestamp)
+        load_upper_bound = datetime.strptime(upper_bound, '%Y-%m-%d')
+        for month_lower, month_upper in self.partition_manager.month_ranges(first_visit_timestamp,
+                                                                           last_visit_timestamp):
+            partition_lower = datetime.combine(month_lower, time.min)
+            if isinstance(lower_bound, datetime):
+                partition_lower = max(partition_lower, lower_bound)
+            partition_upper = min(datetime.combine(month_upper, time.min), load_upper_bound)
+            cursor.execute(query, {'lower_bound': partition_lower, 'upper_bound': partition_upper})
+
+    def detach_expired_partitions(self, cursor):
+        """
+        Detach the visits partitions older than retention_months before date_scope.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Returns:
+            List[str]: The names the detached partitions were renamed to.
+        """
+        retention_start = self.partition_manager.shift_months(
+            self.partition_manager.month_start(self.date_scope), -self.retention_months
+        )
+        return self.partition_manager.detach_partitions_before(cursor, 'visits', retention_start)
+
+    def refresh_summaries(self, cursor, rebuild=False):
+        """
+        Bring the summary tables up to date with visits.
+
+        The summaries have their own high-water mark ('visit_summaries' in load_state): days from the
+        mark to date_scope are recomputed in daily_facility_visit_summary, and the (facility, patient)
+        pairs with visits in that window are recomputed in patient_facility_cost_summary. Without a mark
+        (first run, non-incremental load or rebuild) the summaries are computed from all visits.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            rebuild (bool): Truncate the summaries and recompute them from all visits
+                            (e.g. after visits partitions were detached).
+        """
+        visits_state = self.get_load_state(cursor, 'visits')
+        if visits_state is None or visits_state[0] is None:
+            return
+        state = self.get_load_state(cursor, 'visit_summaries')
+        if rebuild:
+            cursor.execute(TRUNCATE_SUMMARY_TABLES_QUERY)
+        elif self.incremental and state is not None and state[0] == visits_state[0]:
+            return
+        if rebuild or not self.incremental or state is None or state[0] is None:
+            lower_bound = '-infinity'
+        else:
+            lower_bound = state[0]
+        params = {'lower_bound': lower_bound, 'upper_bound': self.load_upper_bound()}
+        cursor.execute(REFRESH_DAILY_FACILITY_VISIT_SUMMARY_QUERY, params)
+        cursor.execute(REFRESH_PATIENT_FACILITY_COST_SUMMARY_QUERY, params)
+        self.save_load_state(cursor, 'visit_summaries', visits_state[0], visits_state[1])
 
     def load_data(self):
         """
         Load and transform data into the 3NF database schema.
 
         This method performs the following steps:
-        1. Creates the necessary tables (facilities, patients, visits) if they do not already exist.
-        2. Merges data into the 3NF tables using predefined SQL queries.
-        3. Commits the transaction if all operations succeed.
-        4. Rolls back the transaction and prints the error if any operation fails.
+        1. Creates the necessary tables (facilities, patients, visits, load_state) if they do not already exist
+           and provisions the missing indexes of the src and 3NF layers; with the 'on_conflict' strategy the
+           load stops if its unique keys cannot be created.
+        2. Merges data into the 3NF tables using predefined SQL queries (only the visits delta in incremental mode).
+        3. Records the new high-water marks in the load_state table.
+        4. Refreshes the summary tables over the loaded window (if enabled).
+        5. Commits the transaction if all operations succeed.
+        6. Rolls back the transaction and prints the error if any operation fails.
+
+        Returns:
+            bool: True if the transaction was committed, False if it was rolled back.
 
         Raises:
             Exception: If any SQL execution fails, the exception is caught, the transaction is rolled back,
@@ -47,19 +244,42 @@ class NF3Loader:
             # Create tables if they do not exist
             cursor.execute(CREATE_FACILITIES_TABLE_QUERY)
             cursor.execute(CREATE_PATIENTS_TABLE_QUERY)
-            cursor.execute(CREATE_VISITS_TABLE_QUERY)
+            cursor.execute(CREATE_VISITS_PARTITIONED_TABLE_QUERY if self.partitioned else CREATE_VISITS_TABLE_QUERY)
+            cursor.execute(CREATE_LOAD_STATE_TABLE_QUERY)
+            if self.summary_tables:
+                cursor.execute(CREATE_DAILY_FACILITY_VISIT_SUMMARY_TABLE_QUERY)
+                cursor.execute(CREATE_PATIENT_FACILITY_COST_SUMMARY_TABLE_QUERY)
+            if self.partitioned and not self.partition_manager.is_partitioned(cursor, 'visits'):
+                print("Table visits already exists and is not partitioned, loading it as a single table.")
+                self.partitioned = False
+
+            # Create the missing indexes (and unique keys of the ON CONFLICT strategy)
+            provisioner = SchemaProvisioner(self.conn, self.strategy)
+            provisioner.provision_src(cursor)
+            provisioner.provision_nf3(cursor)
+            provisioner.require_unique_keys(cursor)
 
             # Merge data into 3NF tables
-            cursor.execute(MERGE_FACILITIES_QUERY)
-            cursor.execute(MERGE_PATIENTS_QUERY)
-            cursor.execute(MERGE_VISITS_QUERY, {'date_scope': load_config.date_scope})
+            on_conflict = self.strategy == 'on_conflict'
+            cursor.execute(INSERT_FACILITIES_ON_CONFLICT_QUERY if on_conflict else MERGE_FACILITIES_QUERY)
+            cursor.execute(INSERT_PATIENTS_ON_CONFLICT_QUERY if on_conflict else MERGE_PATIENTS_QUERY)
+            self.merge_visits(cursor)
+            detached = []
+            if self.partitioned and self.retention_months is not None:
+                detached = self.detach_expired_partitions(cursor)
+
+            # Refresh the summary layer over the loaded window
+            if self.summary_tables:
+                self.refresh_summaries(cursor, rebuild=bool(detached))
 
             # Commit the transaction
             self.conn.commit()
+            return True
         except Exception as e:
             # Rollback the transaction in case of an error
             self.conn.rollback()
             print(f"An error occurred during data loading: {e}")
+            return False
         finally:
             # Close the cursor
             cursor.close()
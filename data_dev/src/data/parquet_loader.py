@@ -1,12 +1,64 @@
+import hashlib
+import json
+import logging
 import os
+import shutil
+import time
+from datetime import datetime
+from urllib.parse import unquote
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 
 from data_dev.queries import (
     TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
     TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
     TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL
 )
-from data_dev.config import parquet_storage_config
+from data_dev.queries import (
+    TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_FROM_SUMMARY_SQL,
+    TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_FROM_SUMMARY_SQL,
+    TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_SUMMARY_SQL
+)
+from data_dev.queries import (
+    VISITS_LOAD_MARKER_QUERY,
+    MONTHLY_PARTITION_CHECKSUM_QUERY,
+    FACILITY_TYPE_PARTITION_CHECKSUM_QUERY,
+    MONTHLY_PARTITION_CHECKSUM_FROM_SUMMARY_QUERY,
+    FACILITY_TYPE_PARTITION_CHECKSUM_FROM_SUMMARY_QUERY,
+    MONTHS_FILTERED_TRANSFORM_QUERY,
+    MONTH_RANGE_FILTER,
+    FILTERED_TRANSFORM_QUERY,
+    FACILITY_TYPE_PARTITION_FILTER
+)
+from data_dev.config import parquet_storage_config, load_config, ParquetWriteProfile
+from data_dev.src.data.parquet_manifest import ParquetManifest
+from data_dev.src.data.partition_manager import PartitionManager
+from data_dev.src.metrics.run_metrics import run_metrics
+
+# The leading underscore makes pyarrow skip the file when reading the dataset
+EXPORT_STATE_FILE_NAME = '_export_state.json'
+
+# Result schemas of the transform queries, used by the 'copy_arrow' read mode
+FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA = pa.schema([
+    ('facility_type', pa.string()),
+    ('visit_date', pa.date32()),
+    ('avg_time_spent', pa.decimal128(12, 2))
+])
+
+PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA = pa.schema([
+    ('facility_type', pa.string()),
+    ('full_name', pa.string()),
+    ('sum_treatment_cost', pa.decimal128(20, 2))
+])
+
+FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA = pa.schema([
+    ('facility_name', pa.string()),
+    ('visit_date', pa.date32()),
+    ('min_time_spent', pa.int32())
+])
 
 
 class LoadParquet:
@@ -23,21 +75,64 @@ class LoadParquet:
         Path to store the Parquet file for patient sum treatment cost per facility type.
     storage_path_facility_name_min_time_spent_per_visit_date : str
         Path to store the Parquet file for facility name minimum time spent per visit date.
+    read_mode : str
+        'read_sql' (whole result in memory), 'server_cursor' (result streamed in chunks)
+        or 'copy_arrow' (COPY TO STDOUT parsed straight into a typed pyarrow Table).
+    chunk_rows : int
+        Number of rows per chunk in 'server_cursor' read mode.
+    incremental : bool
+        Whether only the partitions whose source rows changed since the previous export are rewritten.
+    write_profiles : dict
+        Physical layout (ParquetWriteProfile) of every dataset, by dataset name.
+    use_summary_tables : bool
+        Whether the transforms read the summary tables maintained by NF3Loader instead of the visits table.
+    write_manifest : bool
+        Whether a manifest (_metadata, _common_metadata, _manifest.json) is written after every export.
 
     Methods:
     --------
-    read_data(query):
+    read_data(query, connection_object, params):
         Executes the given SQL query and returns the result as a DataFrame.
-    to_parquet(df, storage_path, partition_columns):
+    write_profile(storage_path):
+        Returns the ParquetWriteProfile of the dataset stored at the given path.
+    parquet_write_options(write_profile):
+        Translates a ParquetWriteProfile into pyarrow Parquet writer options.
+    to_parquet(df, storage_path, partition_columns, write_profile):
         Writes the given DataFrame to a Parquet file at the specified storage path, partitioned by the given columns.
+    to_parquet_chunk(df, storage_path, partition_columns, chunk_index, written_partitions, write_profile):
+        Writes one chunk of a streamed result, replacing only partitions not yet written by earlier chunks.
+    table_to_parquet(table, storage_path, partition_columns, write_profile):
+        Writes the given pyarrow Table to a Parquet dataset, partitioned by the given columns.
+    read_export_state(storage_path):
+        Reads the per-partition checksums recorded by the previous export of a dataset.
+    write_export_state(storage_path, state):
+        Records the per-partition checksums of a dataset.
+    visits_load_marker(connection_object):
+        Returns the load state of visits (watermark, loaded row count) and the first month of visits.
+    change_lower_bound(previous_state, load_marker, monthly_partitions):
+        Returns the lower bound of the visits that can have changed since the previous export.
+    partition_checksums(checksum_query, connection_object, lower_bound):
+        Returns the current row count/checksum of every partition with rows at or past the lower bound.
+    months_filtered_query(transform_query, partition_keys, source_table, column):
+        Restricts a transform query to the given months of its source table.
+    stale_partitions(storage_path, partition_column, partition_keys):
+        Returns the partition keys on disk that no longer exist in the source.
+    remove_partitions(storage_path, partition_column, partition_keys):
+        Deletes the directories of the given partitions.
+    export(query, storage_path, prepare, partition_columns, connection_object, checksum_query, partition_filter,
+           schema, prepare_table, month_source):
+        Reads the query result (whole, streamed or copied, depending on read_mode), prepares it and writes it
+        to Parquet; in incremental mode only the changed partitions are re-aggregated and rewritten.
     transform_facility_type_avg_time_spent_per_visit_date():
         Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
     transform_patient_sum_treatment_cost_per_facility_type():
         Transforms data for patient sum treatment cost per facility type and writes it to a Parquet file.
     transform_facility_name_min_time_spent_per_visit_date():
         Transforms data for facility name minimum time spent per visit date and writes it to a Parquet file.
+    run_transform(transform, connection_object):
+        Runs one transformation and returns its duration in seconds.
     load_parquet():
-        Executes all transformations and loads the results into Parquet files.
+        Executes all transformations one after another and loads the results into Parquet files.
     """
 
     def __init__(self, connection_object):
@@ -59,8 +154,15 @@ class LoadParquet:
         self.storage_path_facility_name_min_time_spent_per_visit_date = (
             parquet_storage_config.storage_path_facility_name_min_time_spent_per_visit_date
         )
+        self.read_mode = parquet_storage_config.read_mode
+        self.chunk_rows = parquet_storage_config.chunk_rows
+        self.incremental = parquet_storage_config.incremental
+        self.write_profiles = parquet_storage_config.write_profiles
+        self.write_manifest = parquet_storage_config.write_manifest
+        # The summary tables exist only if NF3Loader maintains them
+        self.use_summary_tables = parquet_storage_config.use_summary_tables and load_config.summary_tables
 
-    def read_data(self, query):
+    def read_data(self, query, connection_object=None, params=None):
         """
         Executes the given SQL query and returns the result as a DataFrame.
 
@@ -68,17 +170,62 @@ class LoadParquet:
         -----------
         query : str
             SQL query to execute.
+        connection_object : object, optional
+            Connection to execute the query on. Defaults to self.connection_object.
+        params : dict, optional
+            Query parameters.
 
         Returns:
         --------
         DataFrame
             Resulting data from the SQL query.
         """
-        df = self.connection_object.get_data_sql(query=query)
+        df = (connection_object or self.connection_object).get_data_sql(query=query, params=params)
         return df
 
+    def write_profile(self, storage_path):
+        """
+        Returns the physical layout of the dataset stored at the given path.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset; its last component is the dataset name.
+
+        Returns:
+        --------
+        ParquetWriteProfile
+            The configured profile, or the pyarrow defaults if the dataset has none.
+        """
+        return self.write_profiles.get(os.path.basename(os.path.normpath(storage_path)), ParquetWriteProfile())
+
     @staticmethod
-    def to_parquet(df, storage_path, partition_columns):
+    def parquet_write_options(write_profile):
+        """
+        Translates a ParquetWriteProfile into options of the pyarrow Parquet writer.
+
+        Parameters:
+        -----------
+        write_profile : ParquetWriteProfile
+            Physical layout of the dataset.
+
+        Returns:
+        --------
+        dict
+            Keyword arguments for pq.write_to_dataset (and DataFrame.to_parquet); unset options are omitted.
+        """
+        options = {
+            'compression': write_profile.compression,
+            'use_dictionary': write_profile.use_dictionary,
+            'write_statistics': write_profile.write_statistics,
+            'row_group_size': write_profile.row_group_size,
+            'compression_level': write_profile.compression_level,
+            'data_page_size': write_profile.data_page_size
+        }
+        return {name: value for name, value in options.items() if value is not None}
+
+    @staticmethod
+    def to_parquet(df, storage_path, partition_columns, write_profile=None):
         """
         Writes the given DataFrame to a Parquet file at the specified storage path, partitioned by the given columns.
 
@@ -90,59 +237,571 @@ class LoadParquet:
             Path to store the Parquet file.
         partition_columns : list
             Columns to partition the Parquet file by.
+        write_profile : ParquetWriteProfile, optional
+            Physical layout of the Parquet files. Defaults to the pyarrow defaults.
         """
+        write_profile = write_profile or ParquetWriteProfile()
         os.makedirs(storage_path, exist_ok=True)
+        if write_profile.sort_by:
+            df = df.sort_values(write_profile.sort_by, kind='stable', ignore_index=True)
         df.to_parquet(
             storage_path,
             engine='pyarrow',
             partition_cols=partition_columns,
             index=False,
-            existing_data_behavior='delete_matching'
+            existing_data_behavior='delete_matching',
+            **LoadParquet.parquet_write_options(write_profile)
         )
 
-    def transform_facility_type_avg_time_spent_per_visit_date(self):
+    @staticmethod
+    def to_parquet_chunk(df, storage_path, partition_columns, chunk_index, written_partitions, write_profile=None):
         """
-        Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
+        Writes one chunk of a streamed query result to a partitioned Parquet dataset.
+
+        Partitions seen for the first time in this run replace the existing files of that partition
+        (like to_parquet does), while rows of partitions already written by earlier chunks are added
+        as new files next to them.
+
+        Parameters:
+        -----------
+        df : DataFrame
+            Chunk to write.
+        storage_path : str
+            Path to store the Parquet files.
+        partition_columns : list
+            Columns to partition the Parquet files by.
+        chunk_index : int
+            Index of the chunk, used to give every chunk unique file names.
+        written_partitions : set
+            Partition keys written by earlier chunks; updated in place.
+        write_profile : ParquetWriteProfile, optional
+            Physical layout of the Parquet files. Defaults to the pyarrow defaults; rows are sorted per chunk.
+        """
+        write_profile = write_profile or ParquetWriteProfile()
+        os.makedirs(storage_path, exist_ok=True)
+        if write_profile.sort_by:
+            df = df.sort_values(write_profile.sort_by, kind='stable', ignore_index=True)
+        if len(partition_columns) == 1:
+            keys = df[partition_columns[0]]
+        else:
+            keys = pd.Series(list(zip(*[df[column] for column in partition_columns])), index=df.index)
+        is_new = ~keys.isin(written_partitions)
+        for rows, behavior in ((df[is_new], 'delete_matching'), (df[~is_new], 'overwrite_or_ignore')):
+            if rows.empty:
+                continue
+            rows.to_parquet(
+                storage_path,
+                engine='pyarrow',
+                partition_cols=partition_columns,
+                index=False,
+                existing_data_behavior=behavior,
+                basename_template=f"chunk-{chunk_index}-{behavior}-{{i}}.parquet",
+                **LoadParquet.parquet_write_options(write_profile)
+            )
+        written_partitions.update(keys.unique())
+
+    @staticmethod
+    def read_export_state(storage_path):
+        """
+        Reads the export state recorded by the previous export of a dataset.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset.
+
+        Returns:
+        --------
+        dict or None
+            {'query_hash': ..., 'partitions': {partition key: checksum}}, or None if there is no usable state.
+        """
+        try:
+            with open(os.path.join(storage_path, EXPORT_STATE_FILE_NAME)) as state_file:
+                return json.load(state_file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def write_export_state(storage_path, state):
+        """
+        Records the export state of a dataset, replacing the state file atomically.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset.
+        state : dict
+            {'query_hash': ..., 'partitions': {partition key: checksum}}.
+        """
+        state_path = os.path.join(storage_path, EXPORT_STATE_FILE_NAME)
+        with open(state_path + '.tmp', 'w') as state_file:
+            json.dump(state, state_file, indent=2, sort_keys=True)
+        os.replace(state_path + '.tmp', state_path)
+
+    def visits_load_marker(self, connection_object=None):
+        """
+        Returns what identifies the content of the visits table between two loads.
+
+        Parameters:
+        -----------
+        connection_object : object, optional
+            Connection to execute the query on. Defaults to self.connection_object.
+
+        Returns:
+        --------
+        dict
+            {'last_visit_timestamp': ISO string, 'source_row_count': int, 'first_visit_month': 'YYYY-MM'};
+            values are None while visits were never loaded.
+        """
+        row = self.read_data(VISITS_LOAD_MARKER_QUERY, connection_object).iloc[0]
+        return {
+            'last_visit_timestamp': None if pd.isna(row['last_visit_timestamp'])
+            else pd.Timestamp(row['last_visit_timestamp']).isoformat(),
+            'source_row_count': None if pd.isna(row['source_row_count']) else int(row['source_row_count']),
+            'first_visit_month': None if pd.isna(row['first_visit_month']) else str(row['first_visit_month'])
+        }
+
+    @staticmethod
+    def change_lower_bound(previous_state, load_marker, monthly_partitions):
+        """
+        Returns the lower bound of the visits that can have changed since the previous export.
+
+        Incremental 3NF loads only add visits at or past the watermark recorded in load_state, so while
+        the first month of visits stays the same, only the rows from the previous watermark on have to be
+        checked - from the start of its month for monthly partitions, whose checksums cover whole months.
+
+        Parameters:
+        -----------
+        previous_state : dict or None
+            Export state of the previous export (with the same transform query).
+        load_marker : dict
+            Current visits_load_marker().
+        monthly_partitions : bool
+            Whether the dataset is partitioned by the month of visit_timestamp.
+
+        Returns:
+        --------
+        datetime, str or None
+            None if nothing was loaded since the previous export, '-infinity' if every row has to be checked
+            (first export, non-incremental 3NF loads, detached months or a reloaded database).
+        """
+        previous_marker = (previous_state or {}).get('visits_load_marker')
+        if (not load_config.incremental or not previous_marker or None in previous_marker.values()
+                or None in load_marker.values()):
+            return '-infinity'
+        previous_watermark = datetime.fromisoformat(previous_marker['last_visit_timestamp'])
+        if (load_marker['first_visit_month'] != previous_marker['first_visit_month']
+                or datetime.fromisoformat(load_marker['last_visit_timestamp']) < previous_watermark
+                or load_marker['source_row_count'] < previous_marker['source_row_count']):
+            return '-infinity'
+        if load_marker == previous_marker:
+            return None
+        if monthly_partitions:
+            return datetime(previous_watermark.year, previous_watermark.month, 1)
+        return previous_watermark
+
+    def partition_checksums(self, checksum_query, connection_object=None, lower_bound='-infinity'):
+        """
+        Returns the current row count and checksum of the source rows of every partition.
+
+        Parameters:
+        -----------
+        checksum_query : str
+            Query returning partition_key, row_count and checksum of the rows at or past %(lower_bound)s.
+        connection_object : object, optional
+            Connection to execute the query on. Defaults to self.connection_object.
+        lower_bound : datetime or str, optional
+            Only rows at or past this visit timestamp are checksummed. Defaults to all rows.
+
+        Returns:
+        --------
+        dict
+            Partition key -> '<row_count>:<checksum>'.
+        """
+        df = self.read_data(checksum_query, connection_object, {'lower_bound': lower_bound})
+        return {str(row.partition_key): f"{row.row_count}:{row.checksum}" for row in df.itertuples(index=False)}
+
+    @staticmethod
+    def months_filtered_query(transform_query, partition_keys, source_table, column):
+        """
+        Restricts a transform query to some months of its source table.
+
+        The source table is shadowed by a CTE keeping only [month start, next month start) ranges of the
+        column (adjacent months are merged into one range), so the months are read by index range scans
+        or partition pruning instead of a filter on a computed month.
+
+        Parameters:
+        -----------
+        transform_query : str
+            Transform SQL query reading source_table.
+        partition_keys : list
+            Months to keep, as 'YYYY-MM'.
+        source_table : str
+            Table read by the transform query (visits or daily_facility_visit_summary).
+        column : str
+            Timestamp or date column of source_table the months are taken from.
+
+        Returns:
+        --------
+        tuple
+            (filtered query, query parameters).
+        """
+        ranges = []
+        for partition_key in sorted(partition_keys):
+            lower_bound = datetime.strptime(partition_key, '%Y-%m').date()
+            if ranges and ranges[-1][1] == lower_bound:
+                ranges[-1][1] = PartitionManager.next_month(lower_bound)
+            else:
+                ranges.append([lower_bound, PartitionManager.next_month(lower_bound)])
+        params = {}
+        for index, (lower_bound, upper_bound) in enumerate(ranges):
+            params[f'month_lower_{index}'] = lower_bound
+            params[f'month_upper_{index}'] = upper_bound
+        month_ranges = '\n        OR '.join(MONTH_RANGE_FILTER.format(column=column, index=index)
+                                            for index in range(len(ranges)))
+        query = MONTHS_FILTERED_TRANSFORM_QUERY.format(source_table=source_table, month_ranges=month_ranges,
+                                                       transform_query=transform_query.strip())
+        return query, params
+
+    @staticmethod
+    def stale_partitions(storage_path, partition_column, partition_keys):
+        """
+        Returns the partitions written to disk whose keys no longer exist in the source
+        (e.g. a renamed facility type or months dropped by the retention of the visits partitions).
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset.
+        partition_column : str
+            Partition column of the dataset (the directories are named <partition_column>=<key>).
+        partition_keys : iterable
+            Current partition keys of the source rows.
+
+        Returns:
+        --------
+        list
+            Keys of the stale partitions, in sorted order.
+        """
+        if not os.path.isdir(storage_path):
+            return []
+        prefix = f"{partition_column}="
+        keys = set(partition_keys)
+        return sorted(
+            unquote(name[len(prefix):]) for name in os.listdir(storage_path)
+            if name.startswith(prefix) and unquote(name[len(prefix):]) not in keys
+        )
+
+    @staticmethod
+    def remove_partitions(storage_path, partition_column, partition_keys):
+        """
+        Deletes the directories of the given partitions.
+
+        Parameters:
+        -----------
+        storage_path : str
+            Path of the Parquet dataset.
+        partition_column : str
+            Partition column of the dataset.
+        partition_keys : list
+            Keys of the partitions to delete.
+        """
+        prefix = f"{partition_column}="
+        for name in os.listdir(storage_path):
+            if name.startswith(prefix) and unquote(name[len(prefix):]) in partition_keys:
+                shutil.rmtree(os.path.join(storage_path, name))
+
+    @staticmethod
+    def table_to_parquet(table, storage_path, partition_columns, write_profile=None):
+        """
+        Writes the given pyarrow Table to a Parquet dataset at the specified storage path, partitioned by the given
+        columns.
+
+        Parameters:
+        -----------
+        table : pa.Table
+            Data to write to the Parquet files.
+        storage_path : str
+            Path to store the Parquet files.
+        partition_columns : list
+            Columns to partition the Parquet files by.
+        write_profile : ParquetWriteProfile, optional
+            Physical layout of the Parquet files. Defaults to the pyarrow defaults.
+        """
+        write_profile = write_profile or ParquetWriteProfile()
+        os.makedirs(storage_path, exist_ok=True)
+        if write_profile.sort_by:
+            table = table.sort_by([(column, 'ascending') for column in write_profile.sort_by])
+        pq.write_to_dataset(
+            table,
+            storage_path,
+            partition_cols=partition_columns,
+            existing_data_behavior='delete_matching',
+            **LoadParquet.parquet_write_options(write_profile)
+        )
+
+    def export(self, query, storage_path, prepare, partition_columns, connection_object=None, checksum_query=None,
+               partition_filter=None, schema=None, prepare_table=None, month_source=None):
+        """
+        Reads the result of a transform query, prepares it and writes it to a partitioned Parquet dataset.
+
+        In 'server_cursor' read mode the result is streamed through a server-side cursor and written
+        chunk by chunk, so it never has to fit into memory at once. In 'copy_arrow' read mode the result
+        is copied as CSV and parsed into a pyarrow Table of the given schema, skipping pandas entirely.
+
+        In incremental mode the per-partition checksums of the source rows are compared with the ones
+        recorded in the dataset's export state file. Only the changed partitions are re-aggregated (the
+        transform query is restricted to the changed months or partition keys) and rewritten; when nothing
+        changed the export is skipped. A changed transform query or a missing state file triggers a full export.
+        The checksums only cover the visits the 3NF load can have added since the previous export (see
+        change_lower_bound): the months from the previous watermark on for monthly partitions, whose other
+        checksums are carried over, and the partitions with visits past the watermark otherwise, which are
+        all rewritten. Nothing is read at all when the load state of visits did not change.
+        Partitions on disk whose keys are no longer in the source (renamed facility types, months dropped
+        by retention) are deleted, in incremental and full exports alike.
+
+        The dataset manifest is removed before anything is read or written and, once the export succeeded,
+        written again from the footers of its files (if write_manifest is set).
+
+        Parameters:
+        -----------
+        query : str
+            Transform SQL query.
+        storage_path : str
+            Path to store the Parquet files.
+        prepare : callable
+            Function adding the partition column(s) to a DataFrame (chunk).
+        partition_columns : list
+            Columns to partition the Parquet files by.
+        connection_object : object, optional
+            Connection to read the query result from. Defaults to self.connection_object.
+        checksum_query : str, optional
+            Query returning partition_key, row_count and checksum of the source rows; enables incremental mode.
+        partition_filter : str, optional
+            Condition on the transform result columns (aliased t) selecting %(partition_keys)s.
+        schema : pa.Schema, optional
+            Result schema of the transform query, required in 'copy_arrow' read mode.
+        prepare_table : callable, optional
+            Function adding the partition column(s) to a pyarrow Table, required in 'copy_arrow' read mode.
+        month_source : tuple, optional
+            (source table, column) of datasets partitioned by month ('YYYY-MM'): changed months are re-read
+            as ranges of that column (see months_filtered_query) instead of through partition_filter.
+        """
+        connection_object = connection_object or self.connection_object
+        write_profile = self.write_profile(storage_path)
+        # Readers must not trust a manifest of files that this export may delete or rewrite
+        ParquetManifest(storage_path).remove()
+        params = None
+        state = None
+        changed = None
+        stale = []
+        if self.incremental and checksum_query:
+            load_marker = self.visits_load_marker(connection_object)
+            # The read mode is part of the hash: switching it rewrites the whole dataset with consistent types
+            query_hash = hashlib.sha256(f"{self.read_mode}\n{query}".encode()).hexdigest()
+            previous_state = self.read_export_state(storage_path)
+            if previous_state and previous_state.get('query_hash') != query_hash:
+                previous_state = None
+            previous_checksums = previous_state.get('partitions', {}) if previous_state else {}
+            lower_bound = self.change_lower_bound(previous_state, load_marker, month_source is not None)
+            if lower_bound is None:
+                checksums = previous_checksums
+            else:
+                checksums = self.partition_checksums(checksum_query, connection_object, lower_bound)
+            if isinstance(lower_bound, datetime):
+                if month_source is not None:
+                    # Months before the previous watermark cannot have changed
+                    lower_key = lower_bound.strftime('%Y-%m')
+                    checksums = {**{key: checksum for key, checksum in previous_checksums.items()
+                                    if key < lower_key}, **checksums}
+                else:
+                    # The checksums cover only the visits past the watermark: their partitions changed
+                    changed = sorted(checksums)
+                    checksums = {**previous_checksums, **checksums}
+            state = {'query_hash': query_hash, 'partitions': checksums, 'visits_load_marker': load_marker}
+            stale = self.stale_partitions(storage_path, partition_columns[0], checksums)
+            if previous_state:
+                if changed is None:
+                    changed = sorted(key for key, checksum in checksums.items()
+                                     if previous_checksums.get(key) != checksum)
+                logging.info(f"Parquet export of {storage_path}: {len(changed)} of {len(checksums)} "
+                             f"partitions changed, {len(stale)} removed")
+                if changed and len(changed) < len(checksums):
+                    if month_source is not None:
+                        query, params = self.months_filtered_query(query, changed, *month_source)
+                    else:
+                        query = FILTERED_TRANSFORM_QUERY.format(transform_query=query.strip().rstrip(';'),
+                                                                partition_filter=partition_filter)
+                        params = {'partition_keys': changed}
+
+        if stale:
+            self.remove_partitions(storage_path, partition_columns[0], stale)
+        # Nothing to rewrite when nothing changed or only stale partitions were removed
+        if changed != []:
+            if self.read_mode == 'copy_arrow':
+                table = connection_object.copy_data_arrow(query=query, schema=schema, params=params)
+                self.table_to_parquet(table=prepare_table(table), storage_path=storage_path,
+                                      partition_columns=partition_columns, write_profile=write_profile)
+            elif self.read_mode == 'server_cursor':
+                written_partitions = set()
+                chunks = connection_object.iter_data_sql(query=query, chunk_rows=self.chunk_rows, params=params)
+                for chunk_index, df in enumerate(chunks):
+                    self.to_parquet_chunk(
+                        df=prepare(df),
+                        storage_path=storage_path,
+                        partition_columns=partition_columns,
+                        chunk_index=chunk_index,
+                        written_partitions=written_partitions,
+                        write_profile=write_profile
+                    )
+            else:
+                self.to_parquet(df=prepare(self.read_data(query, connection_object, params)), storage_path=storage_path,
+                                partition_columns=partition_columns, write_profile=write_profile)
+        os.makedirs(storage_path, exist_ok=True)
+        if self.write_manifest:
+            ParquetManifest(storage_path).write()
+        if state is not None:
+            self.write_export_state(storage_path, state)
+
+    @staticmethod
+    def add_partition_date(df):
+        """
+        Converts visit_date to datetime and adds the monthly partition_date column (YYYY-MM).
         """
-        df = self.read_data(TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL)
         df['visit_date'] = pd.to_datetime(df['visit_date'])
         df['partition_date'] = df['visit_date'].dt.to_period('M').astype(str)
-        self.to_parquet(
-            df=df,
+        return df
+
+    @staticmethod
+    def add_partition_date_table(table):
+        """
+        Converts visit_date to timestamp (as add_partition_date does) and adds the monthly partition_date
+        column (YYYY-MM) to a pyarrow Table.
+        """
+        visit_date = table['visit_date'].cast(pa.timestamp('ns'))
+        table = table.set_column(table.schema.get_field_index('visit_date'), 'visit_date', visit_date)
+        return table.append_column('partition_date', pc.strftime(visit_date, format='%Y-%m'))
+
+    @staticmethod
+    def add_facility_type_partition_table(table):
+        """
+        Adds the facility_type_partition column (facility_type with spaces replaced by underscores)
+        to a pyarrow Table.
+        """
+        return table.append_column('facility_type_partition',
+                                   pc.replace_substring(table['facility_type'], pattern=' ', replacement='_'))
+
+    # TODO: do better approach for: df['facility_type_partition'] = df['facility_type'] - workaround,
+    @staticmethod
+    def add_facility_type_partition(df):
+        """
+        Adds the facility_type_partition column (facility_type with spaces replaced by underscores).
+        """
+        df['facility_type_partition'] = df['facility_type'].str.replace(" ", "_")
+        return df
+
+    def transform_facility_type_avg_time_spent_per_visit_date(self, connection_object=None):
+        """
+        Transforms data for facility type average time spent per visit date and writes it to a Parquet file.
+        """
+        self.export(
+            query=TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_FROM_SUMMARY_SQL if self.use_summary_tables
+            else TRANSFORM_FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SQL,
             storage_path=self.storage_path_facility_type_avg_time_spent_per_visit_date,
-            partition_columns=['partition_date']
+            prepare=self.add_partition_date,
+            partition_columns=['partition_date'],
+            connection_object=connection_object,
+            checksum_query=MONTHLY_PARTITION_CHECKSUM_FROM_SUMMARY_QUERY if self.use_summary_tables
+            else MONTHLY_PARTITION_CHECKSUM_QUERY,
+            schema=FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA,
+            prepare_table=self.add_partition_date_table,
+            month_source=('daily_facility_visit_summary', 'visit_date') if self.use_summary_tables
+            else ('visits', 'visit_timestamp')
         )
 
-    # TODO: do better approach for: df['facility_type_partition'] = df['facility_type'] - workaround,
-    def transform_patient_sum_treatment_cost_per_facility_type(self):
+    def transform_patient_sum_treatment_cost_per_facility_type(self, connection_object=None):
         """
         Transforms data for patient sum treatment cost per facility type and writes it to a Parquet file.
         """
-        df = self.read_data(TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL)
-        df['facility_type_partition'] = df['facility_type'].str.replace(" ", "_")
-        self.to_parquet(
-            df=df,
+        self.export(
+            query=TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_FROM_SUMMARY_SQL if self.use_summary_tables
+            else TRANSFORM_PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SQL,
             storage_path=self.storage_path_patient_sum_treatment_cost_per_facility_type,
-            partition_columns=['facility_type_partition']
+            prepare=self.add_facility_type_partition,
+            partition_columns=['facility_type_partition'],
+            connection_object=connection_object,
+            checksum_query=FACILITY_TYPE_PARTITION_CHECKSUM_FROM_SUMMARY_QUERY if self.use_summary_tables
+            else FACILITY_TYPE_PARTITION_CHECKSUM_QUERY,
+            partition_filter=FACILITY_TYPE_PARTITION_FILTER,
+            schema=PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA,
+            prepare_table=self.add_facility_type_partition_table
         )
 
-    def transform_facility_name_min_time_spent_per_visit_date(self):
+    def transform_facility_name_min_time_spent_per_visit_date(self, connection_object=None):
         """
         Transforms data for facility name minimum time spent per visit date and writes it to a Parquet file.
         """
-        df = self.read_data(TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL)
-        df['visit_date'] = pd.to_datetime(df['visit_date'])
-        df['partition_date'] = df['visit_date'].dt.to_period('M').astype(str)
-        self.to_parquet(
-            df=df,
+        self.export(
+            query=TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_FROM_SUMMARY_SQL if self.use_summary_tables
+            else TRANSFORM_FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SQL,
             storage_path=self.storage_path_facility_name_min_time_spent_per_visit_date,
-            partition_columns=['partition_date']
+            prepare=self.add_partition_date,
+            partition_columns=['partition_date'],
+            connection_object=connection_object,
+            checksum_query=MONTHLY_PARTITION_CHECKSUM_FROM_SUMMARY_QUERY if self.use_summary_tables
+            else MONTHLY_PARTITION_CHECKSUM_QUERY,
+            schema=FACILITY_NAME_MIN_TIME_SPENT_PER_VISIT_DATE_SCHEMA,
+            prepare_table=self.add_partition_date_table,
+            month_source=('daily_facility_visit_summary', 'visit_date') if self.use_summary_tables
+            else ('visits', 'visit_timestamp')
         )
 
+    def run_transform(self, transform, connection_object=None):
+        """
+        Runs one transformation inside a metrics span and logs its duration.
+
+        Parameters:
+        -----------
+        transform : callable
+            One of the transform_* methods.
+        connection_object : object, optional
+            Connection to run the transformation on.
+
+        Returns:
+        --------
+        float
+            Duration of the transformation in seconds.
+        """
+        storage_paths = {
+            'transform_facility_type_avg_time_spent_per_visit_date':
+                self.storage_path_facility_type_avg_time_spent_per_visit_date,
+            'transform_patient_sum_treatment_cost_per_facility_type':
+                self.storage_path_patient_sum_treatment_cost_per_facility_type,
+            'transform_facility_name_min_time_spent_per_visit_date':
+                self.storage_path_facility_name_min_time_spent_per_visit_date
+        }
+        started = time.perf_counter()
+        with run_metrics.span(transform.__name__, output_path=storage_paths.get(transform.__name__)):
+            transform(connection_object=connection_object)
+        duration = time.perf_counter() - started
+        logging.info(f"Parquet transform {transform.__name__} completed in {duration:.2f}s")
+        return duration
+
     def load_parquet(self):
         """
         Executes all transformations and loads the results into Parquet files.
+
+        The pipeline (main.py) runs every transformation as a stage of its own instead, on its own pooled
+        connection, and runs those stages in parallel when parquet_storage_config.concurrent is set.
+
+        Returns:
+        --------
+        dict
+            Duration in seconds of every transformation, by transform name.
         """
-        self.transform_facility_type_avg_time_spent_per_visit_date()
-        self.transform_patient_sum_treatment_cost_per_facility_type()
-        self.transform_facility_name_min_time_spent_per_visit_date()
+        transforms = [
+            self.transform_facility_type_avg_time_spent_per_visit_date,
+            self.transform_patient_sum_treatment_cost_per_facility_type,
+            self.transform_facility_name_min_time_spent_per_visit_date
+        ]
+        return {transform.__name__: self.run_transform(transform) for transform in transforms}
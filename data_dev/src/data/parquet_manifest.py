@@ -0,0 +1,239 @@
+import json
+import os
+from datetime import date, datetime, timezone
+
+import pyarrow.parquet as pq
+
+# Files starting with an underscore are skipped by pyarrow when it reads the dataset
+MANIFEST_FILE_NAME = '_manifest.json'
+METADATA_FILE_NAME = '_metadata'
+COMMON_METADATA_FILE_NAME = '_common_metadata'
+
+
+class ParquetManifest:
+    """
+    A class to describe a hive-partitioned Parquet dataset by the footers of its files.
+
+    Writes next to the data:
+    1. _common_metadata: the Arrow schema of the data files (partition columns are encoded in directory names).
+    2. _metadata: the row group metadata of every file, with file paths relative to the dataset root,
+       so that pyarrow.parquet.ParquetDataset / pyarrow.dataset.parquet_dataset can plan reads without
+       opening every file.
+    3. _manifest.json: a small JSON summary - total row count, schema and, per file, its path, partition
+       values, row count, size, and null count/min/max of every column - for consumers that prune files
+       or answer count checks without Parquet tooling.
+
+    Only the footers are read, never the data pages. The export removes the manifest before it touches the
+    data and writes it again once the export succeeded, and readers ignore a manifest listing files that are
+    gone or were rewritten, so a missing manifest always means "list the directories".
+
+    Attributes:
+        storage_path (str): The root directory of the dataset.
+    """
+
+    def __init__(self, storage_path):
+        """
+        Initialize the ParquetManifest with the root directory of a dataset.
+
+        Args:
+            storage_path (str): The root directory of the dataset.
+        """
+        self.storage_path = storage_path
+
+    @staticmethod
+    def json_value(value):
+        """
+        Convert a Parquet statistics value into a JSON-serializable value.
+
+        Args:
+            value: An int, float, str, bytes, Decimal, date or datetime.
+
+        Returns:
+            The value itself for JSON-native types, an ISO string for dates, a string otherwise.
+        """
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, bytes):
+            return value.decode('utf-8', errors='replace')
+        return str(value)
+
+    def data_files(self):
+        """
+        List the data files of the dataset, skipping files and directories starting with '_' or '.'.
+
+        Returns:
+            List[str]: The file paths relative to the dataset root, in sorted order.
+        """
+        files = []
+        for root, directories, names in os.walk(self.storage_path):
+            directories[:] = sorted(d for d in directories if not d.startswith(('_', '.')))
+            for name in sorted(names):
+                if name.endswith('.parquet') and not name.startswith(('_', '.')):
+                    files.append(os.path.relpath(os.path.join(root, name), self.storage_path))
+        return files
+
+    @staticmethod
+    def partition_values(relative_path):
+        """
+        Parse the hive partition values (key=value directories) of a data file.
+
+        Args:
+            relative_path (str): The file path relative to the dataset root.
+
+        Returns:
+            Dict[str, str]: The partition values by partition column.
+        """
+        values = {}
+        for part in os.path.dirname(relative_path).split(os.sep):
+            if '=' in part:
+                key, value = part.split('=', 1)
+                values[key] = value
+        return values
+
+    def column_statistics(self, metadata):
+        """
+        Aggregate the row group statistics of a file per column.
+
+        Args:
+            metadata (pq.FileMetaData): The footer of the file.
+
+        Returns:
+            Dict[str, dict]: null_count, min and max per column; None where a statistic is not available.
+        """
+        columns = {}
+        for column_index in range(metadata.num_columns):
+            name = metadata.schema.column(column_index).name
+            null_count, minimum, maximum, complete = 0, None, None, True
+            for row_group_index in range(metadata.num_row_groups):
+                statistics = metadata.row_group(row_group_index).column(column_index).statistics
+                if statistics is None:
+                    complete = False
+                    continue
+                if statistics.has_null_count:
+                    null_count += statistics.null_count
+                else:
+                    complete = False
+                if statistics.has_min_max:
+                    minimum = statistics.min if minimum is None else min(minimum, statistics.min)
+                    maximum = statistics.max if maximum is None else max(maximum, statistics.max)
+            columns[name] = {
+                'null_count': null_count if complete else None,
+                'min': self.json_value(minimum),
+                'max': self.json_value(maximum)
+            }
+        return columns
+
+    def build(self):
+        """
+        Read the footers of all data files and build the manifest.
+
+        Returns:
+            Tuple[dict, List[pq.FileMetaData]]: The manifest and the footers of the files (in the same order).
+        """
+        entries, footers = [], []
+        for relative_path in self.data_files():
+            full_path = os.path.join(self.storage_path, relative_path)
+            metadata = pq.read_metadata(full_path)
+            footers.append(metadata)
+            entries.append({
+                'path': relative_path.replace(os.sep, '/'),
+                'partition': self.partition_values(relative_path),
+                'num_rows': metadata.num_rows,
+                'num_row_groups': metadata.num_row_groups,
+                'size_bytes': os.path.getsize(full_path),
+                'columns': self.column_statistics(metadata)
+            })
+        schema = footers[0].schema.to_arrow_schema() if footers else None
+        manifest = {
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'num_rows': sum(entry['num_rows'] for entry in entries),
+            'num_files': len(entries),
+            'partition_columns': sorted({key for entry in entries for key in entry['partition']}),
+            'schema': [{'name': f.name, 'type': str(f.type)} for f in schema] if schema is not None else [],
+            'files': entries
+        }
+        return manifest, footers
+
+    def write(self):
+        """
+        Write _common_metadata, _metadata and _manifest.json into the dataset root.
+
+        If the files do not share one schema (e.g. after a change of the write types), _metadata cannot
+        be combined and is removed instead; the JSON manifest is still written.
+
+        Returns:
+            dict: The written manifest.
+        """
+        manifest, footers = self.build()
+        metadata_path = os.path.join(self.storage_path, METADATA_FILE_NAME)
+        if footers:
+            schema = footers[0].schema.to_arrow_schema()
+            pq.write_metadata(schema, os.path.join(self.storage_path, COMMON_METADATA_FILE_NAME))
+            try:
+                combined = None
+                for entry, metadata in zip(manifest['files'], footers):
+                    metadata.set_file_path(entry['path'])
+                    if combined is None:
+                        combined = metadata
+                    else:
+                        combined.append_row_groups(metadata)
+                combined.write_metadata_file(metadata_path)
+            except RuntimeError as e:
+                print(f"Parquet _metadata was not written for {self.storage_path}: {e}")
+                if os.path.exists(metadata_path):
+                    os.remove(metadata_path)
+
+        manifest_path = os.path.join(self.storage_path, MANIFEST_FILE_NAME)
+        with open(manifest_path + '.tmp', 'w') as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+        return manifest
+
+    def remove(self):
+        """
+        Remove _manifest.json, _metadata and _common_metadata from the dataset root, if they exist.
+        """
+        for file_name in (MANIFEST_FILE_NAME, METADATA_FILE_NAME, COMMON_METADATA_FILE_NAME):
+            try:
+                os.remove(os.path.join(self.storage_path, file_name))
+            except FileNotFoundError:
+                pass
+
+    def is_current(self, manifest):
+        """
+        Check that every file listed by a manifest still exists with the recorded size.
+
+        Args:
+            manifest (dict): A manifest of the dataset.
+
+        Returns:
+            bool: True if the manifest still describes the files on disk.
+        """
+        for entry in manifest['files']:
+            full_path = os.path.join(self.storage_path, *entry['path'].split('/'))
+            try:
+                if os.path.getsize(full_path) != entry['size_bytes']:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def read(self):
+        """
+        Read the JSON manifest of the dataset.
+
+        Returns:
+            dict or None: The manifest, or None if the dataset has no (readable) manifest or the manifest
+                          lists files that no longer exist as written.
+        """
+        try:
+            with open(os.path.join(self.storage_path, MANIFEST_FILE_NAME)) as manifest_file:
+                manifest = json.load(manifest_file)
+        except (OSError, ValueError):
+            return None
+        try:
+            return manifest if self.is_current(manifest) else None
+        except (KeyError, TypeError):
+            return None
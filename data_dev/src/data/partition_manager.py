@@ -0,0 +1,206 @@
+from datetime import date, datetime
+
+from data_dev.queries import (
+    IS_TABLE_PARTITIONED_QUERY,
+    LIST_PARTITIONS_QUERY,
+    RELATION_EXISTS_QUERY,
+    CREATE_MONTHLY_PARTITION_QUERY,
+    ATTACH_MONTHLY_PARTITION_QUERY,
+    DETACH_PARTITION_QUERY,
+    RENAME_TABLE_QUERY
+)
+
+
+class PartitionManager:
+    """
+    A class to manage monthly range partitions of tables partitioned by visit_timestamp.
+
+    Partitions are named <table>_yYYYYmMM (e.g. visits_y2025m01), so that their names sort chronologically,
+    and cover [first day of the month, first day of the next month). Detached partitions are renamed to
+    <partition>_detached_<YYYYMMDDHHMMSS>, which frees the partition name for a later reload of the month.
+
+    Attributes:
+        conn: A psycopg2 database connection object used to interact with the database.
+    """
+
+    def __init__(self, conn):
+        """
+        Initialize the PartitionManager with a database connection.
+
+        Args:
+            conn: A psycopg2 database connection object.
+        """
+        self.conn = conn
+
+    @staticmethod
+    def month_start(value):
+        """
+        Truncate a date, datetime or 'YYYY-MM-DD...' string to the first day of its month.
+
+        Args:
+            value (date, datetime or str): The value to truncate.
+
+        Returns:
+            date: The first day of the month.
+        """
+        if isinstance(value, str):
+            value = datetime.strptime(value[:10], '%Y-%m-%d')
+        return date(value.year, value.month, 1)
+
+    @staticmethod
+    def shift_months(month, months):
+        """
+        Shift the first day of a month by a number of months.
+
+        Args:
+            month (date): The first day of a month.
+            months (int): The number of months to shift by (negative values shift backwards).
+
+        Returns:
+            date: The first day of the shifted month.
+        """
+        month_index = month.year * 12 + month.month - 1 + months
+        return date(month_index // 12, month_index % 12 + 1, 1)
+
+    @classmethod
+    def next_month(cls, month):
+        """
+        Return the first day of the month following the given month.
+
+        Args:
+            month (date): The first day of a month.
+
+        Returns:
+            date: The first day of the next month.
+        """
+        return cls.shift_months(month, 1)
+
+    @classmethod
+    def month_ranges(cls, start, end):
+        """
+        List the monthly [lower, upper) ranges covering the period from start to end (both inclusive).
+
+        Args:
+            start (date, datetime or str): The start of the period.
+            end (date, datetime or str): The end of the period.
+
+        Returns:
+            List[Tuple[date, date]]: The month ranges in chronological order.
+        """
+        month = cls.month_start(start)
+        last_month = cls.month_start(end)
+        ranges = []
+        while month <= last_month:
+            ranges.append((month, cls.next_month(month)))
+            month = cls.next_month(month)
+        return ranges
+
+    @staticmethod
+    def partition_name(table_name, month):
+        """
+        Build the name of a monthly partition.
+
+        Args:
+            table_name (str): The partitioned (parent) table.
+            month (date): The first day of the month.
+
+        Returns:
+            str: The partition name, e.g. visits_y2025m01.
+        """
+        return f"{table_name}_y{month.year:04d}m{month.month:02d}"
+
+    @staticmethod
+    def is_partitioned(cursor, table_name):
+        """
+        Check whether a table is a declaratively partitioned table.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            table_name (str): The table to check.
+
+        Returns:
+            bool: True if the table exists and is partitioned.
+        """
+        cursor.execute(IS_TABLE_PARTITIONED_QUERY, {'table_name': table_name})
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def list_partitions(cursor, table_name):
+        """
+        List the partitions attached to a table.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            table_name (str): The partitioned (parent) table.
+
+        Returns:
+            List[str]: The partition names in chronological order.
+        """
+        cursor.execute(LIST_PARTITIONS_QUERY, {'table_name': table_name})
+        return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def relation_exists(cursor, relation_name):
+        """
+        Check whether a table (or any other relation) exists.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            relation_name (str): The relation to check.
+
+        Returns:
+            bool: True if the relation exists.
+        """
+        cursor.execute(RELATION_EXISTS_QUERY, {'relation_name': relation_name})
+        return cursor.fetchone()[0]
+
+    def ensure_monthly_partitions(self, cursor, table_name, start, end):
+        """
+        Provide the missing monthly partitions covering the period from start to end (both inclusive).
+
+        A standalone table that already has the partition name (a partition detached before detached partitions
+        were renamed) is attached again; otherwise the partition is created.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            table_name (str): The partitioned (parent) table.
+            start (date, datetime or str): The start of the period.
+            end (date, datetime or str): The end of the period.
+        """
+        existing = set(self.list_partitions(cursor, table_name))
+        for lower_bound, upper_bound in self.month_ranges(start, end):
+            partition_name = self.partition_name(table_name, lower_bound)
+            if partition_name in existing:
+                continue
+            query = ATTACH_MONTHLY_PARTITION_QUERY if self.relation_exists(cursor, partition_name) \
+                else CREATE_MONTHLY_PARTITION_QUERY
+            cursor.execute(
+                query.format(partition_name=partition_name, table_name=table_name),
+                {'lower_bound': lower_bound, 'upper_bound': upper_bound}
+            )
+
+    def detach_partitions_before(self, cursor, table_name, before):
+        """
+        Detach the monthly partitions that end on or before the month of `before`.
+
+        Detached partitions stay in the database as standalone tables, renamed to
+        <partition>_detached_<YYYYMMDDHHMMSS>, and can be archived or dropped.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            table_name (str): The partitioned (parent) table.
+            before (date, datetime or str): Partitions of months earlier than this month are detached.
+
+        Returns:
+            List[str]: The names the detached partitions were renamed to.
+        """
+        boundary = self.partition_name(table_name, self.month_start(before))
+        suffix = datetime.now().strftime('_detached_%Y%m%d%H%M%S')
+        detached = []
+        for partition_name in self.list_partitions(cursor, table_name):
+            if partition_name < boundary:
+                cursor.execute(DETACH_PARTITION_QUERY.format(table_name=table_name, partition_name=partition_name))
+                cursor.execute(RENAME_TABLE_QUERY.format(table_name=partition_name,
+                                                         new_table_name=partition_name + suffix))
+                detached.append(partition_name + suffix)
+        return detached
@@ -0,0 +1,176 @@
+from data_dev.queries import (
+    CREATE_SRC_GENERATED_FACILITIES_INDEX_QUERY,
+    CREATE_SRC_GENERATED_PATIENTS_INDEX_QUERY,
+    CREATE_SRC_GENERATED_VISITS_INDEX_QUERY,
+    CREATE_FACILITIES_EXTERNAL_ID_INDEX_QUERY,
+    CREATE_PATIENTS_EXTERNAL_ID_INDEX_QUERY,
+    CREATE_VISITS_NATURAL_KEY_INDEX_QUERY,
+    CREATE_FACILITIES_EXTERNAL_ID_UNIQUE_INDEX_QUERY,
+    CREATE_PATIENTS_EXTERNAL_ID_UNIQUE_INDEX_QUERY,
+    CREATE_VISITS_NATURAL_KEY_UNIQUE_INDEX_QUERY,
+    CREATE_VISITS_VISIT_TIMESTAMP_INDEX_QUERY,
+    LIST_INDEXES_QUERY
+)
+
+
+class SchemaProvisioner:
+    """
+    A class to create the indexes and unique keys of the src and 3NF layers idempotently.
+
+    The catalog is checked first and only the missing indexes are created, so provisioning costs one catalog
+    query on every load once the schema is in place. Each statement runs inside its own savepoint: if an index
+    cannot be created (e.g. a unique key on a table that already contains duplicates), the failure is reported
+    and the remaining statements still run.
+
+    The 'merge' strategy only gets lookup indexes on the natural keys, so duplicate source rows keep being
+    loaded as they always were. The 'on_conflict' strategy gets unique indexes instead, which it needs as
+    conflict targets; require_unique_keys() stops the load when one of them is missing.
+
+    Attributes:
+        conn: A psycopg2 database connection object used to interact with the database.
+        strategy (str): The 3NF load strategy the indexes are provisioned for ('merge' or 'on_conflict').
+    """
+
+    SRC_INDEX_QUERIES = {
+        'src_generated_facilities_facility_id_idx': CREATE_SRC_GENERATED_FACILITIES_INDEX_QUERY,
+        'src_generated_patients_patient_id_idx': CREATE_SRC_GENERATED_PATIENTS_INDEX_QUERY,
+        'src_generated_visits_visit_timestamp_idx': CREATE_SRC_GENERATED_VISITS_INDEX_QUERY
+    }
+
+    NF3_INDEX_QUERIES = {
+        'merge': {
+            'facilities_external_id_idx': CREATE_FACILITIES_EXTERNAL_ID_INDEX_QUERY,
+            'patients_external_id_idx': CREATE_PATIENTS_EXTERNAL_ID_INDEX_QUERY,
+            'visits_facility_id_patient_id_visit_timestamp_idx': CREATE_VISITS_NATURAL_KEY_INDEX_QUERY,
+            'visits_visit_timestamp_idx': CREATE_VISITS_VISIT_TIMESTAMP_INDEX_QUERY
+        },
+        'on_conflict': {
+            'facilities_external_id_uidx': CREATE_FACILITIES_EXTERNAL_ID_UNIQUE_INDEX_QUERY,
+            'patients_external_id_uidx': CREATE_PATIENTS_EXTERNAL_ID_UNIQUE_INDEX_QUERY,
+            'visits_facility_id_patient_id_visit_timestamp_uidx': CREATE_VISITS_NATURAL_KEY_UNIQUE_INDEX_QUERY,
+            'visits_visit_timestamp_idx': CREATE_VISITS_VISIT_TIMESTAMP_INDEX_QUERY
+        }
+    }
+
+    # Unique indexes the INSERT ... ON CONFLICT statements use as conflict targets
+    UNIQUE_KEYS = {
+        'facilities_external_id_uidx': 'facilities (external_id)',
+        'patients_external_id_uidx': 'patients (external_id)',
+        'visits_facility_id_patient_id_visit_timestamp_uidx': 'visits (facility_id, patient_id, visit_timestamp)'
+    }
+
+    def __init__(self, conn, strategy='merge'):
+        """
+        Initialize the SchemaProvisioner with a database connection.
+
+        Args:
+            conn: A psycopg2 database connection object.
+            strategy (str): The 3NF load strategy ('merge' or 'on_conflict'). Defaults to 'merge'.
+        """
+        if strategy not in self.NF3_INDEX_QUERIES:
+            raise ValueError(f"Unsupported 3NF load strategy: {strategy}")
+        self.conn = conn
+        self.strategy = strategy
+
+    @staticmethod
+    def existing_indexes(cursor, index_names):
+        """
+        Look up which of the given indexes exist in the current schema.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            index_names (iterable): The index names to look up.
+
+        Returns:
+            set: The names of the existing indexes.
+        """
+        cursor.execute(LIST_INDEXES_QUERY, {'index_names': list(index_names)})
+        return {row[0] for row in cursor.fetchall()}
+
+    def execute_queries(self, cursor, queries):
+        """
+        Execute the provisioning statements of the missing indexes, each one inside its own savepoint.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+            queries (dict): The provisioning statements by index name.
+
+        Returns:
+            bool: True if every statement succeeded, False otherwise.
+        """
+        existing = self.existing_indexes(cursor, queries)
+        succeeded = True
+        for index_name, query in queries.items():
+            if index_name in existing:
+                continue
+            cursor.execute("SAVEPOINT schema_provisioning")
+            try:
+                cursor.execute(query)
+                cursor.execute("RELEASE SAVEPOINT schema_provisioning")
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT schema_provisioning")
+                print(f"Schema provisioning statement failed: {query.strip()}\nError: {e}")
+                succeeded = False
+        return succeeded
+
+    def provision_src(self, cursor):
+        """
+        Create the missing indexes of the src_generated_* tables.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Returns:
+            bool: True if every index was provisioned, False otherwise.
+        """
+        return self.execute_queries(cursor, self.SRC_INDEX_QUERIES)
+
+    def provision_nf3(self, cursor):
+        """
+        Create the missing indexes (and, for the 'on_conflict' strategy, unique keys) of the 3NF tables.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Returns:
+            bool: True if every index was provisioned, False otherwise.
+        """
+        return self.execute_queries(cursor, self.NF3_INDEX_QUERIES[self.strategy])
+
+    def require_unique_keys(self, cursor):
+        """
+        Check that the unique keys of the 'on_conflict' strategy exist; other strategies need none.
+
+        Args:
+            cursor: A psycopg2 cursor object.
+
+        Raises:
+            RuntimeError: If a unique key is missing (typically because the table contains duplicates),
+                          since INSERT ... ON CONFLICT cannot run without it.
+        """
+        if self.strategy != 'on_conflict':
+            return
+        missing = sorted(set(self.UNIQUE_KEYS) - self.existing_indexes(cursor, self.UNIQUE_KEYS))
+        if missing:
+            raise RuntimeError(
+                "The 'on_conflict' load strategy needs unique keys on "
+                + ", ".join(f"{self.UNIQUE_KEYS[index_name]} ({index_name})" for index_name in missing)
+                + ". They could not be created; remove the duplicate rows or use the 'merge' strategy."
+            )
+
+    def provision(self):
+        """
+        Provision the src and 3NF layers in a single transaction and commit it.
+
+        The src and 3NF tables must already exist.
+        """
+        cursor = self.conn.cursor()
+        try:
+            self.provision_src(cursor)
+            self.provision_nf3(cursor)
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"An error occurred during schema provisioning: {e}")
+        finally:
+            cursor.close()
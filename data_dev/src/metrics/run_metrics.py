@@ -0,0 +1,313 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from psycopg2.extensions import cursor
+
+from data_dev.config import metrics_config
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_rss_mb():
+    """
+    Return the peak resident set size of the process so far.
+
+    Returns:
+        float or None: The peak RSS in MiB, or None where the resource module is not available.
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KiB on Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def path_size(path):
+    """
+    Return the size of a file, or the total size of the files under a directory.
+
+    Args:
+        path (str): The file or directory.
+
+    Returns:
+        int or None: The size in bytes, or None if the path does not exist.
+    """
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+    return None
+
+
+class RunMetrics:
+    """
+    A class to collect timing spans of a pipeline run and write them as a JSON run record.
+
+    Two kinds of spans are recorded:
+    1. 'stage' spans, opened with the span() context manager around pipeline stages and sub-stages,
+       with wall time, rows (the sum of the rows of the SQL statements run inside), bytes of the
+       stage output and the peak RSS of the process at the end of the stage.
+    2. 'sql' spans, recorded by InstrumentedCursor and aggregated by statement text: one span per distinct
+       statement and stage, with the number of executions, total and max wall time, rows produced or
+       affected (cursor.rowcount) and bytes copied by COPY statements. Row-by-row inserts therefore add one
+       span, not one per row. At most metrics_config.max_sql_spans distinct statements are kept; the
+       executions of further statements are added to one '(other statements)' span per stage.
+
+    Spans are attributed to the innermost stage span open in the same thread (or the explicitly given
+    parent). All methods are thread-safe, so stages running in worker threads can record spans concurrently.
+
+    Attributes:
+        enabled (bool): Whether spans are recorded, sourced from metrics_config.enabled.
+        run_id (str): The identifier of the run.
+        started_at (str): The start time of the run (ISO 8601, UTC).
+        spans (List[dict]): The recorded spans.
+    """
+
+    def __init__(self, enabled=None):
+        """
+        Initialize an empty run.
+
+        Args:
+            enabled (bool, optional): Overrides metrics_config.enabled.
+        """
+        self.enabled = metrics_config.enabled if enabled is None else enabled
+        self.run_id = uuid.uuid4().hex
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.spans = []
+        self._sql_spans = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self):
+        """
+        Return the stack of stage spans open in the current thread.
+        """
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def current_span(self):
+        """
+        Return the innermost stage span open in the current thread.
+
+        Returns:
+            dict or None: The span, or None if no stage span is open.
+        """
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    def _add(self, span):
+        with self._lock:
+            span['id'] = len(self.spans) + 1
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name, output_path=None, parent=None):
+        """
+        Record a stage span around a block of code.
+
+        The yielded span is a dict; the block may set 'rows' or 'bytes' itself, otherwise rows are
+        summed from the SQL statements run inside the span and bytes are measured at output_path.
+        If the block raises, the span is marked as failed and the exception is re-raised.
+
+        Args:
+            name (str): The name of the stage.
+            output_path (str, optional): The file or directory the stage writes; its size becomes 'bytes'.
+            parent (dict, optional): The parent span, for stages running in worker threads.
+                                     Defaults to the innermost span open in the current thread.
+
+        Yields:
+            dict: The span.
+        """
+        if not self.enabled:
+            yield {}
+            return
+        parent = parent or self.current_span()
+        span = {
+            'kind': 'stage',
+            'name': name,
+            'parent_id': parent['id'] if parent else None,
+            'thread': threading.current_thread().name,
+            'started_at': datetime.now(timezone.utc).isoformat(),
+            'status': 'running',
+            'rows': None,
+            'bytes': None,
+            '_sql_rows': 0
+        }
+        self._add(span)
+        self._stack().append(span)
+        started = time.perf_counter()
+        try:
+            yield span
+            span['status'] = 'completed'
+        except BaseException as e:
+            span['status'] = 'failed'
+            span['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._stack().pop()
+            span['wall_time_s'] = round(time.perf_counter() - started, 6)
+            sql_rows = span.pop('_sql_rows')
+            if span['rows'] is None:
+                span['rows'] = sql_rows
+            if span['bytes'] is None and output_path is not None:
+                span['bytes'] = path_size(output_path)
+            span['peak_rss_mb'] = peak_rss_mb()
+
+    def record_sql(self, query, wall_time, rows, bytes_copied=None, error=None):
+        """
+        Record a SQL statement execution under the innermost stage span of the current thread.
+
+        Executions of the same statement text in the same stage are added up in one 'sql' span.
+
+        Args:
+            query: The SQL statement (str, bytes or a psycopg2 sql.Composable).
+            wall_time (float): The execution time in seconds.
+            rows (int): The rows produced or affected (-1 if unknown).
+            bytes_copied (int, optional): The bytes transferred by a COPY statement.
+            error (str, optional): The error raised by the statement.
+        """
+        if not self.enabled:
+            return
+        if isinstance(query, bytes):
+            query = query.decode('utf-8', errors='replace')
+        text = ' '.join(str(query).split())
+        parent = self.current_span()
+        parent_id = parent['id'] if parent else None
+        rows = rows if rows is not None and rows >= 0 else None
+        with self._lock:
+            key = (parent_id, text)
+            if key not in self._sql_spans and len(self._sql_spans) >= metrics_config.max_sql_spans:
+                key, text = (parent_id, None), '(other statements)'
+            span = self._sql_spans.get(key)
+            if span is None:
+                span = {
+                    'kind': 'sql',
+                    'name': text[:metrics_config.max_sql_text_length],
+                    'parent_id': parent_id,
+                    'thread': threading.current_thread().name,
+                    'count': 0,
+                    'wall_time_s': 0.0,
+                    'max_wall_time_s': 0.0,
+                    'rows': None,
+                    'bytes': None,
+                    'failed_count': 0,
+                    'status': 'completed'
+                }
+                self._sql_spans[key] = span
+                span['id'] = len(self.spans) + 1
+                self.spans.append(span)
+            span['count'] += 1
+            span['wall_time_s'] = round(span['wall_time_s'] + wall_time, 6)
+            span['max_wall_time_s'] = round(max(span['max_wall_time_s'], wall_time), 6)
+            if rows is not None:
+                span['rows'] = (span['rows'] or 0) + rows
+            if bytes_copied is not None:
+                span['bytes'] = (span['bytes'] or 0) + bytes_copied
+            if error:
+                span['failed_count'] += 1
+                span['status'] = 'failed'
+                span.setdefault('error', error)  # the first error of the statement
+            if parent is not None and rows:
+                parent['_sql_rows'] += rows
+
+    def to_dict(self):
+        """
+        Return the run record: run metadata, per-stage totals and all spans.
+
+        Returns:
+            dict: The JSON-serializable run record.
+        """
+        with self._lock:
+            spans = [{key: value for key, value in span.items() if not key.startswith('_')} for span in self.spans]
+        stages = [span for span in spans if span['kind'] == 'stage']
+        statements = [span for span in spans if span['kind'] == 'sql']
+        return {
+            'run_id': self.run_id,
+            'started_at': self.started_at,
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+            'status': 'failed' if any(span['status'] == 'failed' for span in stages) else 'completed',
+            'peak_rss_mb': peak_rss_mb(),
+            'sql_statement_count': sum(span['count'] for span in statements),
+            'sql_wall_time_s': round(sum(span['wall_time_s'] for span in statements), 6),
+            'spans': spans
+        }
+
+    def write(self, directory=None):
+        """
+        Write the run record as JSON into a directory.
+
+        Args:
+            directory (str, optional): Overrides metrics_config.run_record_path.
+
+        Returns:
+            str or None: The path of the written run record, or None if metrics are disabled.
+        """
+        if not self.enabled:
+            return None
+        directory = directory or metrics_config.run_record_path
+        os.makedirs(directory, exist_ok=True)
+        record = self.to_dict()
+        file_name = f"run_record_{record['started_at'][:19].replace(':', '-')}_{self.run_id[:8]}.json"
+        path = os.path.join(directory, file_name)
+        with open(path, 'w') as record_file:
+            json.dump(record, record_file, indent=2, default=str)
+        return path
+
+
+# The metrics of the current run, shared by all stages
+run_metrics = RunMetrics()
+
+
+class InstrumentedCursor(cursor):
+    """
+    A psycopg2 cursor recording a 'sql' span in run_metrics for every statement it executes.
+
+    Pass it as cursor_factory to psycopg2.connect (or to a connection pool) to instrument every
+    cursor of the connection, including the ones created by pandas.read_sql and named cursors.
+    """
+
+    def _record(self, query, started, bytes_copied=None, error=None):
+        run_metrics.record_sql(query, time.perf_counter() - started, self.rowcount, bytes_copied, error)
+
+    def execute(self, query, vars=None):
+        started = time.perf_counter()
+        try:
+            result = super().execute(query, vars)
+        except Exception as e:
+            self._record(query, started, error=f"{type(e).__name__}: {e}")
+            raise
+        self._record(query, started)
+        return result
+
+    def executemany(self, query, vars_list):
+        started = time.perf_counter()
+        try:
+            result = super().executemany(query, vars_list)
+        except Exception as e:
+            self._record(query, started, error=f"{type(e).__name__}: {e}")
+            raise
+        self._record(query, started)
+        return result
+
+    def copy_expert(self, sql, file, size=8192):
+        started = time.perf_counter()
+        try:
+            position = file.tell()
+        except (AttributeError, OSError):
+            position = None
+        try:
+            result = super().copy_expert(sql, file, size)
+        except Exception as e:
+            self._record(sql, started, error=f"{type(e).__name__}: {e}")
+            raise
+        bytes_copied = abs(file.tell() - position) if position is not None else None
+        self._record(sql, started, bytes_copied)
+        return result
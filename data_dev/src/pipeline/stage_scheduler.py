@@ -0,0 +1,280 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import asdict, is_dataclass
+from datetime import datetime, timezone
+
+from data_dev.config import pipeline_config
+from data_dev.queries import TABLE_STATE_QUERY, TABLE_ROW_COUNT_QUERY
+from data_dev.src.metrics.run_metrics import run_metrics
+
+
+def fingerprint(*values):
+    """
+    Hash the inputs of a stage (config dataclasses, dicts, strings, numbers) into a fingerprint.
+
+    Args:
+        *values: The inputs of the stage.
+
+    Returns:
+        str: The sha256 hex digest of the JSON representation of the inputs.
+    """
+    payload = [asdict(value) if is_dataclass(value) else value for value in values]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def path_fingerprint(path):
+    """
+    Describe the files under a path (or a single file) by their relative paths, sizes and modification times.
+
+    Args:
+        path (str): The file or directory.
+
+    Returns:
+        List[list]: [relative path, size, mtime_ns] of every file, sorted; empty if the path does not exist.
+    """
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [[os.path.basename(path), stat.st_size, stat.st_mtime_ns]]
+    files = []
+    for root, _, names in os.walk(path):
+        for name in names:
+            full_path = os.path.join(root, name)
+            stat = os.stat(full_path)
+            files.append([os.path.relpath(full_path, path), stat.st_size, stat.st_mtime_ns])
+    return sorted(files)
+
+
+def table_fingerprint(conn, table_names):
+    """
+    Describe database tables by their identity and row count, the database counterpart of path_fingerprint.
+
+    The oid changes when a table is dropped and recreated and the relfilenode when it is truncated, so a
+    database reset changes the description without the table contents being read.
+
+    Args:
+        conn: A psycopg2 database connection object.
+        table_names (List[str]): The tables.
+
+    Returns:
+        List[list]: [table name, oid, relfilenode, row count] of every table, sorted by name;
+                    oid, relfilenode and row count are None for a table that does not exist.
+    """
+    tables = []
+    with conn.cursor() as cursor:
+        cursor.execute(TABLE_STATE_QUERY, {'table_names': list(table_names)})
+        for table_name, table_oid, relfilenode in cursor.fetchall():
+            row_count = None
+            if table_oid is not None:
+                cursor.execute(TABLE_ROW_COUNT_QUERY.format(table_name=table_name))
+                row_count = cursor.fetchone()[0]
+            tables.append([table_name, table_oid, relfilenode, row_count])
+    return tables
+
+
+class Stage:
+    """
+    A pipeline stage: a named callable with the stages it depends on and a fingerprint of its inputs.
+
+    Attributes:
+        name (str): The unique name of the stage.
+        run (callable): Runs the stage; raises an exception if the stage fails.
+        depends_on (List[str]): The names of the stages that must complete first.
+        inputs (callable): Returns the fingerprint of the stage inputs (see fingerprint and path_fingerprint).
+        output_path (str or None): The file or directory the stage writes, measured by its metrics span.
+    """
+
+    def __init__(self, name, run, depends_on=None, inputs=None, output_path=None):
+        """
+        Declare a pipeline stage.
+
+        Args:
+            name (str): The unique name of the stage.
+            run (callable): Runs the stage; raises an exception if the stage fails.
+            depends_on (List[str], optional): The names of the stages that must complete first.
+            inputs (callable, optional): Returns the fingerprint of the stage inputs.
+                                         A stage without inputs is never considered up to date.
+            output_path (str, optional): The file or directory the stage writes.
+        """
+        self.name = name
+        self.run = run
+        self.depends_on = list(depends_on or [])
+        self.inputs = inputs
+        self.output_path = output_path
+
+
+class StageScheduler:
+    """
+    A class to run pipeline stages as a DAG, in parallel where they do not depend on each other.
+
+    After a stage completes, its input fingerprint (computed after the run, so that outputs the stage
+    itself wrote are part of it) is recorded in a JSON checkpoint. On the next run a stage is skipped
+    when all the stages it depends on were skipped too and its current fingerprint equals the recorded
+    one; every other stage runs. A failed stage is removed from the checkpoint and the stages depending
+    on it are blocked, while independent stages go on - so rerunning after a failure redoes only the
+    failed stage, the ones it blocked and the ones whose inputs changed.
+
+    Attributes:
+        stages (Dict[str, Stage]): The stages by name, in declaration order.
+        max_workers (int): The number of stages running at the same time, sourced from pipeline_config.
+        checkpoint_path (str): The checkpoint file, sourced from pipeline_config.
+    """
+
+    def __init__(self, stages, max_workers=None, checkpoint_path=None):
+        """
+        Initialize the scheduler and validate the stage graph.
+
+        Args:
+            stages (List[Stage]): The stages of the pipeline.
+            max_workers (int, optional): Overrides pipeline_config.max_workers.
+            checkpoint_path (str, optional): Overrides pipeline_config.checkpoint_path.
+
+        Raises:
+            ValueError: If stage names are not unique, a dependency is unknown, or the dependencies form a cycle.
+        """
+        self.stages = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate pipeline stage: {stage.name}")
+            self.stages[stage.name] = stage
+        self.max_workers = max_workers or pipeline_config.max_workers
+        self.checkpoint_path = checkpoint_path or pipeline_config.checkpoint_path
+        self.validate()
+
+    def validate(self):
+        """
+        Check that every dependency exists and that the dependencies do not form a cycle.
+
+        Raises:
+            ValueError: If the stage graph is invalid.
+        """
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dependency}")
+        visited, in_progress = set(), set()
+
+        def visit(name):
+            if name in in_progress:
+                raise ValueError(f"Pipeline stages form a cycle through {name}")
+            if name not in visited:
+                in_progress.add(name)
+                for dependency in self.stages[name].depends_on:
+                    visit(dependency)
+                in_progress.remove(name)
+                visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def read_checkpoint(self):
+        """
+        Read the checkpoint of the previous runs.
+
+        Returns:
+            dict: Stage name -> {'fingerprint': ..., 'completed_at': ...}; empty if there is no checkpoint.
+        """
+        try:
+            with open(self.checkpoint_path) as checkpoint_file:
+                return json.load(checkpoint_file)
+        except (OSError, ValueError):
+            return {}
+
+    def write_checkpoint(self, checkpoint):
+        """
+        Replace the checkpoint file atomically.
+
+        Args:
+            checkpoint (dict): Stage name -> {'fingerprint': ..., 'completed_at': ...}.
+        """
+        os.makedirs(os.path.dirname(self.checkpoint_path) or '.', exist_ok=True)
+        with open(self.checkpoint_path + '.tmp', 'w') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file, indent=2, sort_keys=True)
+        os.replace(self.checkpoint_path + '.tmp', self.checkpoint_path)
+
+    @staticmethod
+    def stage_fingerprint(stage):
+        """
+        Compute the current input fingerprint of a stage.
+
+        Returns:
+            str or None: The fingerprint, or None if the stage declares no inputs.
+        """
+        return stage.inputs() if stage.inputs else None
+
+    def run_stage(self, stage, parent_span=None):
+        """
+        Run one stage inside a metrics span and log its outcome.
+
+        Args:
+            stage (Stage): The stage to run.
+            parent_span (dict, optional): The metrics span of the whole pipeline run.
+
+        Returns:
+            str or None: The fingerprint of the stage inputs after the run.
+        """
+        logging.info(f"Stage {stage.name} started...")
+        with run_metrics.span(stage.name, output_path=stage.output_path, parent=parent_span):
+            stage.run()
+        logging.info(f"Stage {stage.name} completed!")
+        return self.stage_fingerprint(stage)
+
+    def run(self, force=False):
+        """
+        Run the pipeline.
+
+        Args:
+            force (bool): Ignore the checkpoint and run every stage.
+
+        Returns:
+            Dict[str, str]: The outcome of every stage: 'completed', 'skipped', 'failed' or 'blocked'.
+        """
+        checkpoint = {} if force else self.read_checkpoint()
+        statuses = {}
+        pending = dict(self.stages)
+        running = {}
+        parent_span = run_metrics.current_span()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='pipeline_stage') as executor:
+            while pending or running:
+                # Start (or skip, or block) every stage whose dependencies are settled
+                progressed = True
+                while progressed:
+                    progressed = False
+                    for name, stage in list(pending.items()):
+                        dependency_statuses = [statuses.get(dependency) for dependency in stage.depends_on]
+                        if any(status in ('failed', 'blocked') for status in dependency_statuses):
+                            statuses[name] = 'blocked'
+                            logging.warning(f"Stage {name} blocked by a failed dependency")
+                        elif all(status in ('completed', 'skipped') for status in dependency_statuses):
+                            current = self.stage_fingerprint(stage)
+                            recorded = checkpoint.get(name, {}).get('fingerprint')
+                            if (current is not None and current == recorded
+                                    and all(status == 'skipped' for status in dependency_statuses)):
+                                statuses[name] = 'skipped'
+                                logging.info(f"Stage {name} is up to date, skipped")
+                            else:
+                                running[executor.submit(self.run_stage, stage, parent_span)] = name
+                        else:
+                            continue
+                        del pending[name]
+                        progressed = True
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    if future.exception() is not None:
+                        statuses[name] = 'failed'
+                        checkpoint.pop(name, None)
+                        logging.error(f"Stage {name} FAILED: {future.exception()}", exc_info=future.exception())
+                    else:
+                        statuses[name] = 'completed'
+                        checkpoint[name] = {
+                            'fingerprint': future.result(),
+                            'completed_at': datetime.now(timezone.utc).isoformat()
+                        }
+                    self.write_checkpoint(checkpoint)
+        return statuses
@@ -1,10 +1,65 @@
+import numpy as np
 import pandas as pd
+import plotly
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import plotly.io as pio
+from plotly.offline import get_plotlyjs
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import base64
+import hashlib
+import json
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 
-from data_dev.config import report_generator_config
+from data_dev.config import ReportView, report_generator_config
+from data_dev.src.data.parquet_manifest import ParquetManifest
+from data_dev.src.pipeline.stage_scheduler import fingerprint, path_fingerprint
+
+# The only columns the report renders
+REPORT_COLUMNS = ['facility_type', 'visit_date', 'avg_time_spent']
+
+# Number of days (before the last loaded date) shown by the report
+REPORT_WINDOW_DAYS = 6
+
+# Cache files written next to report.html
+REPORT_CACHE_FILE_NAME = '_report_cache.json'
+REPORT_DATA_CACHE_FILE_NAME = '_report_data_cache.parquet'
+
+# The shared plotly.js bundle of the view reports; the name plotly uses for include_plotlyjs='directory'
+PLOTLYJS_FILE_NAME = 'plotly.min.js'
+
+# Suffix of the data sidecar written next to every report (report.html -> report.data.json)
+SIDECAR_SUFFIX = '.data.json'
+
+REPORT_TITLE = 'DQE Automation - "BI" HTML Report with Table and Doughnut Chart'
+
+
+def render_report_view(view, view_data, storage_path, doughnut_data=None):
+    """
+    Renders one view report (runs in a worker process of ReportGenerator.generate_view_reports).
+
+    Args:
+        view (ReportView): The view to render.
+        view_data (pd.DataFrame): The rows of the view, sorted as by transform_data().
+        storage_path (str): The directory the report is written to; plotly.min.js must already be there.
+        doughnut_data (pd.Series, optional): The precomputed min average time spent by facility type.
+
+    Returns:
+        str: The path of the written report.
+    """
+    days = f"{view.window_days + 1} days"
+    generator = ReportGenerator(subplot_titles=(f"Last {days} loaded data",
+                                                f"Min average time spent by Facility Type for the last {days}"))
+    generator.create_table_element(view_data)
+    generator.create_doughnut_element(view_data, doughnut_data)
+    generator.update_layout(title_text=f"{REPORT_TITLE} - {view.name}")
+    file_name = f"report_{view.name}.html"
+    generator.write_html(file_name=file_name, include_plotlyjs='directory', storage_path=storage_path)
+    return os.path.join(storage_path, file_name)
 
 
 class ReportGenerator:
@@ -13,50 +68,147 @@ class ReportGenerator:
     last week's data and the minimum average time spent by facility type.
 
     Attributes:
-        data (pd.DataFrame): The source data loaded from a Parquet files.
+        data (pd.DataFrame): The source data loaded from a Parquet files (read lazily, only the last week).
         fig (plotly.graph_objects.Figure): A combined figure containing a table and a doughnut chart.
 
     Methods:
         combine_figures(): Initializes the combined figure layout with a table and doughnut chart.
-        read_source_data(): Reads the source data from a Parquet file.
+        read_source_data(): Reads the last week of the source data from the latest Parquet partitions.
         transform_data(): Filters and sorts the data for the last week.
-        create_table_element(last_week_data): Adds a table visualization to the figure.
+        input_fingerprint(): Fingerprints the input files and the data parameters of the report.
+        cached_last_week_data(input_fingerprint, cache): Returns the last-week data, from the cache if still valid.
+        aggregate_table_data(last_week_data, max_rows): Pre-aggregates the table rows by week, month or year.
+        create_table_element(last_week_data, table_mode, max_rows, max_pages): Adds a table visualization to the figure.
         create_doughnut_element(last_week_data): Adds a doughnut chart visualization to the figure.
         update_layout(): Updates the layout of the combined figure.
-        write_html(): Writes the generated figure to an HTML file.
+        write_html(file_name, include_plotlyjs): Writes the generated figure to an HTML file and its data sidecar.
+        rendered_data(): Returns the table rows and doughnut values of the figure, as serialized into the page.
+        write_sidecar(file_name): Writes the rendered data with its checksum next to the HTML file.
+        write_plotlyjs_asset(storage_path): Writes the shared plotly.min.js of the view reports.
+        window_aggregates(data, windows): Computes the table rows and doughnut values of several windows in one pass.
+        generate_view_reports(views, max_workers): Renders the view reports in a process pool.
+        generate_window_reports(windows, max_workers): Renders one report per date window.
+        figure_fingerprint(): Fingerprints the rendered figure.
         generate_report(): Main method to generate the report.
     """
 
-    def __init__(self):
+    def __init__(self, subplot_titles=None):
         """
-        Initializes the ReportGenerator instance by loading the data and setting up the figure.
+        Initializes the ReportGenerator instance by setting up the figure; the data is read on first use.
+
+        Args:
+            subplot_titles (tuple, optional): The titles of the table and the doughnut chart.
         """
-        self.data = self.read_source_data()
-        self.fig = self.combine_figures()
+        self.data = None
+        self.fig = self.combine_figures(subplot_titles)
 
     @staticmethod
-    def combine_figures():
+    def combine_figures(subplot_titles=None):
         """
         Creates a combined figure layout with a table and a doughnut chart.
 
+        Args:
+            subplot_titles (tuple, optional): The titles of the table and the doughnut chart (last week titles if None).
+
         Returns:
             plotly.graph_objects.Figure: A figure with two subplots - a table and a doughnut chart.
         """
         return make_subplots(
             rows=2, cols=1,
             specs=[[{"type": "table"}], [{"type": "domain"}]],
-            subplot_titles=("Last week loaded data", "Min average time spent by Facility Type for the last week")
+            subplot_titles=subplot_titles or ("Last week loaded data",
+                                              "Min average time spent by Facility Type for the last week")
         )
 
     @staticmethod
-    def read_source_data():
+    def list_partitions(path):
         """
-        Reads the source data from a Parquet file specified in the configuration.
+        Lists the partition_date partitions of the dataset and their data files.
+
+        Uses the dataset manifest (_manifest.json) when it exists and still matches the files on disk,
+        otherwise lists the partition directories.
+
+        Args:
+            path (str): The root directory of the dataset.
+
+        Returns:
+            tuple: (dict partition_date -> list of file paths or None if not listed yet,
+                    dict partition_date -> max visit_date from the manifest statistics or None).
+        """
+        manifest = ParquetManifest(path).read()
+        if manifest is not None:
+            files, max_dates = {}, {}
+            for entry in manifest['files']:
+                partition = entry['partition'].get('partition_date')
+                files.setdefault(partition, []).append(os.path.join(path, *entry['path'].split('/')))
+                visit_date_max = entry['columns'].get('visit_date', {}).get('max')
+                if visit_date_max is not None:
+                    max_dates[partition] = max(max_dates.get(partition, visit_date_max), visit_date_max)
+            return files, max_dates
+        partitions = {
+            name.split('=', 1)[1]: None
+            for name in os.listdir(path) if name.startswith('partition_date=')
+        }
+        return partitions, {}
+
+    @staticmethod
+    def partition_files(path, partition_date, files):
+        """
+        Returns the data files of one partition, listing its directory if the manifest did not.
+        """
+        if files is not None:
+            return files
+        partition_path = os.path.join(path, f'partition_date={partition_date}')
+        return [
+            os.path.join(partition_path, name) for name in sorted(os.listdir(partition_path))
+            if not name.startswith(('_', '.'))
+        ]
+
+    @staticmethod
+    def read_source_data(window_days=REPORT_WINDOW_DAYS):
+        """
+        Reads the last week (or window_days) of the source data from the Parquet dataset in the configuration.
+
+        Only the partition_date partitions overlapping the window (for a week, the latest partition and the
+        previous one when the week spans two months) are opened, with the visit_date filter pushed down to
+        row group statistics and only the rendered columns projected, so the cost does not grow with the
+        length of the history.
+
+        Args:
+            window_days (int): The number of days before the last loaded date to read (one week by default).
 
         Returns:
             pd.DataFrame: The loaded data.
         """
-        return pd.read_parquet(report_generator_config.parquet_files_path)
+        path = report_generator_config.parquet_files_path
+        partitions, max_dates = ReportGenerator.list_partitions(path)
+        if not partitions:
+            return pd.DataFrame(columns=REPORT_COLUMNS)
+        partition_dates = sorted(partitions)
+        partitioning = ds.partitioning(pa.schema([('partition_date', pa.string())]), flavor='hive')
+
+        def open_dataset(selected_partitions):
+            files = [file for partition_date in selected_partitions
+                     for file in ReportGenerator.partition_files(path, partition_date, partitions[partition_date])]
+            return ds.dataset(files, format='parquet', partitioning=partitioning, partition_base_dir=path)
+
+        latest = partition_dates[-1]
+        if latest in max_dates:
+            last_loaded_date = pd.Timestamp(max_dates[latest])
+        else:
+            visit_dates = open_dataset([latest]).to_table(columns=['visit_date'])['visit_date']
+            last_loaded_date = pd.Timestamp(pc.max(visit_dates).as_py())
+        cutoff = last_loaded_date.normalize() - pd.Timedelta(days=window_days)
+
+        selected = [partition_date for partition_date in partition_dates if partition_date >= cutoff.strftime('%Y-%m')]
+        dataset = open_dataset(selected)
+        visit_date_type = dataset.schema.field('visit_date').type
+        cutoff_value = cutoff.to_pydatetime() if pa.types.is_timestamp(visit_date_type) else cutoff.date()
+        table = dataset.to_table(
+            columns=REPORT_COLUMNS,
+            filter=ds.field('visit_date') >= pa.scalar(cutoff_value, type=visit_date_type)
+        )
+        return table.to_pandas()
 
     def transform_data(self):
         """
@@ -65,49 +217,195 @@ class ReportGenerator:
         Returns:
             pd.DataFrame: The transformed data for the last week.
         """
+        if self.data is None:
+            self.data = self.read_source_data()
         self.data['visit_date'] = pd.to_datetime(self.data['visit_date'])
         last_loaded_date = self.data['visit_date'].max()
-        last_week_data = self.data[self.data['visit_date'] >= (last_loaded_date - pd.Timedelta(days=6))]
+        window_start = last_loaded_date - pd.Timedelta(days=REPORT_WINDOW_DAYS)
+        last_week_data = self.data[self.data['visit_date'] >= window_start]
         last_week_data = last_week_data.sort_values(by=['visit_date', 'facility_type'], ascending=False)
         return last_week_data
 
-    def create_table_element(self, last_week_data):
+    @staticmethod
+    def input_fingerprint():
+        """
+        Fingerprints the input files of the report together with the parameters of the data read.
+
+        The file list, sizes and statistics come from the dataset manifest when it exists and still matches
+        the files on disk (so the fingerprint does not need a walk over the whole history), otherwise from
+        the paths, sizes and modification times of the files under parquet_files_path.
+
+        Returns:
+            str: The sha256 hex digest.
+        """
+        path = report_generator_config.parquet_files_path
+        manifest = ParquetManifest(path).read()
+        files = manifest['files'] if manifest is not None else path_fingerprint(path)
+        return fingerprint(path, REPORT_COLUMNS, REPORT_WINDOW_DAYS, files)
+
+    @staticmethod
+    def read_cache():
+        """
+        Reads the report cache record ({'input_fingerprint': ..., 'report_fingerprint': ...}).
+
+        Returns:
+            dict: The record; empty if the cache is disabled or there is no (readable) record.
+        """
+        if not report_generator_config.cache_enabled:
+            return {}
+        try:
+            with open(os.path.join(report_generator_config.storage_path, REPORT_CACHE_FILE_NAME)) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def write_cache(cache):
+        """
+        Replaces the report cache record atomically.
+
+        Args:
+            cache (dict): {'input_fingerprint': ..., 'report_fingerprint': ...}.
+        """
+        if not report_generator_config.cache_enabled:
+            return
+        cache_path = os.path.join(report_generator_config.storage_path, REPORT_CACHE_FILE_NAME)
+        with open(cache_path + '.tmp', 'w') as cache_file:
+            json.dump(cache, cache_file, indent=2)
+        os.replace(cache_path + '.tmp', cache_path)
+
+    def cached_last_week_data(self, input_fingerprint, cache):
+        """
+        Returns the transformed last-week data, reading and transforming the source data only when the
+        input fingerprint differs from the cached one.
+
+        Args:
+            input_fingerprint (str): The current fingerprint of the input files (see input_fingerprint()).
+            cache (dict): The report cache record (see read_cache()).
+
+        Returns:
+            pd.DataFrame: The data for the last week, sorted as by transform_data().
+        """
+        data_cache_path = os.path.join(report_generator_config.storage_path, REPORT_DATA_CACHE_FILE_NAME)
+        if cache.get('input_fingerprint') == input_fingerprint and os.path.exists(data_cache_path):
+            try:
+                return pd.read_parquet(data_cache_path)
+            except Exception as e:
+                print(f"Report data cache could not be read, recomputing: {e}")
+        last_week_data = self.transform_data()
+        if report_generator_config.cache_enabled:
+            last_week_data.to_parquet(data_cache_path, index=False)
+        return last_week_data
+
+    @staticmethod
+    def aggregate_table_data(last_week_data, max_rows):
+        """
+        Pre-aggregates the table rows by week, month or year - the finest period leaving at most max_rows rows.
+
+        Args:
+            last_week_data (pd.DataFrame): The rows of the report, sorted as by transform_data().
+            max_rows (int): The maximum number of rows.
+
+        Returns:
+            Tuple[pd.DataFrame, str]: The mean average time spent per facility type and period start (sorted
+                                      descending like the input, at most max_rows rows) and the period name.
+        """
+        avg_time_spent = pd.to_numeric(last_week_data['avg_time_spent'])
+        for frequency, period in (('W', 'Week'), ('M', 'Month'), ('Y', 'Year')):
+            period_start = last_week_data['visit_date'].dt.to_period(frequency).dt.start_time
+            aggregated = (pd.DataFrame({'facility_type': last_week_data['facility_type'],
+                                        'visit_date': period_start, 'avg_time_spent': avg_time_spent})
+                          .groupby(['visit_date', 'facility_type'])['avg_time_spent'].mean().round(2)
+                          .reset_index().iloc[::-1])  # groupby sorts ascending; reversed it matches the input
+            if len(aggregated) <= max_rows:
+                break
+        return aggregated.head(max_rows), period
+
+    def create_table_element(self, last_week_data, table_mode=None, max_rows=None, max_pages=None):
         """
         Adds a table visualization to the figure.
 
+        The rows are expected in display order already (transform_data and window_aggregates sort them once),
+        so no mode sorts again, and dates are formatted only for the rows that are rendered. Depending on the
+        table mode (see ReportGeneratorConfig.table_mode) the rows are rendered as they are, truncated,
+        pre-aggregated or split into pages: one table per page, switched with buttons, of which only the
+        visible one is drawn by the browser. The table title tells when not all rows are shown.
+
         Args:
             last_week_data (pd.DataFrame): The data for the last week to be visualized.
+            table_mode (str, optional): Overrides report_generator_config.table_mode.
+            max_rows (int, optional): Overrides report_generator_config.table_max_rows.
+            max_pages (int, optional): Overrides report_generator_config.table_max_pages.
         """
-        self.fig.add_trace(
-            go.Table(
-                header=dict(
-                    values=["Facility Type", "Visit Date", "Average Time Spent"],
-                    fill_color="lightgrey",
-                    align="center",
-                    font=dict(size=12, color="black"),
-                ),
-                cells=dict(
-                    values=[
-                        last_week_data["facility_type"],
-                        last_week_data["visit_date"].dt.strftime('%Y-%m-%d'),  # Format dates as strings
-                        last_week_data["avg_time_spent"]
-                    ],
-                    fill_color="white",
-                    align="center",
-                    font=dict(size=12, color="black"),
+        table_mode = table_mode or report_generator_config.table_mode
+        max_rows = max_rows or report_generator_config.table_max_rows
+        max_pages = max_pages or report_generator_config.table_max_pages
+        total_rows = len(last_week_data)
+        headers = ["Facility Type", "Visit Date", "Average Time Spent"]
+        table_data = last_week_data
+        note = None
+        if table_mode == 'aggregate' and total_rows > max_rows:
+            table_data, period = self.aggregate_table_data(last_week_data, max_rows)
+            headers = ["Facility Type", f"{period} Start", "Mean Average Time Spent"]
+            note = f"{total_rows} rows aggregated by {period.lower()}"
+        elif table_mode in ('truncate', 'paginate'):
+            row_cap = max_rows * (max_pages if table_mode == 'paginate' else 1)
+            if total_rows > row_cap:
+                table_data = last_week_data.iloc[:row_cap]
+                note = f"first {row_cap} of {total_rows} rows"
+        elif table_mode not in ('full', 'aggregate'):
+            raise ValueError(f"Unknown table mode: {table_mode}")
+
+        page_size = max_rows if table_mode == 'paginate' else max(len(table_data), 1)
+        pages = [table_data.iloc[start:start + page_size] for start in range(0, max(len(table_data), 1), page_size)]
+        first_trace = len(self.fig.data)
+        for page_index, page_data in enumerate(pages):
+            self.fig.add_trace(
+                go.Table(
+                    header=dict(
+                        values=headers,
+                        fill_color="lightgrey",
+                        align="center",
+                        font=dict(size=12, color="black"),
+                    ),
+                    cells=dict(
+                        values=[
+                            page_data["facility_type"],
+                            page_data["visit_date"].dt.strftime('%Y-%m-%d'),  # Format dates as strings
+                            page_data["avg_time_spent"]
+                        ],
+                        fill_color="white",
+                        align="center",
+                        font=dict(size=12, color="black"),
+                    ),
+                    visible=page_index == 0
                 ),
-            ),
-            row=1, col=1
-        )
+                row=1, col=1
+            )
+        if len(pages) > 1:
+            trace_indices = list(range(first_trace, first_trace + len(pages)))
+            self.fig.update_layout(updatemenus=[dict(
+                type="buttons", direction="right", x=0, xanchor="left", y=1.02, yanchor="bottom",
+                buttons=[
+                    dict(label=f"Page {page_index + 1}", method="restyle",
+                         args=[{"visible": [index == page_index for index in range(len(pages))]}, trace_indices])
+                    for page_index in range(len(pages))
+                ]
+            )])
+        if note:
+            self.fig.layout.annotations[0].text += f" ({note})"
 
-    def create_doughnut_element(self, last_week_data):
+    def create_doughnut_element(self, last_week_data, doughnut_data=None):
         """
         Adds a doughnut chart visualization to the figure.
 
         Args:
             last_week_data (pd.DataFrame): The data for the last week to be visualized.
+            doughnut_data (pd.Series, optional): The precomputed min average time spent by facility type
+                                                 (see window_aggregates); computed from last_week_data if None.
         """
-        doughnut_data = last_week_data.groupby('facility_type')['avg_time_spent'].min()
+        if doughnut_data is None:
+            doughnut_data = last_week_data.groupby('facility_type')['avg_time_spent'].min()
         self.fig.add_trace(
             go.Pie(
                 labels=doughnut_data.index,
@@ -119,38 +417,250 @@ class ReportGenerator:
             row=2, col=1
         )
 
-    def update_layout(self):
+    def update_layout(self, title_text=REPORT_TITLE):
         """
         Updates the layout of the combined figure, including height and title.
+
+        Args:
+            title_text (str): The title of the report.
         """
         self.fig.update_layout(
             height=800,
-            title_text='DQE Automation - "BI" HTML Report with Table and Doughnut Chart',
+            title_text=title_text,
             title_x=0.5
         )
 
-    def write_html(self):
+    def write_html(self, file_name="report.html", include_plotlyjs=True, storage_path=None):
         """
-        Writes the generated figure to an HTML file in the specified storage path.
+        Writes the generated figure to an HTML file in the specified storage path, followed by its data sidecar.
 
-        The file is named "report.html".
+        Args:
+            file_name (str): The name of the file ("report.html" by default).
+            include_plotlyjs (Union[bool, str]): True embeds plotly.js, so the file is self-contained;
+                                                 'directory' references the plotly.min.js next to it.
+            storage_path (str, optional): Overrides report_generator_config.storage_path.
         """
-        os.makedirs(report_generator_config.storage_path, exist_ok=True)
-        pio.write_html(self.fig, file=os.path.join(report_generator_config.storage_path, "report.html"),
-                       auto_open=False)
+        storage_path = storage_path or report_generator_config.storage_path
+        os.makedirs(storage_path, exist_ok=True)
+        pio.write_html(self.fig, file=os.path.join(storage_path, file_name),
+                       auto_open=False, include_plotlyjs=include_plotlyjs)
+        self.write_sidecar(file_name, storage_path)
+
+    def rendered_data(self):
+        """
+        Returns the table rows and doughnut values of the figure exactly as they are serialized into the page.
+
+        Returns:
+            dict: {'table': {'columns': [...], 'rows': [[...], ...], 'page_row_counts': [...]},
+                   'doughnut': {'labels': [...], 'values': [...]}}, with the rows of all table pages in order;
+                  page_row_counts holds the number of rows of every page (one page unless 'paginate' mode).
+        """
+        def values(array):
+            # plotly serializes numeric numpy arrays as typed arrays: {'dtype': 'f8', 'bdata': <base64>}
+            if isinstance(array, dict) and 'bdata' in array:
+                return np.frombuffer(base64.b64decode(array['bdata']), dtype=array['dtype']).tolist()
+            return list(array)
+
+        traces = json.loads(self.fig.to_json())['data']
+        tables = [trace for trace in traces if trace['type'] == 'table']  # one per page in 'paginate' mode
+        pie = next((trace for trace in traces if trace['type'] == 'pie'), None)
+        pages = [[list(row) for row in zip(*[values(column) for column in table['cells'].get('values', [])])]
+                 for table in tables]
+        return {
+            'table': {
+                'columns': values(tables[0]['header']['values']) if tables else [],
+                'rows': [row for page in pages for row in page],
+                'page_row_counts': [len(page) for page in pages]
+            },
+            'doughnut': {
+                'labels': values(pie.get('labels', [])) if pie else [],
+                'values': values(pie.get('values', [])) if pie else []
+            }
+        }
+
+    def write_sidecar(self, file_name="report.html", storage_path=None):
+        """
+        Writes the rendered table rows and doughnut values as a JSON sidecar next to the HTML file.
+
+        The sidecar (e.g. report.data.json) carries a sha256 checksum of its canonical JSON content
+        (sorted keys, no whitespace), so validations can diff it against the source data without a
+        browser and only use the browser to confirm that the sidecar matches the rendered page.
+
+        Args:
+            file_name (str): The name of the HTML file the sidecar belongs to.
+            storage_path (str, optional): Overrides report_generator_config.storage_path.
+
+        Returns:
+            str: The path of the sidecar.
+        """
+        data = self.rendered_data()
+        canonical = json.dumps(data, sort_keys=True, separators=(',', ':'))
+        sidecar = {
+            'report': file_name,
+            'row_count': len(data['table']['rows']),
+            'checksum': hashlib.sha256(canonical.encode()).hexdigest(),
+            **data
+        }
+        sidecar_path = os.path.join(storage_path or report_generator_config.storage_path,
+                                    os.path.splitext(file_name)[0] + SIDECAR_SUFFIX)
+        with open(sidecar_path + '.tmp', 'w') as sidecar_file:
+            json.dump(sidecar, sidecar_file, separators=(',', ':'))
+        os.replace(sidecar_path + '.tmp', sidecar_path)
+        return sidecar_path
+
+    @staticmethod
+    def write_plotlyjs_asset(storage_path):
+        """
+        Writes the plotly.js bundle of the installed plotly version as plotly.min.js into a directory.
+
+        The file is replaced atomically, so reports written concurrently never see a partial bundle.
+        No CDN is involved: the bundle ships with the plotly package.
+
+        Args:
+            storage_path (str): The directory of the view reports.
+
+        Returns:
+            str: The path of the asset.
+        """
+        os.makedirs(storage_path, exist_ok=True)
+        asset_path = os.path.join(storage_path, PLOTLYJS_FILE_NAME)
+        bundle = get_plotlyjs()
+        try:
+            with open(asset_path, encoding='utf-8') as asset_file:
+                if asset_file.read() == bundle:
+                    return asset_path
+        except OSError:
+            pass
+        with open(f"{asset_path}.{os.getpid()}.tmp", 'w', encoding='utf-8') as asset_file:
+            asset_file.write(bundle)
+        os.replace(f"{asset_path}.{os.getpid()}.tmp", asset_path)
+        return asset_path
+
+    @staticmethod
+    def window_aggregates(data, windows):
+        """
+        Computes the table rows and the min average time spent by facility type of several date windows
+        in a single pass over the data.
+
+        The data is sorted once (by visit_date and facility_type, descending), so the rows of every window
+        are a prefix of it, found by a binary search on visit_date. The per-date minimum of every facility
+        type is computed once and turned into a running minimum from the last loaded date backwards, so the
+        doughnut values of a window are the row of that running minimum at the window start.
+
+        Args:
+            data (pd.DataFrame): The source data covering at least the widest window.
+            windows (List[int]): The windows, as the number of days before the last loaded date (6 = one week).
+
+        Returns:
+            Dict[int, Tuple[pd.DataFrame, pd.Series]]: The table rows (sorted as by transform_data()) and the
+                                                       min average time spent by facility type, by window.
+        """
+        data = data.sort_values(by=['visit_date', 'facility_type'], ascending=False, ignore_index=True)
+        visit_dates = data['visit_date'].to_numpy()[::-1]  # ascending
+        last_loaded_date = data['visit_date'].max()
+
+        daily_min = (data.assign(avg_time_spent=pd.to_numeric(data['avg_time_spent']))
+                     .groupby(['visit_date', 'facility_type'])['avg_time_spent'].min()
+                     .unstack('facility_type'))
+        running_min = daily_min.iloc[::-1].cummin().ffill()  # min since each date up to the last loaded date
+        daily_dates = daily_min.index.to_numpy()  # ascending
+
+        aggregates = {}
+        for window_days in windows:
+            window_start = np.datetime64(last_loaded_date - pd.Timedelta(days=window_days))
+            row_count = len(visit_dates) - np.searchsorted(visit_dates, window_start, side='left')
+            day_count = len(daily_dates) - np.searchsorted(daily_dates, window_start, side='left')
+            if day_count:
+                doughnut_data = running_min.iloc[day_count - 1].dropna()
+            else:
+                doughnut_data = pd.Series(dtype='float64')
+            aggregates[window_days] = (data.iloc[:row_count], doughnut_data)
+        return aggregates
+
+    def generate_view_reports(self, views=None, max_workers=None):
+        """
+        Renders several view reports (date windows, facility types) in a process pool.
+
+        The source data is read once, for the widest window, and the rows and doughnut values of every
+        window are computed in one pass (see window_aggregates). The reports reference one shared
+        plotly.min.js written into storage_path instead of embedding the bundle, so every report
+        stays a few KB and works offline.
+
+        Args:
+            views (List[ReportView], optional): Overrides report_generator_config.views.
+            max_workers (int, optional): Overrides report_generator_config.render_workers.
+
+        Returns:
+            List[str]: The paths of the written reports.
+        """
+        views = views if views is not None else report_generator_config.views
+        if not views:
+            return []
+        storage_path = report_generator_config.storage_path
+        data = self.read_source_data(max(view.window_days for view in views))
+        data['visit_date'] = pd.to_datetime(data['visit_date'])
+        aggregates = self.window_aggregates(data, sorted({view.window_days for view in views}))
+        self.write_plotlyjs_asset(storage_path)
+        # Spawned (not forked) workers: the pipeline calls this from a stage thread while other threads hold locks
+        with ProcessPoolExecutor(max_workers=max_workers or report_generator_config.render_workers,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            futures = []
+            for view in views:
+                view_data, doughnut_data = aggregates[view.window_days]
+                if view.facility_types is not None:
+                    view_data = view_data[view_data['facility_type'].isin(view.facility_types)]
+                    doughnut_data = doughnut_data[doughnut_data.index.isin(view.facility_types)]
+                futures.append(executor.submit(render_report_view, view, view_data, storage_path, doughnut_data))
+            return [future.result() for future in futures]
+
+    def generate_window_reports(self, windows=(6, 29, 89, 364), max_workers=None):
+        """
+        Renders one report per date window (7, 30, 90 and 365 days by default) from a single data pass.
+
+        Args:
+            windows (Iterable[int]): The windows, as the number of days before the last loaded date.
+            max_workers (int, optional): Overrides report_generator_config.render_workers.
+
+        Returns:
+            List[str]: The paths of the written reports (report_last_<days>_days.html).
+        """
+        views = [ReportView(name=f'last_{window_days + 1}_days', window_days=window_days) for window_days in windows]
+        return self.generate_view_reports(views, max_workers)
+
+    def figure_fingerprint(self):
+        """
+        Fingerprints the rendered figure (data, traces and layout) together with the plotly version.
+
+        Returns:
+            str: The sha256 hex digest.
+        """
+        return hashlib.sha256(f"{plotly.__version__}\n{self.fig.to_json()}".encode()).hexdigest()
 
     def generate_report(self):
         """
         Main method to generate the HTML report.
 
         This method:
-        - Transforms the source data to filter the last week's data.
+        - Transforms the source data to filter the last week's data, unless the input files are unchanged
+          since the previous report and the cached last-week data can be reused.
         - Creates a table and doughnut chart elements.
         - Updates the layout of the figure.
-        - Writes the figure to an HTML file.
+        - Writes the figure to an HTML file with its data sidecar (report.data.json), unless the figure is
+          identical to the one already in report.html.
         """
-        last_week_data = self.transform_data()
+        os.makedirs(report_generator_config.storage_path, exist_ok=True)
+        cache = self.read_cache()
+        input_fingerprint = self.input_fingerprint()
+        last_week_data = self.cached_last_week_data(input_fingerprint, cache)
         self.create_table_element(last_week_data)
         self.create_doughnut_element(last_week_data)
         self.update_layout()
-        self.write_html()
+        report_fingerprint = self.figure_fingerprint()
+        report_path = os.path.join(report_generator_config.storage_path, "report.html")
+        sidecar_path = os.path.join(report_generator_config.storage_path, "report" + SIDECAR_SUFFIX)
+        if (cache.get('report_fingerprint') == report_fingerprint and os.path.exists(report_path)
+                and os.path.exists(sidecar_path)):
+            print(f"Report {report_path} is up to date, reused")
+        else:
+            self.write_html()
+        self.write_cache({'input_fingerprint': input_fingerprint, 'report_fingerprint': report_fingerprint})
@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from data_dev.config import load_config
+from data_dev.queries import MERGE_FACILITIES_QUERY, MERGE_PATIENTS_QUERY
+from data_dev.src.data.nf3_loader import NF3Loader
+
+
+class FakeCursor:
+    """
+    Records the executed statements; the source has visits up to one timestamp and every index exists.
+    """
+
+    def __init__(self, load_state):
+        self.load_state = load_state
+        self.statements = []
+        self.row = None
+
+    def execute(self, query, params=None):
+        self.statements.append(query)
+        if 'FROM load_state' in query:
+            self.row = self.load_state
+        elif 'FROM src_generated_visits' in query and 'new_row_count' in query:
+            self.row = (datetime(2025, 1, 1), datetime(2025, 1, 31), 0)
+
+    def fetchone(self):
+        return self.row
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self.fake_cursor = cursor
+
+    def cursor(self):
+        return self.fake_cursor
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+def test_incremental_load_merges_dimensions_with_unchanged_row_counts(monkeypatch):
+    monkeypatch.setattr(load_config, 'incremental', True)
+    monkeypatch.setattr(load_config, 'strategy', 'merge')
+    monkeypatch.setattr(load_config, 'partitioned_visits', False)
+    monkeypatch.setattr(load_config, 'summary_tables', False)
+    # Every entity was loaded before with the current source row counts
+    cursor = FakeCursor(load_state=(datetime(2025, 1, 31), 100))
+
+    assert NF3Loader(FakeConnection(cursor)).load_data()
+
+    assert MERGE_FACILITIES_QUERY in cursor.statements
+    assert MERGE_PATIENTS_QUERY in cursor.statements
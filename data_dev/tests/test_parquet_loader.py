@@ -0,0 +1,189 @@
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+
+from data_dev.config import load_config
+from data_dev.queries import FACILITY_TYPE_PARTITION_FILTER
+from data_dev.src.data.parquet_loader import (
+    LoadParquet,
+    FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA,
+    PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA
+)
+from data_dev.src.data.parquet_manifest import ParquetManifest
+
+
+class FakeConnection:
+    """
+    Returns a prepared pyarrow Table for every copy_data_arrow call, like PostgresConnectorContextManager.
+    """
+
+    def __init__(self):
+        self.table = None
+        self.queries = []
+
+    def copy_data_arrow(self, query, schema, params=None):
+        self.queries.append((query, params))
+        return self.table
+
+
+@pytest.fixture
+def loader():
+    """
+    An incremental 'copy_arrow' LoadParquet on a fake connection, without manifests or write profiles.
+    """
+    loader = LoadParquet(connection_object=FakeConnection())
+    loader.read_mode = 'copy_arrow'
+    loader.incremental = True
+    loader.write_manifest = False
+    loader.write_profiles = {}
+    return loader
+
+
+def partitions(storage_path):
+    return sorted(name for name in os.listdir(storage_path) if '=' in name)
+
+
+def load_marker(last_visit_timestamp, source_row_count, first_visit_month):
+    return {'last_visit_timestamp': last_visit_timestamp, 'source_row_count': source_row_count,
+            'first_visit_month': first_visit_month}
+
+
+def mock_checksums(loader, marker, checksums):
+    """
+    Makes the loader see the given visits load marker and partition checksums; returns the lower bounds
+    the checksums were requested for.
+    """
+    lower_bounds = []
+
+    def partition_checksums(checksum_query, connection_object=None, lower_bound='-infinity'):
+        lower_bounds.append(lower_bound)
+        return checksums
+
+    loader.visits_load_marker = lambda connection_object=None: marker
+    loader.partition_checksums = partition_checksums
+    return lower_bounds
+
+
+def export_visit_dates(loader, storage_path, marker, checksums, rows):
+    lower_bounds = mock_checksums(loader, marker, checksums)
+    loader.connection_object.table = pa.Table.from_pylist(rows,
+                                                          schema=FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA)
+    loader.export(query='SELECT 1', storage_path=storage_path, prepare=None, partition_columns=['partition_date'],
+                  checksum_query='checksums', schema=FACILITY_TYPE_AVG_TIME_SPENT_PER_VISIT_DATE_SCHEMA,
+                  prepare_table=LoadParquet.add_partition_date_table, month_source=('visits', 'visit_timestamp'))
+    return lower_bounds
+
+
+def export_facility_types(loader, storage_path, marker, checksums, rows):
+    lower_bounds = mock_checksums(loader, marker, checksums)
+    loader.connection_object.table = pa.Table.from_pylist(rows,
+                                                          schema=PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA)
+    loader.export(query='SELECT 1', storage_path=storage_path, prepare=None,
+                  partition_columns=['facility_type_partition'], checksum_query='checksums',
+                  partition_filter=FACILITY_TYPE_PARTITION_FILTER,
+                  schema=PATIENT_SUM_TREATMENT_COST_PER_FACILITY_TYPE_SCHEMA,
+                  prepare_table=LoadParquet.add_facility_type_partition_table)
+    return lower_bounds
+
+
+def test_incremental_export_removes_dropped_partition(loader, tmp_path):
+    storage_path = str(tmp_path / 'facility_type_avg_time_spent_per_visit_date')
+    rows = [{'facility_type': 'Clinic', 'visit_date': date(2025, month, 1), 'avg_time_spent': Decimal('10.00')}
+            for month in (1, 2, 3)]
+    export_visit_dates(loader, storage_path, load_marker('2025-03-01T00:00:00', 3, '2025-01'),
+                       {'2025-01': '1:1', '2025-02': '1:2', '2025-03': '1:3'}, rows)
+    assert partitions(storage_path) == ['partition_date=2025-01', 'partition_date=2025-02', 'partition_date=2025-03']
+
+    # 2025-01 was dropped by retention, the other months are unchanged
+    lower_bounds = export_visit_dates(loader, storage_path, load_marker('2025-03-01T00:00:00', 3, '2025-02'),
+                                      {'2025-02': '1:2', '2025-03': '1:3'}, [])
+
+    assert lower_bounds == ['-infinity']
+
+    assert partitions(storage_path) == ['partition_date=2025-02', 'partition_date=2025-03']
+    assert loader.read_export_state(storage_path)['partitions'] == {'2025-02': '1:2', '2025-03': '1:3'}
+    assert ds.dataset(storage_path, format='parquet').count_rows() == 2
+
+
+def test_incremental_export_replaces_renamed_partition(loader, tmp_path):
+    storage_path = str(tmp_path / 'patient_sum_treatment_cost_per_facility_type')
+    rows = [{'facility_type': facility_type, 'full_name': 'John Doe', 'sum_treatment_cost': Decimal('5.00')}
+            for facility_type in ('Clinic', 'Urgent Care')]
+    export_facility_types(loader, storage_path, load_marker('2025-01-01T00:00:00', 2, '2025-01'),
+                          {'Clinic': '1:1', 'Urgent_Care': '1:2'}, rows)
+    assert partitions(storage_path) == ['facility_type_partition=Clinic', 'facility_type_partition=Urgent_Care']
+
+    # 'Urgent Care' was renamed to 'Urgent Clinic' in a reloaded database: only the new partition is re-aggregated
+    renamed = [{'facility_type': 'Urgent Clinic', 'full_name': 'John Doe', 'sum_treatment_cost': Decimal('5.00')}]
+    export_facility_types(loader, storage_path, load_marker('2025-01-01T00:00:00', 1, '2025-01'),
+                          {'Clinic': '1:1', 'Urgent_Clinic': '1:2'}, renamed)
+
+    assert partitions(storage_path) == ['facility_type_partition=Clinic', 'facility_type_partition=Urgent_Clinic']
+    assert loader.read_export_state(storage_path)['partitions'] == {'Clinic': '1:1', 'Urgent_Clinic': '1:2'}
+
+
+def test_incremental_export_checksums_only_months_past_the_watermark(loader, tmp_path, monkeypatch):
+    # The visits watermark bounds change detection only when the 3NF load is incremental
+    monkeypatch.setattr(load_config, 'incremental', True)
+    storage_path = str(tmp_path / 'facility_type_avg_time_spent_per_visit_date')
+    rows = [{'facility_type': 'Clinic', 'visit_date': date(2025, month, 1), 'avg_time_spent': Decimal('10.00')}
+            for month in (1, 2, 3)]
+    export_visit_dates(loader, storage_path, load_marker('2025-03-10T08:00:00', 3, '2025-01'),
+                       {'2025-01': '1:1', '2025-02': '1:2', '2025-03': '1:3'}, rows)
+
+    # The 3NF load added visits in March after the watermark
+    march = [{'facility_type': 'Clinic', 'visit_date': date(2025, 3, 20), 'avg_time_spent': Decimal('12.00')}]
+    lower_bounds = export_visit_dates(loader, storage_path, load_marker('2025-03-20T08:00:00', 4, '2025-01'),
+                                      {'2025-03': '2:7'}, march)
+
+    assert lower_bounds == [datetime(2025, 3, 1)]
+    query, params = loader.connection_object.queries[-1]
+    assert 'WITH visits AS NOT MATERIALIZED' in query
+    assert params == {'month_lower_0': date(2025, 3, 1), 'month_upper_0': date(2025, 4, 1)}
+    assert loader.read_export_state(storage_path)['partitions'] == {'2025-01': '1:1', '2025-02': '1:2',
+                                                                    '2025-03': '2:7'}
+    assert partitions(storage_path) == ['partition_date=2025-01', 'partition_date=2025-02', 'partition_date=2025-03']
+
+
+def test_incremental_export_skips_checksums_when_nothing_was_loaded(loader, tmp_path, monkeypatch):
+    # The visits watermark bounds change detection only when the 3NF load is incremental
+    monkeypatch.setattr(load_config, 'incremental', True)
+    storage_path = str(tmp_path / 'patient_sum_treatment_cost_per_facility_type')
+    rows = [{'facility_type': 'Clinic', 'full_name': 'John Doe', 'sum_treatment_cost': Decimal('5.00')}]
+    marker = load_marker('2025-01-01T00:00:00', 1, '2025-01')
+    export_facility_types(loader, storage_path, marker, {'Clinic': '1:1'}, rows)
+
+    lower_bounds = export_facility_types(loader, storage_path, dict(marker), {'Clinic': '1:1'}, rows)
+
+    assert lower_bounds == []
+    assert len(loader.connection_object.queries) == 1
+
+
+def test_months_filtered_query_merges_adjacent_months():
+    months = ['2025-02', '2024-12', '2025-01', '2025-04']
+    query, params = LoadParquet.months_filtered_query('SELECT * FROM visits v;', months, 'visits', 'visit_timestamp')
+
+    assert query.count('visit_timestamp >= %(month_lower_') == 2
+    assert params == {'month_lower_0': date(2024, 12, 1), 'month_upper_0': date(2025, 3, 1),
+                      'month_lower_1': date(2025, 4, 1), 'month_upper_1': date(2025, 5, 1)}
+
+
+def test_export_removes_manifest_left_by_an_earlier_run(loader, tmp_path):
+    storage_path = str(tmp_path / 'facility_type_avg_time_spent_per_visit_date')
+    rows = [{'facility_type': 'Clinic', 'visit_date': date(2025, month, 1), 'avg_time_spent': Decimal('10.00')}
+            for month in (1, 2)]
+    loader.write_manifest = True
+    export_visit_dates(loader, storage_path, load_marker('2025-02-01T00:00:00', 2, '2025-01'),
+                       {'2025-01': '1:1', '2025-02': '1:2'}, rows)
+    assert ParquetManifest(storage_path).read()['num_rows'] == 2
+
+    # The manifest is switched off and 2025-01 was dropped by retention
+    loader.write_manifest = False
+    export_visit_dates(loader, storage_path, load_marker('2025-02-01T00:00:00', 2, '2025-02'), {'2025-02': '1:2'}, [])
+
+    assert not os.path.exists(os.path.join(storage_path, '_manifest.json'))
+    assert not os.path.exists(os.path.join(storage_path, '_metadata'))
@@ -0,0 +1,34 @@
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_dev.src.data.parquet_manifest import ParquetManifest
+
+
+def write_dataset(storage_path):
+    table = pa.table({'partition_date': ['2025-01', '2025-02'], 'visit_count': [1, 2]})
+    pq.write_to_dataset(table, storage_path, partition_cols=['partition_date'])
+
+
+def test_read_ignores_manifest_listing_deleted_files(tmp_path):
+    storage_path = str(tmp_path)
+    write_dataset(storage_path)
+    manifest = ParquetManifest(storage_path).write()
+    assert ParquetManifest(storage_path).read() == manifest
+
+    removed = os.path.join(storage_path, *manifest['files'][0]['path'].split('/'))
+    os.remove(removed)
+
+    assert ParquetManifest(storage_path).read() is None
+
+
+def test_remove_deletes_all_manifest_files(tmp_path):
+    storage_path = str(tmp_path)
+    write_dataset(storage_path)
+    ParquetManifest(storage_path).write()
+
+    ParquetManifest(storage_path).remove()
+    ParquetManifest(storage_path).remove()
+
+    assert sorted(name for name in os.listdir(storage_path) if name.startswith('_')) == []
@@ -0,0 +1,68 @@
+from datetime import date
+
+from data_dev.src.data.partition_manager import PartitionManager
+
+
+class FakeCursor:
+    """
+    Keeps the attached partitions and the standalone tables of a partitioned table and applies the
+    create, attach, detach and rename statements to them.
+    """
+
+    def __init__(self, attached=(), standalone=()):
+        self.attached = set(attached)
+        self.standalone = set(standalone)
+        self.statements = []
+        self.rows = []
+
+    def execute(self, query, params=None):
+        words = query.replace(';', '').split()
+        if 'pg_inherits' in query:
+            self.rows = [(name,) for name in sorted(self.attached)]
+        elif 'to_regclass' in query:
+            name = params['relation_name']
+            self.rows = [(name in self.attached or name in self.standalone,)]
+        else:
+            self.statements.append(' '.join(words[:6]))
+            if words[:2] == ['CREATE', 'TABLE']:
+                assert words[2] not in self.attached | self.standalone
+                self.attached.add(words[2])
+            elif words[3] == 'ATTACH':
+                self.standalone.remove(words[5])
+                self.attached.add(words[5])
+            elif words[3] == 'DETACH':
+                self.attached.remove(words[5])
+                self.standalone.add(words[5])
+            elif words[3] == 'RENAME':
+                self.standalone.remove(words[2])
+                self.standalone.add(words[5])
+
+    def fetchone(self):
+        return self.rows[0]
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_detached_month_can_be_loaded_again():
+    manager = PartitionManager(conn=None)
+    cursor = FakeCursor(attached={'visits_y2025m01', 'visits_y2025m02'})
+
+    detached = manager.detach_partitions_before(cursor, 'visits', date(2025, 2, 1))
+
+    assert len(detached) == 1 and detached[0].startswith('visits_y2025m01_detached_')
+    assert cursor.standalone == set(detached)
+    # A later reload of January gets a new, empty partition; the archived rows are left alone
+    manager.ensure_monthly_partitions(cursor, 'visits', '2025-01-15', '2025-02-10')
+    assert cursor.attached == {'visits_y2025m01', 'visits_y2025m02'}
+    assert cursor.statements[-1].startswith('CREATE TABLE visits_y2025m01 PARTITION OF visits')
+
+
+def test_standalone_table_with_the_partition_name_is_attached_again():
+    cursor = FakeCursor(attached={'visits_y2025m02'}, standalone={'visits_y2025m01'})
+
+    PartitionManager(conn=None).ensure_monthly_partitions(cursor, 'visits', '2025-01-15', '2025-03-01')
+
+    assert cursor.attached == {'visits_y2025m01', 'visits_y2025m02', 'visits_y2025m03'}
+    assert cursor.statements == ['ALTER TABLE visits ATTACH PARTITION visits_y2025m01',
+                                 'CREATE TABLE visits_y2025m03 PARTITION OF visits']
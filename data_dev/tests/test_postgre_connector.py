@@ -0,0 +1,156 @@
+import importlib.util
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import psycopg2
+import pytest
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError
+
+from data_dev.src.connectors.postgre_connector import PostgresConnectionPool
+
+# The DQ framework ships its own copy of the pool; it is loaded by path since it is not an installed package
+DQ_CONNECTOR_PATH = (Path(__file__).resolve().parents[2] / "PyTest DQ Framework Result" / "src" / "connectors"
+                     / "postgres" / "postgres_connector.py")
+_spec = importlib.util.spec_from_file_location("dq_postgres_connector", DQ_CONNECTOR_PATH)
+dq_postgres_connector = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(dq_postgres_connector)
+
+
+def data_dev_pool(max_size):
+    return PostgresConnectionPool(min_size=1, max_size=max_size, session_settings={})
+
+
+def dq_pool(max_size):
+    return dq_postgres_connector.PostgresConnectionPool(db_host='localhost', db_name='test', min_size=1,
+                                                        max_size=max_size, session_settings={})
+
+
+POOL_FACTORIES = pytest.mark.parametrize("make_pool", [data_dev_pool, dq_pool], ids=["data_dev", "dq"])
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        return False
+
+    def execute(self, query, params=None):
+        if self.conn.error is not None:
+            raise self.conn.error
+
+
+class FakeConnection:
+    """
+    A connection whose queries raise `error` when it is set (e.g. once the server has closed it).
+    """
+
+    def __init__(self, error=None):
+        self.error = error
+        self.closed = False
+        self.autocommit = False
+
+    class info:
+        transaction_status = TRANSACTION_STATUS_IDLE
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeThreadedConnectionPool:
+    """
+    Behaves like psycopg2's ThreadedConnectionPool: getconn raises PoolError once maxconn connections are out.
+    """
+
+    def __init__(self, maxconn, connections=()):
+        self.maxconn = maxconn
+        self.used = 0
+        self.max_used = 0
+        self.idle = list(connections)
+        self.closed = []
+        self.lock = threading.Lock()
+
+    def getconn(self):
+        with self.lock:
+            if self.used >= self.maxconn:
+                raise PoolError("connection pool exhausted")
+            self.used += 1
+            self.max_used = max(self.max_used, self.used)
+            return self.idle.pop(0) if self.idle else FakeConnection()
+
+    def putconn(self, conn, close=False):
+        with self.lock:
+            self.used -= 1
+            if close:
+                conn.close()
+                self.closed.append(conn)
+            else:
+                self.idle.append(conn)
+
+
+@POOL_FACTORIES
+def test_more_threads_than_max_size_wait_for_a_connection(make_pool):
+    pool = make_pool(max_size=2)
+    pool.pool = FakeThreadedConnectionPool(maxconn=2)
+    pool._prepare = lambda conn: None
+
+    def check_out():
+        with pool.connection():
+            time.sleep(0.02)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(check_out) for _ in range(16)]
+        for future in futures:
+            future.result()  # raises PoolError if a checkout did not wait
+
+    assert pool.pool.max_used == 2
+    assert pool.pool.used == 0
+
+
+@POOL_FACTORIES
+def test_acquire_returns_connection_and_slot_when_prepare_fails(make_pool):
+    pool = make_pool(max_size=1)
+    failing = FakeConnection(error=psycopg2.ProgrammingError('unrecognized configuration parameter "work_mem2"'))
+    pool.pool = FakeThreadedConnectionPool(maxconn=1, connections=[failing])
+
+    with pytest.raises(psycopg2.ProgrammingError):
+        pool.acquire()
+
+    assert pool.pool.used == 0
+    assert pool.pool.closed == [failing]
+    # The slot was released as well, otherwise this checkout would block forever
+    conn = pool.acquire()
+    assert conn is not failing
+    pool.release(conn)
+    assert pool.pool.used == 0
+
+
+@POOL_FACTORIES
+def test_connection_closed_by_the_server_is_replaced(make_pool):
+    pool = make_pool(max_size=1)
+    conn = FakeConnection()
+    pool.pool = FakeThreadedConnectionPool(maxconn=1, connections=[conn])
+
+    with pool.connection() as connection_object:
+        assert connection_object.get_connection() is conn
+    # The server terminates the idle connection: the next health check fails and a new connection is used
+    conn.error = psycopg2.OperationalError("server closed the connection unexpectedly")
+    with pool.connection() as connection_object:
+        replacement = connection_object.get_connection()
+        assert replacement is not conn
+        # ... and the server also closes the replacement while it is checked out
+        replacement.closed = True
+
+    assert pool.pool.closed == [conn, replacement]
+    assert pool.pool.used == 0
+    with pool.connection() as connection_object:
+        assert connection_object.get_connection() not in (conn, replacement)
@@ -0,0 +1,31 @@
+from data_dev.config import metrics_config
+from data_dev.src.metrics.run_metrics import RunMetrics
+
+
+def test_sql_spans_are_aggregated_by_statement():
+    metrics = RunMetrics(enabled=True)
+    with metrics.span('ingest') as stage:
+        for _ in range(10000):
+            metrics.record_sql("INSERT INTO visits VALUES (%s, %s)", 0.001, 1)
+        metrics.record_sql("SELECT 1", 0.5, 1, error="OperationalError: boom")
+
+    statements = [span for span in metrics.spans if span['kind'] == 'sql']
+    assert [(span['name'], span['count'], span['rows']) for span in statements] == [
+        ('INSERT INTO visits VALUES (%s, %s)', 10000, 10000),
+        ('SELECT 1', 1, 1)
+    ]
+    assert statements[1]['status'] == 'failed' and statements[1]['failed_count'] == 1
+    assert stage['rows'] == 10001
+    assert metrics.to_dict()['sql_statement_count'] == 10001
+
+
+def test_distinct_sql_statements_are_capped(monkeypatch):
+    monkeypatch.setattr(metrics_config, 'max_sql_spans', 3)
+    metrics = RunMetrics(enabled=True)
+    with metrics.span('ingest'):
+        for index in range(100):
+            metrics.record_sql(f"INSERT INTO visits VALUES ({index})", 0.001, 1)
+
+    statements = [span for span in metrics.spans if span['kind'] == 'sql']
+    assert len(statements) == 4
+    assert statements[-1]['name'] == '(other statements)' and statements[-1]['count'] == 97
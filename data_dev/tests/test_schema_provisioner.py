@@ -0,0 +1,64 @@
+import pytest
+
+from data_dev.src.data.schema_provisioner import SchemaProvisioner
+
+
+class FakeCursor:
+    """
+    Answers the index catalog lookup from a set of existing index names and records the other statements.
+    """
+
+    def __init__(self, existing, failing=()):
+        self.existing = set(existing)
+        self.failing = failing
+        self.statements = []
+        self.rows = []
+
+    def execute(self, query, params=None):
+        if 'pg_indexes' in query:
+            self.rows = [(name,) for name in params['index_names'] if name in self.existing]
+            return
+        self.statements.append(query.strip())
+        if any(name in query for name in self.failing):
+            raise Exception('could not create unique index')
+        if query.strip().startswith('CREATE'):
+            self.existing.add(query.split('IF NOT EXISTS')[1].split()[0])
+
+    def fetchall(self):
+        return self.rows
+
+
+def created_indexes(cursor):
+    return [statement for statement in cursor.statements if statement.startswith('CREATE')]
+
+
+def test_only_missing_indexes_are_created():
+    cursor = FakeCursor(existing={'facilities_external_id_idx', 'patients_external_id_idx',
+                                  'visits_visit_timestamp_idx'})
+
+    assert SchemaProvisioner(conn=None).provision_nf3(cursor)
+
+    assert created_indexes(cursor) == ['CREATE INDEX IF NOT EXISTS visits_facility_id_patient_id_visit_timestamp_idx\n'
+                                       'ON visits (facility_id, patient_id, visit_timestamp);']
+
+
+def test_merge_strategy_creates_no_unique_keys():
+    cursor = FakeCursor(existing=set())
+
+    provisioner = SchemaProvisioner(conn=None, strategy='merge')
+    provisioner.provision_nf3(cursor)
+    provisioner.require_unique_keys(cursor)
+
+    assert created_indexes(cursor) and not any('UNIQUE' in statement for statement in created_indexes(cursor))
+
+
+def test_on_conflict_strategy_fails_when_a_unique_key_cannot_be_created():
+    cursor = FakeCursor(existing=set(), failing=('visits_facility_id_patient_id_visit_timestamp_uidx',))
+
+    provisioner = SchemaProvisioner(conn=None, strategy='on_conflict')
+    assert not provisioner.provision_nf3(cursor)
+
+    with pytest.raises(RuntimeError) as error:
+        provisioner.require_unique_keys(cursor)
+    assert 'visits (facility_id, patient_id, visit_timestamp)' in str(error.value)
+    assert 'facilities' not in str(error.value)
@@ -0,0 +1,50 @@
+from data_dev.src.pipeline.stage_scheduler import fingerprint, table_fingerprint
+
+
+class FakeCursor:
+    """
+    Answers the table identity and row count queries from a {table name: (oid, relfilenode, row count)} dict.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb):
+        return False
+
+    def execute(self, query, params=None):
+        if 'pg_class' in query:
+            self.rows = [(name, *self.tables[name][:2]) if name in self.tables else (name, None, None)
+                         for name in sorted(params['table_names'])]
+        else:
+            self.rows = [(self.tables[query.split('FROM')[1].strip().rstrip(';')][2],)]
+
+    def fetchall(self):
+        return self.rows
+
+    def fetchone(self):
+        return self.rows[0]
+
+
+class FakeConnection:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def cursor(self):
+        return FakeCursor(self.tables)
+
+
+def test_table_fingerprint_detects_a_database_reset():
+    loaded = FakeConnection({'visits': (16390, 16390, 1000), 'load_state': (16400, 16400, 1)})
+    reset = FakeConnection({'visits': (16390, 16501, 0)})  # visits truncated, load_state dropped
+
+    assert table_fingerprint(loaded, ['visits', 'load_state']) == [['load_state', 16400, 16400, 1],
+                                                                   ['visits', 16390, 16390, 1000]]
+    assert table_fingerprint(reset, ['visits', 'load_state']) == [['load_state', None, None, None],
+                                                                  ['visits', 16390, 16501, 0]]
+    assert fingerprint(table_fingerprint(loaded, ['visits'])) == fingerprint(table_fingerprint(loaded, ['visits']))
+    assert fingerprint(table_fingerprint(loaded, ['visits'])) != fingerprint(table_fingerprint(reset, ['visits']))